@@ -0,0 +1,57 @@
+"""Contagem aproximada de acessos, compartilhada entre processos pelo cache.
+
+Cada processo conta localmente e, a cada ``flush_every`` acessos ou
+``flush_seconds``, soma suas contagens ao placar guardado no cache. O
+placar mantém só os ``max_tracked`` itens mais acessados. Duas descargas
+simultâneas podem perder a soma de uma delas: para escolher o que aquecer
+isso não importa.
+"""
+import threading
+import time
+from collections import Counter
+from typing import List
+
+from django.core.cache import cache
+
+# Placar compartilhado dura um dia sem novas descargas
+SCOREBOARD_TIMEOUT = 24 * 60 * 60
+
+
+class AccessCounter:
+    def __init__(self, name: str, flush_every: int = 100, flush_seconds: float = 30, max_tracked: int = 1000):
+        self.key = f'access:{name}'
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self.max_tracked = max_tracked
+        self._local = Counter()
+        self._pending = 0
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, item_id):
+        with self._lock:
+            self._local[item_id] += 1
+            self._pending += 1
+            due = self._pending >= self.flush_every or time.monotonic() - self._flushed_at >= self.flush_seconds
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            local, self._local = self._local, Counter()
+            self._pending = 0
+            self._flushed_at = time.monotonic()
+        if not local:
+            return
+        try:
+            scoreboard = Counter(cache.get(self.key) or {})
+            scoreboard.update(local)
+            cache.set(self.key, dict(scoreboard.most_common(self.max_tracked)), SCOREBOARD_TIMEOUT)
+        except Exception:
+            # Cache fora do ar: a contagem é descartável
+            pass
+
+    def top(self, n: int) -> List:
+        """Os ``n`` itens mais acessados, do mais para o menos acessado"""
+        scoreboard = Counter(cache.get(self.key) or {})
+        return [item_id for item_id, _ in scoreboard.most_common(n)]
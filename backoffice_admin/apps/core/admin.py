@@ -0,0 +1,28 @@
+from django.contrib import admin
+from django.urls import reverse
+from django.utils.html import format_html
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "task", "status", "progress_display", "attempts", "created_by", "created_at", "finished_at")
+    list_filter = ("status", "task")
+    search_fields = ("task", "dedupe_key", "created_by")
+    readonly_fields = [field.name for field in Job._meta.fields] + ["progress_link"]
+
+    @admin.display(description="Progresso")
+    def progress_display(self, obj):
+        label = f"{obj.percent}%" if obj.percent is not None else str(obj.progress)
+        return format_html('<a href="{}">{}</a>', reverse("job_progress", args=[obj.pk]), label)
+
+    @admin.display(description="Acompanhar")
+    def progress_link(self, obj):
+        return format_html('<a href="{}">Página de progresso</a>', reverse("job_progress", args=[obj.pk]))
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
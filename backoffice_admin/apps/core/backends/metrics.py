@@ -0,0 +1,51 @@
+"""Métricas de obtenção de conexões com o banco (por processo).
+
+Cada chamada a ``get_new_connection`` é um checkout: com pool, o tempo
+medido é a espera por uma conexão livre; sem pool, é o tempo de abrir uma
+conexão nova (o custo que conexões persistentes evitam).
+"""
+import logging
+import threading
+from typing import Dict
+
+from django.conf import settings
+
+logger = logging.getLogger('rust_api')
+
+_lock = threading.Lock()
+_stats: Dict[str, Dict] = {}
+
+
+def record_checkout(alias: str, seconds: float, pooled: bool, failed: bool = False):
+    with _lock:
+        stats = _stats.setdefault(alias, {
+            'checkouts': 0, 'failures': 0, 'wait_total_ms': 0.0, 'wait_max_ms': 0.0, 'pooled': pooled,
+        })
+        elapsed_ms = seconds * 1000
+        stats['checkouts'] += 1
+        stats['failures'] += failed
+        stats['wait_total_ms'] += elapsed_ms
+        stats['wait_max_ms'] = max(stats['wait_max_ms'], elapsed_ms)
+
+    if elapsed_ms >= settings.DB_CHECKOUT_WARNING_MS:
+        kind = 'espera no pool' if pooled else 'conexão nova'
+        logger.warning(f"Checkout lento no banco '{alias}': {elapsed_ms:.1f} ms ({kind})")
+
+
+def connection_stats() -> Dict[str, Dict]:
+    """Contadores por alias, com as estatísticas do ``psycopg_pool`` quando houver pool"""
+    from django.db import connections
+
+    with _lock:
+        snapshot = {alias: dict(stats) for alias, stats in _stats.items()}
+    for alias, stats in snapshot.items():
+        stats['wait_avg_ms'] = stats['wait_total_ms'] / stats['checkouts'] if stats['checkouts'] else 0.0
+        pool = getattr(connections[alias], 'pool', None) if stats['pooled'] else None
+        if pool is not None:
+            stats['pool'] = pool.get_stats()
+    return snapshot
+
+
+def reset_stats():
+    with _lock:
+        _stats.clear()
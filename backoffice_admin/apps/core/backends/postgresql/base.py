@@ -0,0 +1,23 @@
+"""Backend PostgreSQL do Django com métricas de checkout de conexões
+
+Funciona com psycopg2 e psycopg 3; com ``OPTIONS['pool']`` (psycopg 3 +
+psycopg_pool), cada checkout é uma retirada do pool.
+"""
+import time
+
+from django.db.backends.postgresql import base
+
+from ..metrics import record_checkout
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        pooled = self.pool is not None
+        start = time.perf_counter()
+        try:
+            connection = super().get_new_connection(conn_params)
+        except Exception:
+            record_checkout(self.alias, time.perf_counter() - start, pooled, failed=True)
+            raise
+        record_checkout(self.alias, time.perf_counter() - start, pooled)
+        return connection
@@ -0,0 +1,92 @@
+"""Filtro de Bloom dos ids de propriedades existentes no backend Rust.
+
+Responde "com certeza não existe" ou "talvez exista": ids rejeitados pelo
+filtro não geram requisição. O filtro é montado a partir da listagem
+(``refresh_property_filter``), guardado no cache e recarregado por cada
+processo no máximo a cada ``RELOAD_SECONDS``.
+
+Como os ids são sequenciais, ids maiores que o maior id visto na montagem
+(propriedades criadas depois) nunca são rejeitados. Ids removidos continuam
+"talvez existentes" e caem no cache negativo.
+"""
+import hashlib
+import math
+import struct
+import threading
+import time
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+
+CACHE_KEY = 'rust_api:property_id_filter'
+RELOAD_SECONDS = 60
+HEADER = struct.Struct('<QIQ')  # bits, funções de hash, maior id
+
+
+class BloomFilter:
+    def __init__(self, bits: int, hashes: int, max_id: int = 0, data: Optional[bytearray] = None):
+        self.bits = bits
+        self.hashes = hashes
+        self.max_id = max_id
+        self.data = data if data is not None else bytearray((bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float = 0.01) -> 'BloomFilter':
+        capacity = max(capacity, 1)
+        bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        hashes = max(1, round(bits / capacity * math.log(2)))
+        return cls(bits, hashes)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(str(item).encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.bits for i in range(self.hashes))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.data[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item) -> bool:
+        return all(self.data[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def may_contain_id(self, item_id: int) -> bool:
+        return item_id > self.max_id or item_id in self
+
+    def to_bytes(self) -> bytes:
+        return HEADER.pack(self.bits, self.hashes, self.max_id) + bytes(self.data)
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> 'BloomFilter':
+        bits, hashes, max_id = HEADER.unpack_from(raw)
+        return cls(bits, hashes, max_id, bytearray(raw[HEADER.size:]))
+
+
+def build_id_filter(ids: Iterable[int], capacity: int, error_rate: float = 0.01) -> BloomFilter:
+    bloom = BloomFilter.for_capacity(capacity, error_rate)
+    for item_id in ids:
+        bloom.add(item_id)
+        bloom.max_id = max(bloom.max_id, item_id)
+    return bloom
+
+
+def store_id_filter(bloom: BloomFilter):
+    # Sem expiração: um filtro antigo continua correto para ids antigos
+    cache.set(CACHE_KEY, bloom.to_bytes(), None)
+    _local.update(filter=bloom, loaded_at=time.monotonic())
+
+
+_local = {'filter': None, 'loaded_at': -RELOAD_SECONDS}
+_lock = threading.Lock()
+
+
+def property_id_filter() -> Optional[BloomFilter]:
+    """Filtro deste processo, recarregado do cache periodicamente (``None`` se não houver)"""
+    if time.monotonic() - _local['loaded_at'] >= RELOAD_SECONDS:
+        with _lock:
+            if time.monotonic() - _local['loaded_at'] >= RELOAD_SECONDS:
+                try:
+                    raw = cache.get(CACHE_KEY)
+                except Exception:
+                    raw = None
+                _local.update(filter=BloomFilter.from_bytes(raw) if raw else None, loaded_at=time.monotonic())
+    return _local['filter']
@@ -0,0 +1,260 @@
+"""TTL adaptativo para o cache das respostas do backend Rust.
+
+Cada processo mantém:
+
+- um *count-min sketch* (memória fixa) com a frequência de acesso por
+  chave, com as contagens divididas por 2 periodicamente para esquecer o
+  passado;
+- estatísticas das chaves mais recentes (tabela limitada): acertos,
+  falhas e quantas vezes a resposta mudou entre duas buscas;
+- um cache L1 em memória, pequeno, onde só entram chaves quentes.
+
+O TTL cresce com a frequência e com a estabilidade da chave, entre
+``MIN_TTL`` e ``MAX_TTL``; chaves frias (menos de ``ADMIT_MIN_HITS``
+acessos) não são gravadas no cache. Cada processo publica periodicamente
+suas estatísticas no cache para a página do admin somar os workers.
+"""
+import hashlib
+import math
+import os
+import socket
+import threading
+import time
+from array import array
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import codec
+from .limiter import rust_limiter
+
+WORKERS_KEY = 'cache_policy:workers'
+PUBLISH_SECONDS = 30
+PUBLISH_TIMEOUT = 5 * 60
+
+
+class CountMinSketch:
+    """Frequência aproximada por chave em ``depth`` x ``width`` contadores de 32 bits"""
+
+    def __init__(self, width: int = 4096, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.tables = [array('I', bytes(4 * width)) for _ in range(depth)]
+        self.additions = 0
+        # Envelhecimento (como no TinyLFU): a cada 10 x width acessos, tudo cai pela metade
+        self.reset_after = 10 * width
+
+    def _indexes(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [(first + row * second) % self.width for row in range(self.depth)]
+
+    def add(self, key: str) -> int:
+        """Conta um acesso e retorna a frequência estimada"""
+        indexes = self._indexes(key)
+        current = min(table[index] for table, index in zip(self.tables, indexes))
+        # Atualização conservadora: só sobe os contadores que estão no mínimo
+        for table, index in zip(self.tables, indexes):
+            if table[index] == current:
+                table[index] = current + 1
+        self.additions += 1
+        if self.additions >= self.reset_after:
+            self._age()
+        return current + 1
+
+    def estimate(self, key: str) -> int:
+        return min(table[index] for table, index in zip(self.tables, self._indexes(key)))
+
+    def _age(self):
+        for table in self.tables:
+            for index, value in enumerate(table):
+                if value:
+                    table[index] = value >> 1
+        self.additions //= 2
+
+    @property
+    def nbytes(self) -> int:
+        return sum(table.itemsize * len(table) for table in self.tables)
+
+
+class KeyStats:
+    __slots__ = ('hits', 'l1_hits', 'misses', 'fetches', 'changes', 'digest', 'ttl')
+
+    def __init__(self):
+        self.hits = self.l1_hits = self.misses = self.fetches = self.changes = self.ttl = 0
+        self.digest = None
+
+    @property
+    def stability(self) -> float:
+        """Fração das buscas em que a resposta não mudou (0,5 sem histórico)"""
+        comparisons = max(self.fetches - 1, 0)
+        return (comparisons - self.changes + 1) / (comparisons + 2)
+
+
+class AdaptiveCachePolicy:
+    def __init__(self, options: Optional[Dict] = None):
+        options = {**settings.RUST_CACHE_POLICY, **(options or {})}
+        self.min_ttl = options['MIN_TTL']
+        self.max_ttl = options['MAX_TTL']
+        self.admit_min_hits = options['ADMIT_MIN_HITS']
+        self.warm_ttl = options['WARM_TTL']
+        self.l1_size = options['L1_SIZE']
+        self.l1_max_ttl = options['L1_MAX_TTL']
+        self.tracked_keys = options['TRACKED_KEYS']
+        self.sketch = CountMinSketch(options['SKETCH_WIDTH'], options['SKETCH_DEPTH'])
+        self.stats: 'OrderedDict[str, KeyStats]' = OrderedDict()
+        self.l1: 'OrderedDict[str, Tuple[float, bytes]]' = OrderedDict()
+        self.worker = f'{socket.gethostname()}:{os.getpid()}'
+        # Chamadas evitadas: cache negativo, filtro de Bloom, deduplicação
+        self.counters = Counter()
+        self._published_at = 0.0
+        self._lock = threading.Lock()
+
+    def _stats(self, key: str) -> KeyStats:
+        # Chamado com o lock; descarta a chave usada há mais tempo
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = KeyStats()
+            if len(self.stats) > self.tracked_keys:
+                self.stats.popitem(last=False)
+        else:
+            self.stats.move_to_end(key)
+        return stats
+
+    def record_access(self, key: str) -> int:
+        with self._lock:
+            frequency = self.sketch.add(key)
+        if time.monotonic() - self._published_at >= PUBLISH_SECONDS:
+            self.publish()
+        return frequency
+
+    def record_hit(self, key: str, l1: bool = False):
+        with self._lock:
+            stats = self._stats(key)
+            stats.hits += 1
+            stats.l1_hits += l1
+
+    def record_miss(self, key: str):
+        with self._lock:
+            self._stats(key).misses += 1
+
+    def ttl_for(self, key: str, data) -> Tuple[int, bytes]:
+        """Registra a resposta buscada e retorna ``(ttl, json)``; ttl 0 = não cachear"""
+        encoded = codec.dumps(data, sort_keys=True)
+        digest = hashlib.blake2b(encoded, digest_size=16).digest()
+        frequency = self.sketch.estimate(key)
+        with self._lock:
+            stats = self._stats(key)
+            stats.fetches += 1
+            if stats.digest is not None and stats.digest != digest:
+                stats.changes += 1
+            stats.digest = digest
+            if frequency < self.admit_min_hits:
+                stats.ttl = 0
+            else:
+                hotness = min(math.log2(frequency), 6) / 6
+                stats.ttl = round(self.min_ttl + (self.max_ttl - self.min_ttl) * hotness * stats.stability)
+            return stats.ttl, encoded
+
+    def incr(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def l1_get(self, key: str):
+        with self._lock:
+            entry = self.l1.get(key)
+            if entry is None:
+                return None
+            expires, encoded = entry
+            if expires < time.monotonic():
+                del self.l1[key]
+                return None
+            self.l1.move_to_end(key)
+        # Cópia nova a cada leitura: quem recebe pode alterar o dicionário
+        return codec.loads(encoded)
+
+    def l1_set(self, key: str, data, ttl: Optional[int] = None):
+        """Guarda no L1 (``data`` já serializado ou não) se a chave for quente"""
+        # Só as chaves mais quentes entram: o L1 é pequeno e não vê invalidações de outros processos
+        if self.sketch.estimate(key) < 2 * self.admit_min_hits:
+            return
+        encoded = data if isinstance(data, bytes) else codec.dumps(data)
+        ttl = min(ttl or self.l1_max_ttl, self.l1_max_ttl)
+        with self._lock:
+            self.l1[key] = (time.monotonic() + ttl, encoded)
+            self.l1.move_to_end(key)
+            while len(self.l1) > self.l1_size:
+                self.l1.popitem(last=False)
+
+    def l1_delete(self, key: str):
+        with self._lock:
+            self.l1.pop(key, None)
+
+    def snapshot(self, limit: int = 100) -> List[Dict]:
+        with self._lock:
+            rows = [
+                {
+                    'key': key, 'frequency': self.sketch.estimate(key), 'hits': stats.hits,
+                    'l1_hits': stats.l1_hits, 'misses': stats.misses, 'fetches': stats.fetches,
+                    'changes': stats.changes, 'ttl': stats.ttl,
+                }
+                for key, stats in self.stats.items()
+            ]
+        rows.sort(key=lambda row: row['frequency'], reverse=True)
+        return rows[:limit]
+
+    def publish(self):
+        """Grava as estatísticas deste processo no cache compartilhado"""
+        self._published_at = time.monotonic()
+        try:
+            cache.set(f'cache_policy:{self.worker}', {
+                'keys': self.snapshot(),
+                'memory': self.sketch.nbytes,
+                'l1_entries': len(self.l1),
+                'counters': dict(self.counters),
+                'limiter': rust_limiter.snapshot(),
+            }, PUBLISH_TIMEOUT)
+            workers = cache.get(WORKERS_KEY) or {}
+            now = time.time()
+            workers = {name: seen for name, seen in workers.items() if now - seen < PUBLISH_TIMEOUT}
+            workers[self.worker] = now
+            cache.set(WORKERS_KEY, workers, PUBLISH_TIMEOUT)
+        except Exception:
+            # Estatísticas são descartáveis; o cache fora do ar não deve quebrar a requisição
+            pass
+
+
+def collect(limit: int = 50) -> Dict:
+    """Estatísticas somadas de todos os processos que publicaram recentemente"""
+    workers = cache.get(WORKERS_KEY) or {}
+    published = cache.get_many([f'cache_policy:{name}' for name in workers])
+    merged: Dict[str, Dict] = {}
+    for snapshot in published.values():
+        for row in snapshot['keys']:
+            total = merged.setdefault(row['key'], {**row, 'ttl': 0, 'frequency': 0, 'hits': 0, 'l1_hits': 0,
+                                                   'misses': 0, 'fetches': 0, 'changes': 0})
+            for field in ('frequency', 'hits', 'l1_hits', 'misses', 'fetches', 'changes'):
+                total[field] += row[field]
+            total['ttl'] = max(total['ttl'], row['ttl'])
+    counters = Counter()
+    limiter = Counter()
+    cluster = None
+    for snapshot in published.values():
+        counters.update(snapshot.get('counters', {}))
+        stats = dict(snapshot.get('limiter', {}))
+        # O limite compartilhado é o mesmo em todos os processos: não se soma
+        cluster = stats.pop('cluster', None) or cluster
+        limiter.update(stats)
+    rows = sorted(merged.values(), key=lambda row: row['frequency'], reverse=True)[:limit]
+    for row in rows:
+        lookups = row['hits'] + row['misses']
+        row['hit_ratio'] = row['hits'] / lookups if lookups else 0.0
+    return {
+        'keys': rows,
+        'workers': len(published),
+        'counters': dict(counters),
+        'limiter': {**limiter, 'limit': round(limiter['limit'], 1), 'cluster': cluster},
+        'memory': sum(snapshot['memory'] for snapshot in published.values()),
+    }
@@ -0,0 +1,39 @@
+"""Sinal de vida do consumidor do feed de mudanças do backend Rust.
+
+``consume_changes`` chama :func:`beat` a cada consulta bem-sucedida ao
+feed. Enquanto o sinal estiver no cache, as mudanças chegam ao Django em
+segundos e o TTL das respostas em cache pode ser bem maior
+(:func:`ttl_multiplier`); sem consumidor, vale o TTL normal. O feed só
+traz propriedades: os demais recursos (ex.: usuários) ficam no TTL normal.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+HEARTBEAT_KEY = 'rust_changes:heartbeat'
+# Quanto tempo cada processo reaproveita a resposta de is_live()
+CHECK_SECONDS = 10
+# Recursos da API Rust cujas mudanças chegam pelo feed
+FEED_RESOURCES = ('properties',)
+
+_checked = {'at': 0.0, 'live': False}
+
+
+def beat():
+    cache.set(HEARTBEAT_KEY, time.time(), timeout=settings.RUST_CHANGE_FEED['HEARTBEAT_TIMEOUT'])
+
+
+def is_live() -> bool:
+    """O consumidor consultou o feed há menos de ``HEARTBEAT_TIMEOUT`` segundos?"""
+    now = time.monotonic()
+    if now - _checked['at'] >= CHECK_SECONDS:
+        _checked['live'] = cache.get(HEARTBEAT_KEY) is not None
+        _checked['at'] = now
+    return _checked['live']
+
+
+def ttl_multiplier(resource: str) -> int:
+    if resource not in FEED_RESOURCES or not is_live():
+        return 1
+    return settings.RUST_CHANGE_FEED['TTL_MULTIPLIER']
@@ -0,0 +1,19 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.checks import Warning, register
+
+
+@register()
+def required_directories(app_configs, **kwargs):
+    """Diretórios de logs, mídia, estáticos e templates devem existir"""
+    missing = [str(path) for path in settings.REQUIRED_DIRECTORIES if not Path(path).is_dir()]
+    if not missing:
+        return []
+    return [
+        Warning(
+            f"Diretórios ausentes: {', '.join(missing)}",
+            hint='Execute "python manage.py ensure_directories".',
+            id='core.W001',
+        )
+    ]
@@ -0,0 +1,28 @@
+"""JSON das requisições e do cache do backend Rust.
+
+Usa o orjson quando instalado (extra ``fast-json`` do pyproject) e o
+``json`` da biblioteca padrão caso contrário. Nos dois casos ``dumps``
+retorna bytes UTF-8 compactos, então o que vai para o cache é o mesmo
+independente da implementação.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps(obj, sort_keys: bool = False) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, default=str, option=option)
+else:
+    loads = json.loads
+
+    def dumps(obj, sort_keys: bool = False) -> bytes:
+        return json.dumps(obj, sort_keys=sort_keys, separators=(',', ':'), ensure_ascii=False,
+                          default=str).encode()
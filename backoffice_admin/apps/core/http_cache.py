@@ -0,0 +1,161 @@
+"""Cache de respostas HTTP das views JSON, com surrogate keys e ETag.
+
+``@cache_response(tags=...)`` guarda a resposta inteira (corpo, headers e
+ETag) com uma chave formada por caminho, parâmetros de query aceitos pela
+view, idioma ativo (``LocaleMiddleware``) e classe de autenticação
+(anônimo, usuário ou staff).
+
+Cada entrada é marcada com surrogate keys (ex.: ``property:12``). Cada tag
+tem uma versão no cache e a entrada guarda as versões da hora em que foi
+gravada; ``purge('property:12')`` troca a versão e toda entrada com essa
+tag deixa de valer. A entrada e as versões das suas tags são lidas numa só
+ida ao cache, e as versões são lidas antes de a view rodar: um purge
+durante a renderização também invalida o que for gravado.
+
+As respostas levam ``ETag`` e ``Cache-Control`` (públicas para anônimos,
+privadas para autenticados), e ``Surrogate-Key``/``Cache-Tag`` para CDNs
+que purgam por tag. ``If-None-Match`` igual ao ETag responde 304 sem corpo.
+"""
+import hashlib
+import time
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from django.utils.translation import get_language
+
+from .routers import wrote_primary
+
+ENTRY_PREFIX = 'response:'
+TAG_PREFIX = 'surrogate:'
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+def _cache():
+    return caches[settings.RESPONSE_CACHE['CACHE_ALIAS']]
+
+
+def auth_class(request) -> str:
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return 'anon'
+    return 'staff' if user.is_staff else 'user'
+
+
+def response_key(request, query_params: Sequence[str]) -> str:
+    # Só os parâmetros que a view usa: parâmetros inventados não criam entradas novas
+    query = urlencode(sorted((name, request.GET[name]) for name in query_params if name in request.GET))
+    raw = f"{request.path}?{query}|{get_language()}|{auth_class(request)}"
+    return ENTRY_PREFIX + hashlib.md5(raw.encode()).hexdigest()
+
+
+def tag_key(tag: str) -> str:
+    return TAG_PREFIX + tag
+
+
+def purge(*tags: str):
+    """Invalida todas as respostas em cache marcadas com qualquer uma das ``tags``"""
+    if tags:
+        # Relógio em vez de incr: uma versão que saiu do cache nunca volta a um valor antigo
+        version = time.time_ns()
+        _cache().set_many({tag_key(tag): version for tag in tags}, timeout=None)
+
+
+def _tag_versions(found: Dict, tags: Iterable[str]) -> Dict[str, int]:
+    versions = {}
+    for tag in tags:
+        version = found.get(tag_key(tag))
+        if version is None:
+            # Tag nunca purgada (ou despejada): ganha uma versão nova; entradas antigas não valem mais
+            _cache().add(tag_key(tag), time.time_ns(), timeout=None)
+            version = _cache().get(tag_key(tag))
+        versions[tag] = version
+    return versions
+
+
+def _sets_cookie(request, response) -> bool:
+    """A resposta leva um cookie, agora ou nos middlewares de fora (CSRF, fixação no primário)"""
+    return bool(response.cookies) or request.META.get('CSRF_COOKIE_NEEDS_UPDATE', False) or wrote_primary()
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _finish(request, response, etag: str, tags: List[str], max_age: int, status: str):
+    response['ETag'] = etag
+    response['X-Cache'] = status
+    if tags:
+        response['Surrogate-Key'] = ' '.join(tags)
+        response['Cache-Tag'] = ','.join(tags)
+    if auth_class(request) == 'anon':
+        options = settings.RESPONSE_CACHE
+        response['Cache-Control'] = (
+            f"public, max-age={max_age}, s-maxage={options['S_MAXAGE']}, "
+            f"stale-while-revalidate={options['STALE_WHILE_REVALIDATE']}"
+        )
+    else:
+        # Navegador revalida sempre (304 barato); CDNs não guardam
+        response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ('Accept-Language', 'Cookie'))
+
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        not_modified = HttpResponseNotModified()
+        for header in ('ETag', 'Cache-Control', 'Vary', 'X-Cache', 'Surrogate-Key', 'Cache-Tag'):
+            if response.has_header(header):
+                not_modified[header] = response[header]
+        return not_modified
+    return response
+
+
+def cache_response(tags: Optional[Callable[..., List[str]]] = None, query_params: Sequence[str] = (),
+                   timeout: Optional[int] = None, max_age: Optional[int] = None):
+    """Cacheia as respostas 200 de uma view GET
+
+    ``tags(request, *args, **kwargs)`` devolve as surrogate keys da
+    resposta; ``query_params`` são os parâmetros de query que mudam a
+    resposta (os demais são ignorados na chave).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in SAFE_METHODS:
+                return view(request, *args, **kwargs)
+            options = settings.RESPONSE_CACHE
+            ttl = options['TIMEOUT'] if timeout is None else timeout
+            browser_ttl = options['MAX_AGE'] if max_age is None else max_age
+            response_tags = list(tags(request, *args, **kwargs)) if tags else []
+            key = response_key(request, query_params)
+
+            cache = _cache()
+            found = cache.get_many([key] + [tag_key(tag) for tag in response_tags])
+            versions = _tag_versions(found, response_tags)
+            entry = found.get(key)
+            if entry is not None and entry['tags'] == versions:
+                response = HttpResponse(entry['body'], content_type=entry['content_type'])
+                for header, value in entry['headers']:
+                    response[header] = value
+                return _finish(request, response, entry['etag'], response_tags, browser_ttl, 'HIT')
+
+            response = view(request, *args, **kwargs)
+            # Com cookie a resposta é de um cliente só: sem cache e sem o Cache-Control público
+            if response.status_code != 200 or response.streaming or _sets_cookie(request, response):
+                return response
+            body = response.content
+            etag = _etag(body)
+            cache.set(key, {
+                'body': body,
+                'content_type': response['Content-Type'],
+                'headers': [(header, value) for header, value in response.items()
+                            if header.lower() in ('content-language', 'content-encoding')],
+                'etag': etag,
+                'tags': versions,
+            }, timeout=ttl)
+            return _finish(request, response, etag, response_tags, browser_ttl, 'MISS')
+        return wrapper
+    return decorator
@@ -0,0 +1,295 @@
+"""Fila de tarefas em segundo plano, guardada no banco (modelo ``Job``).
+
+Ações do admin que chamam o backend Rust para muitos registros não rodam
+dentro da requisição: ``enqueue`` grava a tarefa e retorna na hora, e
+``manage.py run_jobs`` a executa num pool de threads ou de processos.
+
+- Tarefas são funções registradas com ``@task('nome')`` nos módulos
+  ``tasks.py`` dos apps. Recebem um ``JobContext`` como primeiro argumento
+  (para informar o progresso) e os argumentos do ``enqueue``, que precisam
+  ser serializáveis em JSON.
+- Uma exceção agenda nova tentativa, com espera que dobra a cada falha, até
+  ``max_attempts``; ``PermanentError`` falha na hora.
+- Com ``dedupe_key``, enquanto houver tarefa ativa com a mesma chave o
+  ``enqueue`` devolve a existente em vez de criar outra.
+- A reserva é um UPDATE condicional ("ainda está na fila?"), que funciona em
+  qualquer banco: dois workers nunca pegam a mesma tarefa. Tarefas de um
+  worker que morreu voltam para a fila depois de ``LEASE_SECONDS``.
+"""
+import logging
+import os
+import random
+import signal
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import timedelta
+from multiprocessing import get_context
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .limiter import batch_priority
+from .models import Job
+
+logger = logging.getLogger('jobs')
+
+# Intervalo mínimo entre gravações de progresso de uma tarefa
+PROGRESS_SECONDS = 1.0
+PURGE_SECONDS = 3600
+
+
+class PermanentError(Exception):
+    """Falha que não adianta repetir (ex.: arquivo inválido)"""
+
+
+@dataclass(frozen=True)
+class Task:
+    name: str
+    func: Callable
+    max_attempts: Optional[int] = None
+
+
+registry: Dict[str, Task] = {}
+_discovered = False
+
+
+def task(name: str, max_attempts: Optional[int] = None):
+    """Registra a função como tarefa ``name``"""
+    def decorator(func):
+        registry[name] = Task(name, func, max_attempts)
+        return func
+    return decorator
+
+
+def autodiscover():
+    """Importa os módulos ``tasks.py`` dos apps (uma vez por processo)"""
+    global _discovered
+    if not _discovered:
+        autodiscover_modules('tasks')
+        _discovered = True
+
+
+def enqueue(name: str, *args, dedupe_key: Optional[str] = None, delay: float = 0,
+            max_attempts: Optional[int] = None, created_by: str = '', **kwargs) -> Job:
+    """Coloca a tarefa ``name`` na fila e retorna o ``Job`` (ou o já ativo com a mesma ``dedupe_key``)"""
+    autodiscover()
+    if name not in registry:
+        raise ValueError(f"Tarefa desconhecida: {name}")
+    if dedupe_key:
+        existing = Job.objects.filter(dedupe_key=dedupe_key, status__in=Job.ACTIVE).first()
+        if existing:
+            return existing
+    attempts = max_attempts or registry[name].max_attempts or settings.JOB_QUEUE['MAX_ATTEMPTS']
+    try:
+        with transaction.atomic():
+            return Job.objects.create(
+                task=name, args=list(args), kwargs=kwargs, dedupe_key=dedupe_key,
+                max_attempts=attempts, run_at=timezone.now() + timedelta(seconds=delay),
+                created_by=created_by,
+            )
+    except IntegrityError:
+        if not dedupe_key:
+            raise
+        # Outra requisição enfileirou a mesma chave entre a consulta e o INSERT
+        return Job.objects.get(dedupe_key=dedupe_key, status__in=Job.ACTIVE)
+
+
+class JobContext:
+    """Passado às tarefas: progresso e sinal de vida da tarefa em execução"""
+
+    def __init__(self, job: Job):
+        self.job = job
+        self._saved_at = 0.0
+
+    @property
+    def id(self) -> int:
+        return self.job.pk
+
+    @property
+    def attempt(self) -> int:
+        return self.job.attempts
+
+    def progress(self, done: int, total: Optional[int] = None, message: Optional[str] = None, force: bool = False):
+        """Grava o progresso (no máximo uma vez por ``PROGRESS_SECONDS``, salvo ``force``)"""
+        self.job.progress = done
+        if total is not None:
+            self.job.total = total
+        if message is not None:
+            self.job.message = message[:255]
+        now = time.monotonic()
+        if not force and now - self._saved_at < PROGRESS_SECONDS:
+            return
+        self._saved_at = now
+        Job.objects.filter(pk=self.job.pk).update(
+            progress=self.job.progress, total=self.job.total, message=self.job.message,
+            heartbeat_at=timezone.now(),
+        )
+
+
+def requeue_stale(now=None) -> int:
+    """Devolve à fila as tarefas "executando" sem sinal de vida há mais de ``LEASE_SECONDS``"""
+    now = now or timezone.now()
+    stale = Job.objects.filter(
+        status=Job.Status.RUNNING,
+        heartbeat_at__lt=now - timedelta(seconds=settings.JOB_QUEUE['LEASE_SECONDS']),
+    )
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.Status.FAILED, error='Worker parou durante a execução', finished_at=now,
+    )
+    requeued = stale.update(status=Job.Status.QUEUED, worker='', run_at=now)
+    if failed or requeued:
+        logger.warning(f"{requeued} tarefas devolvidas à fila e {failed} encerradas (worker sem sinal de vida)")
+    return requeued
+
+
+def claim(worker: str, limit: int) -> List[int]:
+    """Reserva até ``limit`` tarefas prontas para ``worker``; retorna os ids"""
+    now = timezone.now()
+    candidates = (
+        Job.objects.filter(status=Job.Status.QUEUED, run_at__lte=now)
+        .order_by('run_at', 'pk')
+        .values_list('pk', flat=True)[:limit * 2]
+    )
+    claimed = []
+    for pk in candidates:
+        if len(claimed) >= limit:
+            break
+        # Só um worker vê a linha ainda "na fila": os demais atualizam zero linhas
+        if Job.objects.filter(pk=pk, status=Job.Status.QUEUED).update(
+            status=Job.Status.RUNNING, worker=worker, heartbeat_at=now, attempts=F('attempts') + 1,
+        ):
+            claimed.append(pk)
+    return claimed
+
+
+def retry_delay(attempt: int) -> float:
+    # Espera dobrada a cada falha, com variação para as tarefas não voltarem juntas
+    return settings.JOB_QUEUE['RETRY_BACKOFF'] * 2 ** (attempt - 1) * random.uniform(1, 1.25)
+
+
+def run_job(job_id: int, worker: str) -> str:
+    """Executa uma tarefa reservada por ``worker``; retorna o status final"""
+    autodiscover()
+    try:
+        job = Job.objects.get(pk=job_id)
+        owned = Job.objects.filter(pk=job_id, status=Job.Status.RUNNING, worker=worker)
+        try:
+            entry = registry.get(job.task)
+            if entry is None:
+                raise PermanentError(f"Tarefa desconhecida: {job.task}")
+            # Tarefas cedem a vez às requisições do admin no limite de concorrência do backend
+            with batch_priority():
+                result = entry.func(JobContext(job), *job.args, **job.kwargs)
+        except Exception as e:
+            error = ''.join(traceback.format_exception(e))
+            if isinstance(e, PermanentError) or job.attempts >= job.max_attempts:
+                logger.error(f"Tarefa {job} falhou (tentativa {job.attempts}/{job.max_attempts}): {e}")
+                owned.update(status=Job.Status.FAILED, error=error, finished_at=timezone.now())
+                return Job.Status.FAILED
+            delay = retry_delay(job.attempts)
+            logger.warning(f"Tarefa {job} falhou (tentativa {job.attempts}/{job.max_attempts}), "
+                           f"nova tentativa em {delay:.0f}s: {e}")
+            owned.update(status=Job.Status.QUEUED, error=error, worker='',
+                         run_at=timezone.now() + timedelta(seconds=delay))
+            return Job.Status.QUEUED
+        owned.update(
+            status=Job.Status.DONE, result=result, error='', finished_at=timezone.now(),
+            progress=job.total or job.progress,
+        )
+        logger.info(f"Tarefa {job} concluída")
+        return Job.Status.DONE
+    finally:
+        # Threads e processos do pool são reaproveitados entre tarefas
+        connections.close_all()
+
+
+def purge(days: Optional[int] = None) -> int:
+    """Apaga tarefas encerradas há mais de ``days`` dias"""
+    days = settings.JOB_QUEUE['KEEP_DAYS'] if days is None else days
+    deleted, _ = Job.objects.filter(
+        status__in=[Job.Status.DONE, Job.Status.FAILED],
+        finished_at__lt=timezone.now() - timedelta(days=days),
+    ).delete()
+    return deleted
+
+
+def _setup_process():
+    import django
+    django.setup()
+
+
+def make_pool(kind: str, workers: int):
+    if kind == 'process':
+        # spawn, como o pool de imagens: nada de conexões herdadas via fork
+        return ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'), initializer=_setup_process)
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+
+
+class Worker:
+    """Laço do ``run_jobs``: reserva tarefas enquanto houver vaga no pool"""
+
+    def __init__(self, workers: Optional[int] = None, pool: Optional[str] = None,
+                 poll: Optional[float] = None, name: Optional[str] = None):
+        options = settings.JOB_QUEUE
+        self.workers = workers or options['WORKERS']
+        self.pool = pool or options['POOL']
+        self.poll = poll or options['POLL_SECONDS']
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = threading.Event()
+
+    def stop(self, *args):
+        self.stopping.set()
+
+    def run(self, once: bool = False) -> Dict[str, int]:
+        """Executa tarefas até ``stop()`` (SIGTERM/SIGINT) ou, com ``once``, até a fila esvaziar"""
+        autodiscover()
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        counts = {status: 0 for status in Job.Status.values}
+        running = {}
+        purged_at = 0.0
+        with make_pool(self.pool, self.workers) as executor:
+            while not self.stopping.is_set():
+                if time.monotonic() - purged_at > PURGE_SECONDS:
+                    purge()
+                    purged_at = time.monotonic()
+                requeue_stale()
+                free = self.workers - len(running)
+                if free:
+                    for job_id in claim(self.name, free):
+                        running[executor.submit(run_job, job_id, self.name)] = job_id
+                if not running:
+                    if once:
+                        break
+                    self.stopping.wait(self.poll)
+                    continue
+
+                done, _ = wait(running, timeout=self.poll, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id = running.pop(future)
+                    try:
+                        counts[future.result()] += 1
+                    except Exception as e:
+                        # Ex.: processo do pool morreu; a tarefa volta à fila pelo lease
+                        logger.error(f"Worker perdeu a tarefa #{job_id}: {e}")
+                # Sinal de vida das tarefas em andamento, mesmo das que não informam progresso
+                Job.objects.filter(pk__in=running.values(), status=Job.Status.RUNNING).update(
+                    heartbeat_at=timezone.now()
+                )
+            # Parando: espera as tarefas em andamento terminarem
+            for future in running:
+                try:
+                    counts[future.result()] += 1
+                except Exception as e:
+                    logger.error(f"Worker perdeu a tarefa #{running[future]}: {e}")
+        return counts
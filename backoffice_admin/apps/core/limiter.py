@@ -0,0 +1,337 @@
+"""Limite adaptativo de requisições simultâneas ao backend Rust.
+
+Cada processo limita quantas chamadas ao backend ficam em andamento ao
+mesmo tempo (AIMD, como no controle de congestionamento do TCP):
+
+- cada resposta boa soma ``1/limite`` ao limite (≈ +1 por rodada
+  completa), até ``MAX_LIMIT``;
+- erro de rede, 5xx, 408/429 ou lentidão multiplicam o limite por
+  ``BACKOFF``. Uma redução por vez: respostas de chamadas que já estavam em
+  andamento na redução anterior não reduzem de novo.
+
+Lentidão é a média móvel curta da latência da rota (últimas ~10 chamadas)
+acima de ``TOLERANCE`` vezes a linha de base, uma média móvel longa
+(últimas ~500). Uma chamada lenta isolada (ex.: cache frio no backend) não
+reduz o limite; uma subida sustentada reduz, e a linha de base acompanha
+devagar mudanças duradouras.
+
+Chamadas acima do limite esperam numa fila com prioridade: interativas
+(requisições do admin) passam na frente das de lote (tarefas e comandos,
+marcadas com ``batch_priority()``), que também nunca ocupam mais que
+``BATCH_SHARE`` do limite. Fila cheia ou espera esgotada descarta a
+chamada (``Overloaded``) em vez de empilhar mais carga no backend.
+
+Com ``CLUSTER`` ligado e o cache no Redis, o mesmo AIMD roda também sobre
+um limite compartilhado por todos os processos (scripts Lua atômicos). Se
+o Redis falhar, vale só o limite local.
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+
+logger = logging.getLogger('rust_api')
+
+INTERACTIVE, BATCH = 'interactive', 'batch'
+RANK = {INTERACTIVE: 0, BATCH: 1}
+# Pesos das médias móveis exponenciais da latência (≈ 1/alfa amostras)
+RECENT_ALPHA = 0.1
+BASELINE_ALPHA = 0.002
+# Amostras de uma rota antes de julgar lentidão (a linha de base ainda não vale)
+WARMUP_SAMPLES = 20
+CLUSTER_POLL = 0.02
+
+_priority: ContextVar[str] = ContextVar('rust_api_priority', default=INTERACTIVE)
+
+
+@contextmanager
+def batch_priority():
+    """Chamadas ao backend dentro do bloco entram na fila como lote"""
+    token = _priority.set(BATCH)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def route_for(method: str, endpoint: str, params: Optional[Dict] = None) -> str:
+    """Rota usada na linha de base de latência (detalhe, listagem e páginas grandes separados)"""
+    parts = endpoint.strip('/').split('/')
+    route = f"{method} {parts[0]}{'/:id' if len(parts) > 1 else ''}"
+    if params and int(params.get('limit') or 0) > 100:
+        route += ':large'
+    return route
+
+
+class Overloaded(Exception):
+    """Chamada descartada: fila cheia ou tempo de espera esgotado"""
+
+
+class _Waiter:
+    __slots__ = ('priority', 'event', 'granted', 'cancelled')
+
+    def __init__(self, priority: str):
+        self.priority = priority
+        self.event = threading.Event()
+        self.granted = False
+        self.cancelled = False
+
+
+class RouteLatency:
+    """Médias móveis da latência de uma rota: recente e linha de base"""
+
+    __slots__ = ('recent', 'baseline', 'samples')
+
+    def __init__(self, latency: float):
+        self.recent = self.baseline = latency
+        self.samples = 1
+
+    def add(self, latency: float):
+        self.recent += (latency - self.recent) * RECENT_ALPHA
+        # Até ter amostras suficientes, a linha de base é a média simples
+        self.baseline += (latency - self.baseline) * max(BASELINE_ALPHA, 1 / (self.samples + 1))
+        self.samples += 1
+
+    def is_slow(self, tolerance: float) -> bool:
+        return self.samples >= WARMUP_SAMPLES and self.recent > tolerance * self.baseline
+
+
+class Permit:
+    __slots__ = ('priority', 'route', 'started', 'cluster_token')
+
+    def __init__(self, priority: str, route: str, cluster_token: Optional[str] = None):
+        self.priority = priority
+        self.route = route
+        self.started = time.monotonic()
+        self.cluster_token = cluster_token
+
+
+class ClusterLimiter:
+    """Limite compartilhado no Redis: permissões em uso num sorted set e o limite num hash"""
+
+    PERMITS_KEY = 'rust_api:concurrency:permits'
+    STATE_KEY = 'rust_api:concurrency:state'
+
+    # Remove permissões vencidas (processo morreu) e reserva uma se houver vaga
+    ACQUIRE = """
+    local clock = redis.call('TIME')
+    local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - tonumber(ARGV[3]))
+    local limit = tonumber(redis.call('HGET', KEYS[2], 'limit') or ARGV[2])
+    if redis.call('ZCARD', KEYS[1]) < math.floor(limit) then
+        redis.call('ZADD', KEYS[1], now, ARGV[1])
+        redis.call('EXPIRE', KEYS[1], ARGV[3])
+        return 1
+    end
+    return 0
+    """
+
+    # Devolve a permissão e aplica o AIMD ao limite compartilhado
+    RELEASE = """
+    local started = redis.call('ZSCORE', KEYS[1], ARGV[1])
+    redis.call('ZREM', KEYS[1], ARGV[1])
+    if not started then
+        return false
+    end
+    local limit = tonumber(redis.call('HGET', KEYS[2], 'limit') or ARGV[3])
+    if ARGV[2] == '1' then
+        local last_drop = tonumber(redis.call('HGET', KEYS[2], 'last_drop') or '0')
+        if tonumber(started) > last_drop then
+            local clock = redis.call('TIME')
+            limit = math.max(tonumber(ARGV[4]), limit * tonumber(ARGV[6]))
+            redis.call('HSET', KEYS[2], 'last_drop', tonumber(clock[1]) + tonumber(clock[2]) / 1000000)
+        end
+    else
+        limit = math.min(tonumber(ARGV[5]), limit + 1 / limit)
+    end
+    redis.call('HSET', KEYS[2], 'limit', tostring(limit))
+    return tostring(limit)
+    """
+
+    def __init__(self, options: Dict):
+        # Só o cache do Redis do Django expõe o cliente; com outro backend o modo cluster fica desligado
+        client = cache._cache.get_client(write=True)
+        self._acquire = client.register_script(self.ACQUIRE)
+        self._release = client.register_script(self.RELEASE)
+        self._client = client
+        self.initial = options['CLUSTER_INITIAL_LIMIT']
+        self.min_limit = options['MIN_LIMIT']
+        self.max_limit = options['CLUSTER_MAX_LIMIT']
+        self.backoff = options['BACKOFF']
+        self.lease = options['CLUSTER_LEASE_SECONDS']
+
+    def acquire(self, deadline: float) -> Optional[str]:
+        """Token da permissão, ou ``None`` se não houve vaga até ``deadline``"""
+        token = uuid.uuid4().hex
+        while True:
+            if self._acquire(keys=[self.PERMITS_KEY, self.STATE_KEY], args=[token, self.initial, self.lease]):
+                return token
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(CLUSTER_POLL)
+
+    def release(self, token: str, dropped: bool):
+        self._release(
+            keys=[self.PERMITS_KEY, self.STATE_KEY],
+            args=[token, int(dropped), self.initial, self.min_limit, self.max_limit, self.backoff],
+        )
+
+    def snapshot(self) -> Dict:
+        limit = self._client.hget(self.STATE_KEY, 'limit')
+        return {
+            'limit': round(float(limit), 1) if limit else self.initial,
+            'in_use': self._client.zcard(self.PERMITS_KEY),
+        }
+
+
+class AdaptiveLimiter:
+    def __init__(self, options: Optional[Dict] = None):
+        options = {**settings.RUST_CONCURRENCY, **(options or {})}
+        self.limit = float(options['INITIAL_LIMIT'])
+        self.min_limit = options['MIN_LIMIT']
+        self.max_limit = options['MAX_LIMIT']
+        self.backoff = options['BACKOFF']
+        self.tolerance = options['TOLERANCE']
+        self.batch_share = options['BATCH_SHARE']
+        self.max_queue = options['MAX_QUEUE']
+        self.queue_timeout = options['QUEUE_TIMEOUT']
+        self.inflight = {INTERACTIVE: 0, BATCH: 0}
+        self.queued = {INTERACTIVE: 0, BATCH: 0}
+        self.latencies: Dict[str, RouteLatency] = {}
+        self.counters = Counter()
+        self._waiters = []
+        self._order = itertools.count()
+        self._last_drop = 0.0
+        self._lock = threading.Lock()
+        self.cluster = None
+        if options['CLUSTER']:
+            try:
+                self.cluster = ClusterLimiter(options)
+            except Exception as e:
+                logger.warning(f"Limite de concorrência compartilhado desligado (cache sem Redis?): {e}")
+
+    def _can_run(self, priority: str) -> bool:
+        if sum(self.inflight.values()) >= int(self.limit):
+            return False
+        return priority == INTERACTIVE or self.inflight[BATCH] < max(1, int(self.limit * self.batch_share))
+
+    def _ahead_of(self, priority: str) -> int:
+        """Chamadas na fila que passariam na frente de uma nova com ``priority``"""
+        return sum(count for other, count in self.queued.items() if RANK[other] <= RANK[priority])
+
+    def _wake(self):
+        # Entrega as vagas livres direto aos primeiros da fila, por prioridade
+        while self._waiters:
+            waiter = self._waiters[0][2]
+            if waiter.cancelled:
+                heapq.heappop(self._waiters)
+                continue
+            if not self._can_run(waiter.priority):
+                return
+            heapq.heappop(self._waiters)
+            self.queued[waiter.priority] -= 1
+            self.inflight[waiter.priority] += 1
+            waiter.granted = True
+            waiter.event.set()
+
+    def _shed(self, priority: str, reason: str):
+        self.counters[f'shed_{priority}'] += 1
+        raise Overloaded(f"{reason} ({priority}, limite {int(self.limit)})")
+
+    def acquire(self, route: str) -> Permit:
+        """Reserva uma vaga (esperando na fila se preciso); levanta ``Overloaded`` se descartada"""
+        priority = _priority.get()
+        deadline = time.monotonic() + self.queue_timeout[priority]
+        with self._lock:
+            if not self._ahead_of(priority) and self._can_run(priority):
+                self.inflight[priority] += 1
+                waiter = None
+            elif self.queued[priority] >= self.max_queue[priority]:
+                self._shed(priority, 'fila cheia')
+            else:
+                waiter = _Waiter(priority)
+                self.queued[priority] += 1
+                heapq.heappush(self._waiters, (RANK[priority], next(self._order), waiter))
+
+        if waiter is not None and not waiter.event.wait(self.queue_timeout[priority]):
+            with self._lock:
+                if not waiter.granted:
+                    waiter.cancelled = True
+                    self.queued[priority] -= 1
+                    self._shed(priority, 'espera esgotada')
+
+        permit = Permit(priority, route)
+        if self.cluster is not None:
+            try:
+                permit.cluster_token = self.cluster.acquire(deadline)
+            except Exception as e:
+                # Redis fora do ar: segue só com o limite local
+                logger.warning(f"Limite compartilhado indisponível: {e}")
+            else:
+                if permit.cluster_token is None:
+                    self._release_local(permit)
+                    with self._lock:
+                        self._shed(priority, 'limite do cluster')
+        return permit
+
+    def release(self, permit: Permit, latency: float, dropped: bool = False):
+        """Devolve a vaga e ajusta o limite com o resultado da chamada"""
+        with self._lock:
+            slow = False
+            if not dropped:
+                # Erros não entram na latência: um timeout rápido ou lento não diz nada sobre a rota
+                route = self.latencies.get(permit.route)
+                if route is None:
+                    self.latencies[permit.route] = RouteLatency(latency)
+                else:
+                    route.add(latency)
+                    slow = route.is_slow(self.tolerance)
+            if dropped or slow:
+                if permit.started > self._last_drop:
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                    self._last_drop = time.monotonic()
+                    self.counters['drops'] += 1
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._release_local(permit)
+        if permit.cluster_token is not None:
+            try:
+                self.cluster.release(permit.cluster_token, dropped or slow)
+            except Exception as e:
+                logger.warning(f"Limite compartilhado indisponível: {e}")
+
+    def _release_local(self, permit: Permit):
+        with self._lock:
+            self.inflight[permit.priority] -= 1
+            self._wake()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            stats = {
+                'limit': round(self.limit, 1),
+                'inflight': sum(self.inflight.values()),
+                'inflight_batch': self.inflight[BATCH],
+                'queued_interactive': self.queued[INTERACTIVE],
+                'queued_batch': self.queued[BATCH],
+                **self.counters,
+            }
+        if self.cluster is not None:
+            try:
+                stats['cluster'] = self.cluster.snapshot()
+            except Exception:
+                pass
+        return stats
+
+
+# Um limitador por processo, criado no primeiro uso
+rust_limiter = SimpleLazyObject(AdaptiveLimiter)
@@ -0,0 +1,17 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Cria os diretórios de logs, mídia, estáticos e templates (settings.REQUIRED_DIRECTORIES)'
+    # Os diretórios podem faltar justamente quando o comando é necessário
+    requires_system_checks = []
+
+    def handle(self, *args, **options):
+        for path in map(Path, settings.REQUIRED_DIRECTORIES):
+            if path.is_dir():
+                continue
+            path.mkdir(parents=True, exist_ok=True)
+            self.stdout.write(self.style.SUCCESS(f'✅ Criado: {path}'))
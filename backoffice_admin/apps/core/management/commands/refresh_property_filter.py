@@ -0,0 +1,32 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.bloom import build_id_filter, store_id_filter
+from apps.core.limiter import batch_priority
+from apps.core.services import rust_api
+
+
+class Command(BaseCommand):
+    help = 'Monta o filtro de Bloom dos ids de propriedades a partir da listagem do backend Rust'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=500, help='Itens por página da listagem')
+        parser.add_argument('--headroom', type=float, default=1.5,
+                            help='Capacidade do filtro em relação ao total atual')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        with batch_priority():
+            ids = [item.id for item in rust_api.iter_properties(limit=options['limit'], fields=['id'])]
+        if not ids:
+            raise CommandError('Nenhuma propriedade retornada; filtro mantido')
+
+        bloom = build_id_filter(ids, capacity=int(len(ids) * options['headroom']),
+                                error_rate=settings.PROPERTY_FILTER_ERROR_RATE)
+        store_id_filter(bloom)
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Filtro com {len(ids)} ids (maior id {bloom.max_id}, {len(bloom.data) / 1024:.0f} KB) '
+            f'em {time.perf_counter() - start:.1f}s'
+        ))
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.core.jobs import Worker
+
+
+class Command(BaseCommand):
+    help = 'Executa as tarefas em segundo plano (fila em apps/core/jobs.py)'
+
+    def add_arguments(self, parser):
+        options = settings.JOB_QUEUE
+        parser.add_argument('--workers', type=int, default=options['WORKERS'], help='Tarefas simultâneas')
+        parser.add_argument('--pool', choices=['thread', 'process'], default=options['POOL'],
+                            help='thread: chamadas de rede (padrão); process: tarefas que usam CPU')
+        parser.add_argument('--poll', type=float, default=options['POLL_SECONDS'],
+                            help='Segundos entre consultas à fila vazia')
+        parser.add_argument('--once', action='store_true', help='Executa o que estiver pronto e sai')
+
+    def handle(self, *args, **options):
+        worker = Worker(workers=options['workers'], pool=options['pool'], poll=options['poll'])
+        kind = 'threads' if options['pool'] == 'thread' else 'processos'
+        self.stdout.write(f"Worker {worker.name}: {worker.workers} {kind}")
+        counts = worker.run(once=options['once'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {counts['done']} tarefas concluídas, {counts['queued']} reagendadas, {counts['failed']} com falha"
+        ))
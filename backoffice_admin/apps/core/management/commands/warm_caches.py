@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.warmup import warm_caches
+
+
+class Command(BaseCommand):
+    help = 'Aquece o cache com as leituras mais frequentes do backend Rust (rodar após o deploy)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=5, help='Páginas de propriedades')
+        parser.add_argument('--limit', type=int, default=20, help='Itens por página (o mesmo usado pelas telas)')
+        parser.add_argument('--top', type=int, default=100, help='Propriedades mais acessadas')
+        parser.add_argument('--user-pages', type=int, default=2, help='Páginas de usuários')
+        parser.add_argument('--workers', type=int, default=8, help='Requisições simultâneas')
+        parser.add_argument('--min-coverage', type=float, default=0.0,
+                            help='Falha se a cobertura ficar abaixo desta fração (0-1)')
+
+    def handle(self, *args, **options):
+        summary = warm_caches(
+            pages=options['pages'], limit=options['limit'], top=options['top'],
+            user_pages=options['user_pages'], workers=options['workers'],
+        )
+        for group, stats in summary['groups'].items():
+            self.stdout.write(f"  {group}: {stats['warmed']}/{stats['requested']}")
+
+        coverage = summary['warmed'] / summary['requested'] if summary['requested'] else 1.0
+        message = (
+            f"{summary['warmed']}/{summary['requested']} entradas ({coverage:.0%}) "
+            f"em {summary['seconds']:.1f}s"
+        )
+        if coverage < options['min_coverage']:
+            raise CommandError(f'Cobertura insuficiente: {message}')
+        self.stdout.write(self.style.SUCCESS(f'✅ Cache aquecido: {message}'))
@@ -0,0 +1,194 @@
+"""Entrega de arquivos de ``MEDIA_ROOT``.
+
+- Atrás de um proxy, o arquivo é entregue pelo próprio proxy
+  (``X-Accel-Redirect`` no nginx, ``X-Sendfile`` no Apache), que também
+  cuida de ``Range``;
+- sem proxy, ``FileResponse`` deixa o servidor WSGI usar
+  ``wsgi.file_wrapper`` (``os.sendfile`` no gunicorn), inclusive para
+  requisições ``Range``, que são atendidas com o arquivo já posicionado.
+
+Variantes endereçadas pelo conteúdo (``images/ab/cd/<sha256>/...``) nunca
+mudam: recebem ETag forte derivado do hash e ``Cache-Control: immutable``.
+
+Só imagens e vídeos da lista ``MEDIA_CONTENT_TYPES`` são entregues para
+exibição no navegador; o resto vai como ``application/octet-stream`` e
+download (``Content-Disposition: attachment``), e toda resposta leva
+``Content-Security-Policy: sandbox``: um HTML ou SVG enviado como foto
+não roda scripts na origem do admin.
+"""
+import os
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import content_disposition_header
+from django.views.decorators.http import require_safe
+
+CONTENT_ADDRESSED = re.compile(r'^images/[0-9a-f]{2}/[0-9a-f]{2}/(?P<hash>[0-9a-f]{64})/(?P<name>[^/]+)$')
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+DEFAULT_CACHE = 'public, max-age=3600'
+# Prefixos com dados internos (planilhas e relatórios de importação, exportações): só staff
+PRIVATE_PREFIXES = ('imports/', 'exports/')
+# Fora de caches compartilhados e do disco do navegador
+PRIVATE_CACHE = 'private, no-store'
+BLOCK_SIZE = 256 * 1024
+# Extensão -> tipo entregue para exibição; qualquer outra vira download
+MEDIA_CONTENT_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+    '.avif': 'image/avif',
+    '.heic': 'image/heic',
+    '.mp4': 'video/mp4',
+    '.mov': 'video/quicktime',
+    '.webm': 'video/webm',
+}
+DOWNLOAD_CONTENT_TYPE = 'application/octet-stream'
+
+
+class FileRange:
+    """Janela ``[start, start + length)`` de um arquivo aberto
+
+    Expõe ``fileno()`` com o arquivo já posicionado em ``start``: com
+    ``Content-Length`` igual a ``length``, o ``sendfile`` do gunicorn envia
+    exatamente o intervalo. Sem ``sendfile``, ``read`` respeita o limite.
+    """
+
+    def __init__(self, handle, start: int, length: int):
+        self.handle = handle
+        self.remaining = length
+        handle.seek(start)
+
+    def read(self, size: int = -1) -> bytes:
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size < 0 else min(size, self.remaining)
+        data = self.handle.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self) -> int:
+        return self.handle.fileno()
+
+    def close(self):
+        self.handle.close()
+
+
+def parse_range(header: str, size: int):
+    """``(início, fim)`` inclusivos de um único intervalo ``bytes=``
+
+    Retorna ``None`` para ignorar o cabeçalho (ausente, inválido ou com
+    vários intervalos) e ``False`` quando o intervalo não é satisfazível.
+    """
+    match = RANGE_HEADER.match(header.strip()) if header else None
+    if not match or not (match.group(1) or match.group(2)):
+        return None
+    first, last = match.group(1), match.group(2)
+    if not first:
+        # bytes=-N: os últimos N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def _etag(path: str, stat) -> tuple:
+    match = CONTENT_ADDRESSED.match(path)
+    if match:
+        return f'"{match["hash"][:32]}-{match["name"]}"', IMMUTABLE_CACHE
+    return f'W/"{stat.st_mtime_ns:x}-{stat.st_size:x}"', DEFAULT_CACHE
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    weak = etag.removeprefix('W/')
+    return any(tag.strip().removeprefix('W/') == weak for tag in header.split(','))
+
+
+def _proxy_response(path: str, full_path: str, content_type: str):
+    backend = settings.MEDIA_SENDFILE_BACKEND
+    if backend == 'nginx':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = f"{settings.MEDIA_ACCEL_PREFIX.rstrip('/')}/{path}"
+        return response
+    if backend == 'apache':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = full_path
+        return response
+    return None
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve um arquivo de ``MEDIA_ROOT`` com ETag, cache e ``Range``"""
+    if any(part.startswith('.') for part in Path(path).parts):
+        raise Http404
+    if path.startswith(PRIVATE_PREFIXES) and not request.user.is_staff:
+        raise Http404
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(full_path)
+    except (OSError, ValueError):
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    etag, cache_control = _etag(path, stat)
+    if path.startswith(PRIVATE_PREFIXES):
+        cache_control = PRIVATE_CACHE
+    if _etag_matches(request.headers.get('If-None-Match'), etag):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        response['Cache-Control'] = cache_control
+        return response
+
+    suffix = Path(path).suffix.lower()
+    content_type = MEDIA_CONTENT_TYPES.get(suffix, DOWNLOAD_CONTENT_TYPE)
+    response = _proxy_response(path, full_path, content_type)
+    if response is None:
+        response = _local_response(request, full_path, stat.st_size, etag, content_type)
+
+    if suffix not in MEDIA_CONTENT_TYPES:
+        response['Content-Disposition'] = content_disposition_header(True, Path(path).name)
+    response['Content-Security-Policy'] = 'sandbox'
+    response['ETag'] = etag
+    response['Cache-Control'] = cache_control
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def _local_response(request, full_path: str, size: int, etag: str, content_type: str):
+    byte_range = parse_range(request.headers.get('Range'), size)
+    if_range = request.headers.get('If-Range')
+    if byte_range is not None and if_range and if_range.strip() != etag:
+        # O arquivo mudou desde a primeira parte: envia tudo
+        byte_range = None
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    handle = open(full_path, 'rb')
+    if byte_range is None:
+        response = FileResponse(handle, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = FileResponse(FileRange(handle, start, end - start + 1), content_type=content_type, status=206)
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response.block_size = BLOCK_SIZE
+    return response
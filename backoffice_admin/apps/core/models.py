@@ -0,0 +1,60 @@
+from django.db import models
+from django.db.models import Q
+
+
+class Job(models.Model):
+    """Tarefa da fila em segundo plano (ver ``apps.core.jobs``)"""
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Na fila"
+        RUNNING = "running", "Executando"
+        DONE = "done", "Concluída"
+        FAILED = "failed", "Falhou"
+
+    ACTIVE = (Status.QUEUED, Status.RUNNING)
+
+    task = models.CharField("tarefa", max_length=100)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    dedupe_key = models.CharField("chave de deduplicação", max_length=200, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    attempts = models.PositiveSmallIntegerField("tentativas", default=0)
+    max_attempts = models.PositiveSmallIntegerField("máximo de tentativas", default=3)
+    run_at = models.DateTimeField("executar a partir de", db_index=True)
+    progress = models.PositiveIntegerField("progresso", default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    message = models.CharField("mensagem", max_length=255, blank=True)
+    result = models.JSONField("resultado", null=True, blank=True)
+    error = models.TextField("erro", blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    heartbeat_at = models.DateTimeField("último sinal de vida", null=True, blank=True)
+    created_by = models.CharField("criada por", max_length=150, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "tarefa"
+        verbose_name_plural = "tarefas"
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["status", "run_at"])]
+        constraints = [
+            # Uma tarefa ativa por chave; concluídas e com falha não bloqueiam novas
+            models.UniqueConstraint(
+                fields=["dedupe_key"],
+                condition=Q(status__in=["queued", "running"]),
+                name="core_job_active_dedupe_key",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk}"
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (self.Status.DONE, self.Status.FAILED)
+
+    @property
+    def percent(self):
+        if not self.total:
+            return None
+        return min(100, round(100 * self.progress / self.total))
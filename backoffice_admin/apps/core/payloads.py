@@ -0,0 +1,47 @@
+"""Tipos das respostas do backend Rust.
+
+Espelham as structs ``Property`` e ``User`` de ``rust_backend/src/main.rs``.
+Com ``slots=True`` cada objeto ocupa bem menos memória que o dicionário
+equivalente, o que conta nas varreduras completas (sync, exportação,
+análises), e os campos passam a ser checados pelo editor/type checker.
+"""
+from dataclasses import dataclass, fields
+from typing import Dict, List, Type, TypeVar
+
+T = TypeVar('T')
+
+
+class PayloadMixin:
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls: Type[T], data: Dict) -> T:
+        try:
+            return cls(**data)
+        except TypeError:
+            # Campos a mais (versão nova do backend) são ignorados; os que faltam ficam no padrão
+            return cls(**{name: data[name] for name in cls.field_names() if name in data})
+
+    @classmethod
+    def field_names(cls) -> List[str]:
+        return [field.name for field in fields(cls)]
+
+
+@dataclass(slots=True)
+class PropertyPayload(PayloadMixin):
+    id: int
+    title: str = ''
+    description: str = ''
+    price: float = 0.0
+    location: str = ''
+    property_type: str = ''
+    status: str = ''
+
+
+@dataclass(slots=True)
+class UserPayload(PayloadMixin):
+    id: int
+    name: str = ''
+    email: str = ''
+    role: str = ''
+
@@ -0,0 +1,174 @@
+"""Limite de requisições por cliente (token bucket) para tudo que passa pelo Django.
+
+Cada cliente tem um balde por regra de rota (``RATE_LIMIT['RULES']``): o
+balde enche ``rate`` fichas por segundo até ``burst`` e cada requisição
+gasta uma. Balde vazio responde 429 com ``Retry-After``.
+
+O cliente é, nesta ordem: o usuário autenticado, uma chave de
+``RATE_LIMIT['API_KEYS']`` no header ``X-API-Key`` ou o IP. Chaves
+desconhecidas contam pelo IP; do contrário bastaria trocar a chave a cada
+requisição para ganhar um balde novo.
+
+Os baldes ficam no Redis e são atualizados por um script Lua (ler, reabastecer
+e gastar numa operação atômica, uma ida ao Redis por requisição). Sem Redis,
+ou se ele falhar, cada processo usa baldes em memória por ``FALLBACK_SECONDS``
+antes de tentar o Redis de novo; o limite então vale por processo.
+
+Toda resposta limitada leva os headers ``RateLimit-Limit``,
+``RateLimit-Remaining``, ``RateLimit-Reset`` e ``RateLimit-Policy``
+(draft IETF "RateLimit header fields for HTTP").
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+
+logger = logging.getLogger('django')
+
+# Fichas, instante da última atualização; expira quando o balde estaria cheio de novo
+TAKE = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+return {allowed, tostring(tokens)}
+"""
+
+
+class MemoryBuckets:
+    """Baldes no próprio processo (LRU limitado a ``max_keys`` clientes)"""
+
+    def __init__(self, max_keys: int = 10_000):
+        self.max_keys = max_keys
+        self._buckets: 'OrderedDict[str, Tuple[float, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, tokens
+
+
+class RedisBuckets:
+    def __init__(self, alias: str):
+        # AttributeError com caches que não são o RedisCache do Django
+        client = caches[alias]._cache.get_client(write=True)
+        self._take = client.register_script(TAKE)
+
+    def take(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        allowed, tokens = self._take(keys=[key], args=[rate, burst])
+        return bool(allowed), float(tokens)
+
+
+class RateLimiter:
+    def __init__(self, options: Optional[Dict] = None):
+        options = {**settings.RATE_LIMIT, **(options or {})}
+        # Prefixo -> (fichas por segundo, rajada); a primeira regra que casar vale
+        self.rules = [(prefix, float(rate), int(burst)) for prefix, (rate, burst) in options['RULES'].items()]
+        self.default = (float(options['DEFAULT'][0]), int(options['DEFAULT'][1]))
+        self.exempt = tuple(options['EXEMPT'])
+        self.api_keys = {self._digest(key) for key in options['API_KEYS']}
+        self.trusted_proxies = options['TRUSTED_PROXIES']
+        self.fallback_seconds = options['FALLBACK_SECONDS']
+        self.memory = MemoryBuckets()
+        self._redis_retry_at = 0.0
+        try:
+            self.redis = RedisBuckets(options['CACHE_ALIAS'])
+        except Exception as e:
+            logger.warning(f"Rate limit em memória, por processo (cache sem Redis?): {e}")
+            self.redis = None
+
+    @staticmethod
+    def _digest(value: str) -> str:
+        return hashlib.sha256(value.encode()).hexdigest()[:16]
+
+    def rule_for(self, path: str) -> Optional[Tuple[str, float, int]]:
+        if path.startswith(self.exempt):
+            return None
+        for prefix, rate, burst in self.rules:
+            if path.startswith(prefix):
+                return prefix, rate, burst
+        return ('*', *self.default)
+
+    def client_ip(self, request) -> str:
+        # Atrás de N proxies confiáveis, o IP do cliente é o N-ésimo da direita no X-Forwarded-For
+        if self.trusted_proxies:
+            forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+            if len(forwarded) >= self.trusted_proxies:
+                return forwarded[-self.trusted_proxies]
+        return request.META.get('REMOTE_ADDR', '')
+
+    def client_key(self, request) -> str:
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return f"user:{user.pk}"
+        api_key = request.headers.get('X-API-Key')
+        if api_key:
+            digest = self._digest(api_key)
+            if digest in self.api_keys:
+                return f"key:{digest}"
+        return f"ip:{self.client_ip(request)}"
+
+    def take(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        if self.redis is not None and time.monotonic() >= self._redis_retry_at:
+            try:
+                return self.redis.take(key, rate, burst)
+            except Exception as e:
+                # Sem pagar o timeout do Redis a cada requisição: memória por um tempo
+                self._redis_retry_at = time.monotonic() + self.fallback_seconds
+                logger.warning(f"Rate limit em memória por {self.fallback_seconds}s (Redis indisponível): {e}")
+        return self.memory.take(key, rate, burst)
+
+
+class RateLimitMiddleware:
+    """Aplica o ``RateLimiter``; fica depois do ``AuthenticationMiddleware`` para ver o usuário"""
+
+    def __init__(self, get_response):
+        if not settings.RATE_LIMIT['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.limiter = RateLimiter()
+
+    def __call__(self, request):
+        rule = self.limiter.rule_for(request.path_info)
+        if rule is None:
+            return self.get_response(request)
+
+        prefix, rate, burst = rule
+        allowed, tokens = self.limiter.take(f"ratelimit:{prefix}:{self.limiter.client_key(request)}", rate, burst)
+        if allowed:
+            response = self.get_response(request)
+        else:
+            response = JsonResponse({'error': 'Limite de requisições excedido'}, status=429)
+            response['Retry-After'] = str(math.ceil((1 - tokens) / rate))
+        response['RateLimit-Limit'] = str(burst)
+        response['RateLimit-Remaining'] = str(int(tokens))
+        response['RateLimit-Reset'] = str(math.ceil((burst - tokens) / rate))
+        response['RateLimit-Policy'] = f"{burst};w={math.ceil(burst / rate)}"
+        return response
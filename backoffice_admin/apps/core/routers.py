@@ -0,0 +1,154 @@
+"""Roteamento primário/réplicas de leitura.
+
+- Escritas vão sempre para ``default``;
+- leituras vão para uma réplica com atraso de replicação aceitável
+  (``DB_REPLICA_MAX_LAG``), ou para ``default`` se nenhuma estiver em dia;
+- depois de uma escrita, as leituras do mesmo contexto (requisição,
+  comando) ficam no primário, e ``PrimaryPinMiddleware`` estende isso às
+  requisições seguintes do mesmo cliente por ``DB_PRIMARY_PIN_SECONDS``
+  (ex.: o redirect do admin depois de salvar);
+- ``use_replica()`` fixa as leituras de um bloco nas réplicas (relatórios e
+  exportações) e ``use_primary()`` faz o contrário.
+
+Os aliases das réplicas vêm de ``settings.DATABASE_REPLICAS``.
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger('rust_api')
+
+PIN_COOKIE = 'db_primary_pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# Segundos de atraso da réplica (0 quando já reproduziu todo o WAL recebido)
+POSTGRES_LAG_SQL = (
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+_pinned = ContextVar('db_pinned_primary', default=False)
+_wrote = ContextVar('db_wrote', default=False)
+_target = ContextVar('db_read_target', default=None)
+
+_lag_lock = threading.Lock()
+_lag_checked: Dict[str, tuple] = {}
+
+
+def replica_lag(alias: str) -> Optional[float]:
+    """Atraso da réplica em segundos; ``None`` se não foi possível consultar"""
+    connection = connections[alias]
+    try:
+        if connection.vendor != 'postgresql':
+            return 0.0
+        with connection.cursor() as cursor:
+            cursor.execute(POSTGRES_LAG_SQL)
+            return float(cursor.fetchone()[0])
+    except Exception as e:
+        logger.warning(f"Réplica '{alias}' indisponível: {e}")
+        return None
+
+
+def _is_healthy(alias: str) -> bool:
+    # O atraso é consultado no máximo uma vez por intervalo, por processo
+    now = time.monotonic()
+    checked = _lag_checked.get(alias)
+    if checked is None or now - checked[0] >= settings.DB_REPLICA_LAG_CHECK_INTERVAL:
+        with _lag_lock:
+            checked = _lag_checked.get(alias)
+            if checked is None or now - checked[0] >= settings.DB_REPLICA_LAG_CHECK_INTERVAL:
+                lag = replica_lag(alias)
+                healthy = lag is not None and lag <= settings.DB_REPLICA_MAX_LAG
+                if lag is not None and not healthy:
+                    logger.warning(f"Réplica '{alias}' atrasada {lag:.1f}s; lendo do primário")
+                checked = _lag_checked[alias] = (now, healthy)
+    return checked[1]
+
+
+def read_replica() -> str:
+    """Alias de uma réplica em dia (escolhida ao acaso) ou ``default``"""
+    healthy = [alias for alias in settings.DATABASE_REPLICAS if _is_healthy(alias)]
+    return random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def use_replica():
+    """Leituras do bloco nas réplicas, mesmo após escritas (relatórios, exportações)"""
+    token = _target.set('replica')
+    try:
+        yield
+    finally:
+        _target.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Leituras do bloco no primário"""
+    token = _target.set('primary')
+    try:
+        yield
+    finally:
+        _target.reset(token)
+
+
+def pin_primary():
+    """Leituras seguintes do contexto atual no primário"""
+    _pinned.set(True)
+
+
+def wrote_primary() -> bool:
+    """Houve escrita no contexto atual: o ``PrimaryPinMiddleware`` vai gravar o cookie"""
+    return _wrote.get()
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        target = _target.get()
+        if target == 'primary' or (target is None and _pinned.get()):
+            return DEFAULT_DB_ALIAS
+        return read_replica()
+
+    def db_for_write(self, model, **hints):
+        _pinned.set(True)
+        _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas têm os mesmos dados do primário
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class PrimaryPinMiddleware:
+    """Leitura das próprias escritas entre requisições
+
+    Requisições com método não seguro (ou com o cookie de uma escrita
+    recente) leem do primário; uma escrita grava/renova o cookie.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        pinned = request.method not in SAFE_METHODS or PIN_COOKIE in request.COOKIES
+        pinned_token, wrote_token = _pinned.set(pinned), _wrote.set(False)
+        try:
+            response = self.get_response(request)
+            if _wrote.get():
+                response.set_cookie(PIN_COOKIE, '1', max_age=settings.DB_PRIMARY_PIN_SECONDS,
+                                    httponly=True, samesite='Lax')
+            return response
+        finally:
+            _pinned.reset(pinned_token)
+            _wrote.reset(wrote_token)
@@ -0,0 +1,42 @@
+"""Seleção de uma ação do admin guardada em JSON nos argumentos de uma tarefa.
+
+Em vez do queryset (ou da lista de ids), a tarefa recebe o que o admin
+recebeu: os filtros do changelist (parâmetros GET: ``list_filter``, busca,
+``date_hierarchy``) e, se a seleção não for "selecionar todos", os pks
+marcados na página (no máximo ``list_max_show_all``). O worker refaz o
+queryset com o ``ModelAdmin`` registrado, como o changelist faria; nada
+depende da versão do Django ou do formato interno de ``Query``.
+"""
+from typing import Dict
+
+from django.contrib import admin
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.auth import get_user_model
+from django.http import HttpRequest, QueryDict
+
+from .jobs import PermanentError
+
+
+def dump_selection(request) -> Dict:
+    """Seleção da ação do admin em andamento (``request`` é o POST da ação)"""
+    select_across = request.POST.get('select_across') == '1'
+    return {
+        'filters': request.GET.urlencode(),
+        'pks': None if select_across else request.POST.getlist(ACTION_CHECKBOX_NAME),
+    }
+
+
+def load_selection(model, selection: Dict, username: str):
+    """Queryset de ``dump_selection``, com as permissões e filtros de ``username``"""
+    request = HttpRequest()
+    request.method = 'GET'
+    request.GET = QueryDict(selection['filters'])
+    try:
+        request.user = get_user_model()._default_manager.get_by_natural_key(username)
+        queryset = admin.site._registry[model].get_changelist_instance(request).queryset
+    except (get_user_model().DoesNotExist, IncorrectLookupParameters) as e:
+        raise PermanentError(f"Seleção inválida: {e}")
+    if selection['pks'] is not None:
+        queryset = queryset.filter(pk__in=selection['pks'])
+    return queryset
@@ -1,12 +1,42 @@
-import requests
+import gzip
+import hashlib
 import logging
+import time
 from django.conf import settings
 from django.core.cache import cache
-from typing import Dict, Any, Optional
+from django.utils.functional import SimpleLazyObject
+from itertools import islice
+from typing import Dict, Any, Callable, Iterable, Iterator, Optional, Sequence, Tuple
+from urllib.parse import urlencode
 import json
 
+from . import changefeed, codec
+from .access import AccessCounter
+from .bloom import property_id_filter
+from .cache_policy import AdaptiveCachePolicy
+from .limiter import Overloaded, route_for, rust_limiter
+from .payloads import PropertyPayload, UserPayload
+from .singleflight import SingleFlight
+
 logger = logging.getLogger('rust_api')
 
+# Propriedades mais acessadas (usadas pelo warm_caches)
+property_access = AccessCounter('properties')
+# Frequência e TTL adaptativo por chave do cache (por processo)
+cache_policy = SimpleLazyObject(AdaptiveCachePolicy)
+# GETs iguais e simultâneos viram uma só requisição
+in_flight = SingleFlight()
+
+# Erros do cliente que ainda valem nova tentativa; os demais 4xx (ex.: 404) não mudam repetindo
+RETRYABLE_CLIENT_ERRORS = {408, 429}
+NOT_FOUND_SUFFIX = ':missing'
+# Versão das listagens de cada recurso; muda a cada lote do feed de mudanças
+VERSION_KEY = 'rust_api:version:{resource}'
+# Campos que as listagens usam (sem a descrição, o maior campo)
+LIST_FIELDS = ('id', 'title', 'price', 'status')
+# Limite de operações por POST properties/batch (MAX_BATCH_OPS em rust_backend/src/main.rs)
+MAX_BATCH_OPS = 1000
+
 class RustAPIService:
     """Serviço para comunicação com o backend Rust"""
     
@@ -14,14 +44,19 @@ class RustAPIService:
         self.base_url = settings.API_SETTINGS['RUST_API_BASE_URL']
         self.timeout = settings.API_SETTINGS['API_TIMEOUT']
         self.retries = settings.API_SETTINGS['API_RETRIES']
+        self.compress_min_bytes = settings.API_SETTINGS['REQUEST_COMPRESSION_MIN_BYTES']
         self.api_key = settings.RUST_API_KEY
         self.api_secret = settings.RUST_API_SECRET
     
     def _get_headers(self) -> Dict[str, str]:
         """Retorna headers padrão para requisições"""
+        # gzip sempre; br/zstd quando o urllib3 encontra brotli/zstandard instalados
+        from urllib3.util.request import ACCEPT_ENCODING
+
         headers = {
             'Content-Type': 'application/json',
             'Accept': 'application/json',
+            'Accept-Encoding': ACCEPT_ENCODING,
         }
         
         if self.api_key:
@@ -29,13 +64,36 @@ class RustAPIService:
         
         return headers
     
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, 
-                     params: Optional[Dict] = None) -> Optional[Dict]:
-        """Faz requisição para a API Rust com retry"""
+    def _request(self, method: str, endpoint: str, data: Optional[Dict] = None,
+                 params: Optional[Dict] = None, limited: bool = True, retry: bool = True) -> Tuple[int, Any]:
+        """Faz requisição para a API Rust com retry; retorna ``(status, json)``
+        
+        ``status`` é 0 quando todas as tentativas falharam por rede/5xx ou a
+        chamada foi descartada pelo limite de concorrência (``limited``).
+        Com ``retry=False`` há uma única tentativa: para escritas não
+        idempotentes, um timeout não significa que o backend não gravou.
+        """
+        # Importado no primeiro uso: o boot de comandos e workers não paga o custo
+        import requests
+
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         headers = self._get_headers()
+        body = codec.dumps(data) if data is not None else None
+        if body is not None and self.compress_min_bytes and len(body) >= self.compress_min_bytes:
+            # Lotes grandes: o backend Rust descomprime o corpo (RequestDecompressionLayer)
+            body = gzip.compress(body, compresslevel=5)
+            headers['Content-Encoding'] = 'gzip'
         
-        for attempt in range(self.retries):
+        route = route_for(method, endpoint, params)
+        attempts = self.retries if retry else 1
+        for attempt in range(attempts):
+            try:
+                permit = rust_limiter.acquire(route) if limited else None
+            except Overloaded as e:
+                # Sem nova tentativa: repetir só aumentaria a fila
+                logger.warning(f"{method} {url}: descartada pelo limite de concorrência: {e}")
+                return 0, None
+            started, dropped = time.perf_counter(), True
             try:
                 logger.info(f"Tentativa {attempt + 1}: {method} {url}")
                 
@@ -43,36 +101,127 @@ class RustAPIService:
                     method=method,
                     url=url,
                     headers=headers,
-                    json=data,
+                    data=body,
                     params=params,
                     timeout=self.timeout
                 )
+                # Sinais de sobrecarga do backend reduzem o limite
+                dropped = response.status_code >= 500 or response.status_code in RETRYABLE_CLIENT_ERRORS
                 
+                if 400 <= response.status_code < 500 and response.status_code not in RETRYABLE_CLIENT_ERRORS:
+                    logger.warning(f"{method} {url}: {response.status_code} (sem nova tentativa)")
+                    return response.status_code, None
                 response.raise_for_status()
-                return response.json()
+                return response.status_code, codec.loads(response.content) if response.content else None
                 
-            except requests.exceptions.RequestException as e:
+            except (requests.exceptions.RequestException, ValueError) as e:
                 logger.error(f"Erro na tentativa {attempt + 1}: {e}")
-                if attempt == self.retries - 1:
-                    logger.error(f"Falha após {self.retries} tentativas")
-                    return None
+                if attempt == attempts - 1:
+                    logger.error(f"Falha após {attempts} tentativas")
+                    return 0, None
+            finally:
+                if permit is not None:
+                    rust_limiter.release(permit, time.perf_counter() - started, dropped)
         
-        return None
+        return 0, None
+    
+    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, 
+                     params: Optional[Dict] = None) -> Optional[Dict]:
+        """Faz requisição para a API Rust com retry"""
+        return self._request(method, endpoint, data=data, params=params)[1]
+    
+    @staticmethod
+    def cache_key(endpoint: str, params: Optional[Dict] = None) -> str:
+        """Chave de cache estável entre processos (``hash()`` de str muda a cada processo)"""
+        encoded = json.dumps(params, sort_keys=True, default=str)
+        return f"rust_api_{endpoint}_{hashlib.md5(encoded.encode()).hexdigest()}"
+    
+    @staticmethod
+    def version_key(endpoint: str) -> str:
+        return VERSION_KEY.format(resource=endpoint.split('/')[0])
+    
+    def bump_version(self, resource: str):
+        """Invalida de uma vez todas as listagens em cache de ``resource``"""
+        # Relógio em vez de incr: se a chave sumir do Redis, nenhuma versão antiga volta a valer
+        cache.set(self.version_key(resource), time.time_ns(), timeout=None)
+    
+    def invalidate(self, endpoint: str):
+        """Apaga a resposta em cache de ``endpoint`` (sem parâmetros) e a marca de não encontrado"""
+        key = self.cache_key(endpoint)
+        cache.delete_many([key, key + NOT_FOUND_SUFFIX])
+        cache_policy.l1_delete(endpoint)
+    
+    @staticmethod
+    def _unpack(value, version):
+        """JSON guardado no cache; ``None`` se ausente ou de uma versão anterior da listagem"""
+        if isinstance(value, tuple):
+            stored_version, value = value
+            if version is not None and stored_version != version:
+                return None
+        return value or None
     
-    def get(self, endpoint: str, params: Optional[Dict] = None, use_cache: bool = True) -> Optional[Dict]:
-        """GET request com cache opcional"""
-        cache_key = f"rust_api_{endpoint}_{hash(str(params))}" if use_cache else None
+    def get(self, endpoint: str, params: Optional[Dict] = None, use_cache: bool = True,
+            refresh: bool = False) -> Optional[Dict]:
+        """GET request com cache opcional
         
-        if use_cache and cache_key:
-            cached_data = cache.get(cache_key)
+        ``refresh`` ignora o valor em cache e grava a resposta nova (aquecimento).
+        """
+        cache_key = self.cache_key(endpoint, params) if use_cache else None
+        # Nome legível da chave para as estatísticas (admin > Estatísticas do cache)
+        label = f"{endpoint}?{urlencode(sorted(params.items()))}" if params else endpoint
+        # Listagens não dá para apagar uma a uma: só valem na versão atual do recurso
+        version_key = self.version_key(endpoint) if params and use_cache else None
+        version = None
+        
+        if use_cache and cache_key and not refresh:
+            cache_policy.record_access(label)
+            cached_data = cache_policy.l1_get(label)
+            if cached_data is not None:
+                cache_policy.record_hit(label, l1=True)
+                return cached_data
+            # Valor, marca de "não encontrado" e versão na mesma ida ao Redis
+            found = cache.get_many([cache_key, cache_key + NOT_FOUND_SUFFIX] + ([version_key] if version_key else []))
+            if version_key:
+                version = found.get(version_key, 0)
+            cached_data = self._unpack(found.get(cache_key), version)
             if cached_data:
                 logger.info(f"Cache hit para {endpoint}")
-                return cached_data
+                cache_policy.record_hit(label)
+                # O cache guarda o JSON já codificado (valores antigos podem ser dicionários)
+                cache_policy.l1_set(label, cached_data)
+                return codec.loads(cached_data) if isinstance(cached_data, bytes) else cached_data
+            if found.get(cache_key + NOT_FOUND_SUFFIX):
+                cache_policy.incr('negative_hits')
+                return None
+            cache_policy.record_miss(label)
+        
+        if version_key and version is None:
+            # Lida antes da busca: uma mudança durante a requisição invalida o que for gravado
+            version = cache.get(version_key, 0)
+        
+        if use_cache:
+            (status, data), shared = in_flight.run(cache_key, lambda: self._request('GET', endpoint, params=params))
+            if shared:
+                cache_policy.incr('deduplicated')
+        else:
+            status, data = self._request('GET', endpoint, params=params)
         
-        data = self._make_request('GET', endpoint, params=params)
+        if status == 404 and use_cache:
+            # Cache negativo curto: links velhos e robôs não chegam ao backend
+            cache.set(cache_key + NOT_FOUND_SUFFIX, True, timeout=settings.RUST_NEGATIVE_CACHE_TTL)
+            cache_policy.incr('not_found')
+            return None
         
         if data and use_cache and cache_key:
-            cache.set(cache_key, data, timeout=300)  # 5 minutos
+            # TTL pela frequência e estabilidade da chave; chaves frias não são gravadas
+            ttl, encoded = cache_policy.ttl_for(label, data)
+            if refresh:
+                ttl = max(ttl, cache_policy.warm_ttl)
+            if ttl:
+                # Com o consumidor do feed de mudanças vivo, mudanças de propriedades invalidam na hora
+                ttl *= changefeed.ttl_multiplier(endpoint.split('/')[0])
+                cache.set(cache_key, (version, encoded), timeout=ttl)
+                cache_policy.l1_set(label, encoded, ttl)
         
         return data
     
@@ -89,31 +238,146 @@ class RustAPIService:
         return self._make_request('DELETE', endpoint)
     
     # Métodos específicos para o e-commerce
-    def get_properties(self, page: int = 1, limit: int = 20) -> Optional[Dict]:
-        """Busca propriedades do backend Rust"""
+    @staticmethod
+    def _params(page: int, limit: int, fields: Optional[Sequence[str]]) -> Dict:
         params = {'page': page, 'limit': limit}
-        return self.get('properties', params=params)
+        if fields:
+            # Ordenado: a mesma projeção cai sempre na mesma chave de cache
+            params['fields'] = ','.join(sorted(set(fields)))
+        return params
     
-    def get_property(self, property_id: int) -> Optional[Dict]:
-        """Busca uma propriedade específica"""
-        return self.get(f'properties/{property_id}')
+    def get_properties(self, page: int = 1, limit: int = 20, refresh: bool = False,
+                       fields: Optional[Sequence[str]] = None) -> Optional[Dict]:
+        """Busca propriedades do backend Rust
+        
+        ``fields`` limita os campos de cada item (ex.: ``LIST_FIELDS``); o
+        ``id`` vem sempre.
+        """
+        return self.get('properties', params=self._params(page, limit, fields), refresh=refresh)
+    
+    def get_property(self, property_id: int, refresh: bool = False) -> Optional[Dict]:
+        """Busca uma propriedade específica
+        
+        Ids que o filtro de Bloom garante não existirem retornam ``None`` sem
+        requisição.
+        """
+        id_filter = property_id_filter()
+        if id_filter is not None and not refresh and not id_filter.may_contain_id(int(property_id)):
+            cache_policy.incr('bloom_rejected')
+            return None
+        property_access.record(property_id)
+        return self.get(f'properties/{property_id}', refresh=refresh)
     
     def create_property(self, property_data: Dict) -> Optional[Dict]:
         """Cria uma nova propriedade"""
-        return self.post('properties', property_data)
+        status, result = self._request('POST', 'properties', data=property_data)
+        if 200 <= status < 300:
+            if isinstance(result, dict) and result.get('id') is not None:
+                # O id novo pode ter uma marca de "não encontrado" de uma consulta anterior
+                self.invalidate(f"properties/{result['id']}")
+            self.bump_version('properties')
+        return result
     
     def update_property(self, property_id: int, property_data: Dict) -> Optional[Dict]:
         """Atualiza uma propriedade"""
-        return self.put(f'properties/{property_id}', property_data)
+        endpoint = f'properties/{property_id}'
+        status, result = self._request('PUT', endpoint, data=property_data)
+        if 200 <= status < 300:
+            # Sem isso detalhe e listagens ficariam velhos pelo TTL adaptativo inteiro
+            self.invalidate(endpoint)
+            self.bump_version('properties')
+        return result
     
     def delete_property(self, property_id: int) -> Optional[Dict]:
         """Deleta uma propriedade"""
-        return self.delete(f'properties/{property_id}')
+        endpoint = f'properties/{property_id}'
+        status, result = self._request('DELETE', endpoint)
+        self.invalidate(endpoint)
+        if 200 <= status < 300:
+            self.bump_version('properties')
+        return result
     
-    def get_users(self, page: int = 1, limit: int = 20) -> Optional[Dict]:
+    def batch_write(self, ops: Iterable[Dict], chunk_size: int = 500) -> Iterator[Dict]:
+        """Aplica operações em lote via POST properties/batch
+        
+        Cada operação é ``{'op': 'create', 'data': {...}}``,
+        ``{'op': 'update', 'id': 1, 'data': {...}}`` ou ``{'op': 'delete', 'id': 1}``.
+        As operações são enviadas em blocos de ``chunk_size`` (uma requisição
+        por bloco) e os resultados são devolvidos um a um, na ordem das
+        operações, com ``index`` global. Se um bloco inteiro falhar, cada
+        operação dele retorna ``status`` 0 e ``error``.
+        
+        Blocos com ``create`` não são reenviados após timeout ou 5xx: o
+        backend pode ter gravado o bloco e a nova tentativa duplicaria as
+        propriedades. Esses blocos falham com ``status`` 0.
+        
+        ``chunk_size`` é limitado a ``MAX_BATCH_OPS`` (acima disso o backend
+        responde 413). Depois de cada bloco com alguma operação aplicada, o
+        cache das listagens (e o detalhe dos ids alterados) é invalidado.
+        """
+        chunk_size = min(max(chunk_size, 1), MAX_BATCH_OPS)
+        offset = 0
+        iterator = iter(ops)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return
+            retry = not any(op['op'] == 'create' for op in chunk)
+            response = self._request('POST', 'properties/batch', data={'ops': chunk}, retry=retry)[1]
+            results = (response or {}).get('results')
+            if results is None:
+                for index in range(len(chunk)):
+                    yield {'index': offset + index, 'status': 0, 'error': 'Falha na requisição do lote'}
+            else:
+                applied = [result for result in results if 200 <= result['status'] < 300]
+                for result in applied:
+                    op = chunk[result['index']]
+                    if op['op'] != 'create':
+                        self.invalidate(f"properties/{op['id']}")
+                if applied:
+                    self.bump_version('properties')
+                for result in results:
+                    yield {**result, 'index': offset + result['index']}
+            offset += len(chunk)
+    
+    def get_users(self, page: int = 1, limit: int = 20, refresh: bool = False,
+                  fields: Optional[Sequence[str]] = None) -> Optional[Dict]:
         """Busca usuários do backend Rust"""
-        params = {'page': page, 'limit': limit}
-        return self.get('users', params=params)
+        return self.get('users', params=self._params(page, limit, fields), refresh=refresh)
+    
+    def get_changes(self, since: int, limit: int = 500, wait: int = 0) -> Optional[Dict]:
+        """Mudanças com ``seq`` maior que ``since`` (long-poll de até ``wait`` segundos)
+        
+        Retorna ``{'events': [...], 'last_seq': n, 'reset': bool}``.
+        """
+        # Fora do limite de concorrência: o long-poll fica aberto de propósito e distorceria a latência
+        return self._request('GET', 'changes', params={'since': since, 'limit': limit, 'wait': wait}, limited=False)[1]
+    
+    def iter_pages(self, endpoint: str, limit: int = 100, decode: Optional[Callable[[Dict], Any]] = None,
+                   fields: Optional[Sequence[str]] = None) -> Iterator[Any]:
+        """Percorre todas as páginas de uma listagem, uma de cada vez
+        
+        Não usa o cache: serve para varreduras completas (sync, exportação,
+        análises), que só encheriam o Redis com páginas lidas uma vez.
+        ``decode`` converte cada item (ex.: ``PropertyPayload.from_dict``).
+        """
+        page = 1
+        while True:
+            items = self.get(endpoint, params=self._params(page, limit, fields), use_cache=False)
+            if not items:
+                return
+            yield from map(decode, items) if decode else items
+            if len(items) < limit:
+                return
+            page += 1
+    
+    def iter_properties(self, limit: int = 100, fields: Optional[Sequence[str]] = None) -> Iterator[PropertyPayload]:
+        """Percorre todas as propriedades do backend Rust (campos fora de ``fields`` ficam no padrão)"""
+        return self.iter_pages('properties', limit=limit, decode=PropertyPayload.from_dict, fields=fields)
+    
+    def iter_users(self, limit: int = 100, fields: Optional[Sequence[str]] = None) -> Iterator[UserPayload]:
+        """Percorre todos os usuários do backend Rust"""
+        return self.iter_pages('users', limit=limit, decode=UserPayload.from_dict, fields=fields)
     
     def health_check(self) -> bool:
         """Verifica se o backend Rust está funcionando"""
@@ -123,5 +387,5 @@ class RustAPIService:
         except:
             return False
 
-# Instância global do serviço
-rust_api = RustAPIService()
\ No newline at end of file
+# Instância global do serviço, construída no primeiro acesso
+rust_api = SimpleLazyObject(RustAPIService)
\ No newline at end of file
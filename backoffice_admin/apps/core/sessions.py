@@ -0,0 +1,69 @@
+"""Sessões em cache com serialização compacta.
+
+O ``SessionStore`` padrão de cache grava o dicionário da sessão, que o
+``RedisCache`` serializa com pickle. Aqui a sessão vira JSON compacto (em
+bytes, que o pickle apenas embrulha), e ``save`` não faz nada quando o
+conteúdo é igual ao que foi lido: a maioria das requisições do admin só lê
+a sessão e não gasta escrita nem a consulta de existência que o ``save``
+padrão faz antes de regravar.
+
+Use com um alias de cache próprio (``SESSION_CACHE_ALIAS``), para que
+limpar o cache de dados não desconecte os usuários.
+"""
+import json
+
+from django.contrib.sessions.backends.base import CreateError, UpdateError
+from django.contrib.sessions.backends.cache import SessionStore as CacheSessionStore
+
+
+def encode(session: dict) -> bytes:
+    # sort_keys: o mesmo conteúdo sempre gera os mesmos bytes
+    return json.dumps(session, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+
+class SessionStore(CacheSessionStore):
+    cache_key_prefix = 'session:'
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._stored = None
+
+    def load(self):
+        try:
+            stored = self._cache.get(self.cache_key)
+        except Exception:
+            # Chave inválida para o backend de cache: sessão nova (#17810)
+            stored = None
+        if isinstance(stored, bytes):
+            try:
+                session = json.loads(stored)
+            except ValueError:
+                session = None
+            if isinstance(session, dict):
+                self._stored = stored
+                return session
+        self._session_key = None
+        self._stored = None
+        return {}
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        data = encode(self._get_session(no_load=must_create))
+        if not must_create and data == self._stored:
+            return
+        if must_create:
+            func = self._cache.add
+        elif self._stored is not None or self._cache.get(self.cache_key) is not None:
+            func = self._cache.set
+        else:
+            raise UpdateError
+        result = func(self.cache_key, data, self.get_expiry_age())
+        if must_create and not result:
+            raise CreateError
+        self._stored = data
+
+    def delete(self, session_key=None):
+        super().delete(session_key)
+        if session_key is None or session_key == self.session_key:
+            self._stored = None
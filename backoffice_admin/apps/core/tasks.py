@@ -0,0 +1,47 @@
+"""Tarefas em segundo plano do core (executadas por ``manage.py run_jobs``)"""
+from pathlib import Path
+from typing import Dict, Sequence
+
+from django.apps import apps
+from django.conf import settings
+from django.urls import reverse
+
+from .exports import FORMATS, export_stream, queryset_rows
+from .jobs import task
+from .routers import use_replica
+from .selection import load_selection
+
+PROGRESS_EVERY = 1000
+
+
+@task('core.export')
+def export(job, model: str, selection: Dict, fields: Sequence[str], basename: str, fmt: str = 'csv',
+           compress: bool = True):
+    """Exporta os registros de ``model`` ("app_label.Model") da ``selection`` para ``MEDIA_ROOT/exports``
+
+    ``selection`` vem de ``selection.dump_selection``. O arquivo só é
+    entregue a staff (``export_download_view``).
+    """
+    extension = FORMATS[fmt][1] + ('.gz' if compress else '')
+    name = f"{basename}.{extension}"
+    directory = Path(settings.MEDIA_ROOT) / 'exports'
+    directory.mkdir(parents=True, exist_ok=True)
+
+    with use_replica():
+        queryset = load_selection(apps.get_model(model), selection, job.created_by).order_by('pk')
+        total = queryset.count()
+
+    def counted(rows):
+        for done, row in enumerate(rows, start=1):
+            if done % PROGRESS_EVERY == 0:
+                job.progress(done, total=total)
+            yield row
+
+    written = 0
+    # Leitura pesada: fica nas réplicas, como no comando export_data
+    with use_replica(), open(directory / name, 'wb') as output:
+        for chunk in export_stream(counted(queryset_rows(queryset, fields)), fields, fmt=fmt, compress=compress):
+            output.write(chunk)
+            written += len(chunk)
+    job.progress(total, total=total, force=True)
+    return {'url': reverse('export_download', args=[name]), 'bytes': written}
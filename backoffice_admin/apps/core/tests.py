@@ -0,0 +1,598 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
+from django.http import HttpResponse, JsonResponse
+from django.middleware.csrf import get_token
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from . import changefeed, jobs
+from .bloom import BloomFilter, build_id_filter
+from .http_cache import cache_response
+from .limiter import AdaptiveLimiter
+from .media import _etag_matches, parse_range, serve_media
+from .models import Job
+from .ratelimit import MemoryBuckets, RateLimiter, RateLimitMiddleware
+from .selection import load_selection
+from .services import MAX_BATCH_OPS, rust_api
+
+
+@jobs.task('tests.ok')
+def ok_task(job, value):
+    return {'value': value}
+
+
+@jobs.task('tests.flaky')
+def flaky_task(job):
+    raise RuntimeError('backend fora do ar')
+
+
+@jobs.task('tests.invalid')
+def invalid_task(job):
+    raise jobs.PermanentError('arquivo inválido')
+
+
+# run_job fecha as conexões ao terminar; dentro do TestCase isso desfaria a transação do teste
+@mock.patch('apps.core.jobs.connections')
+class JobQueueTests(TestCase):
+    def run_claimed(self, job):
+        self.assertEqual(jobs.claim('worker-a', 1), [job.pk])
+        return jobs.run_job(job.pk, 'worker-a')
+
+    def test_claim_is_exclusive(self, connections):
+        job = jobs.enqueue('tests.ok', 1)
+        self.assertEqual(jobs.claim('worker-a', 5), [job.pk])
+        self.assertEqual(jobs.claim('worker-b', 5), [])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker, job.attempts), (Job.Status.RUNNING, 'worker-a', 1))
+
+    def test_claim_skips_row_taken_after_the_candidate_query(self, connections):
+        job = jobs.enqueue('tests.ok', 1)
+        # Outro worker reserva a linha entre a consulta dos candidatos e o UPDATE condicional
+        Job.objects.filter(pk=job.pk).update(status=Job.Status.RUNNING, worker='worker-b')
+        with mock.patch.object(QuerySet, 'values_list', return_value=[job.pk]):
+            self.assertEqual(jobs.claim('worker-a', 1), [])
+        job.refresh_from_db()
+        self.assertEqual(job.worker, 'worker-b')
+
+    def test_only_the_owner_records_the_result(self, connections):
+        job = jobs.enqueue('tests.ok', 7)
+        jobs.claim('worker-a', 1)
+        jobs.run_job(job.pk, 'worker-b')
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.RUNNING)
+        self.assertEqual(jobs.run_job(job.pk, 'worker-a'), Job.Status.DONE)
+        job.refresh_from_db()
+        self.assertEqual(job.result, {'value': 7})
+
+    def test_retryable_failure_is_requeued_with_backoff(self, connections):
+        job = jobs.enqueue('tests.flaky', max_attempts=2)
+        with self.assertLogs('jobs', 'WARNING'):
+            self.assertEqual(self.run_claimed(job), Job.Status.QUEUED)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker, job.attempts), (Job.Status.QUEUED, '', 1))
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('backend fora do ar', job.error)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs('jobs', 'ERROR'):
+            self.assertEqual(self.run_claimed(job), Job.Status.FAILED)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.FAILED, 2))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_permanent_error_fails_without_retry(self, connections):
+        job = jobs.enqueue('tests.invalid', max_attempts=5)
+        with self.assertLogs('jobs', 'ERROR'):
+            self.assertEqual(self.run_claimed(job), Job.Status.FAILED)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.FAILED, 1))
+        self.assertIn('arquivo inválido', job.error)
+
+    def test_dedupe_key_returns_the_active_job(self, connections):
+        first = jobs.enqueue('tests.ok', 1, dedupe_key='sync')
+        self.assertEqual(jobs.enqueue('tests.ok', 2, dedupe_key='sync').pk, first.pk)
+        jobs.claim('worker-a', 1)
+        self.assertEqual(jobs.enqueue('tests.ok', 3, dedupe_key='sync').pk, first.pk)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_dedupe_key_race_hits_the_constraint(self, connections):
+        first = jobs.enqueue('tests.ok', 1, dedupe_key='sync')
+        with transaction.atomic(), self.assertRaises(IntegrityError):
+            Job.objects.create(task='tests.ok', dedupe_key='sync', run_at=timezone.now())
+        # A consulta não viu a tarefa ativa (corrida): o INSERT falha e a ativa é devolvida
+        with mock.patch.object(QuerySet, 'first', return_value=None):
+            self.assertEqual(jobs.enqueue('tests.ok', 2, dedupe_key='sync').pk, first.pk)
+
+    def test_dedupe_key_is_free_once_the_job_finishes(self, connections):
+        first = jobs.enqueue('tests.ok', 1, dedupe_key='sync')
+        self.run_claimed(first)
+        second = jobs.enqueue('tests.ok', 2, dedupe_key='sync')
+        self.assertNotEqual(second.pk, first.pk)
+
+    def expire_lease(self, job):
+        lease = timedelta(seconds=settings.JOB_QUEUE['LEASE_SECONDS'] + 1)
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - lease)
+
+    def test_expired_lease_is_requeued(self, connections):
+        job = jobs.enqueue('tests.ok', 1)
+        jobs.claim('worker-a', 1)
+        self.assertEqual(jobs.requeue_stale(), 0)
+        self.expire_lease(job)
+        with self.assertLogs('jobs', 'WARNING'):
+            self.assertEqual(jobs.requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker), (Job.Status.QUEUED, ''))
+        self.assertEqual(jobs.claim('worker-b', 1), [job.pk])
+
+    def test_expired_lease_on_last_attempt_fails(self, connections):
+        job = jobs.enqueue('tests.ok', 1, max_attempts=1)
+        jobs.claim('worker-a', 1)
+        self.expire_lease(job)
+        with self.assertLogs('jobs', 'WARNING'):
+            self.assertEqual(jobs.requeue_stale(), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+
+
+# Sem Redis: os baldes ficam em memória e cada teste começa com um limitador novo
+LOCMEM_CACHES = {
+    alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': alias}
+    for alias in ('default', 'rust_data', 'sessions')
+}
+
+
+@mock.patch('apps.core.ratelimit.time.monotonic')
+class MemoryBucketsTests(SimpleTestCase):
+    def test_burst_then_empty(self, monotonic):
+        monotonic.return_value = 100.0
+        buckets = MemoryBuckets()
+        self.assertEqual([buckets.take('ip:1', 1, 3)[0] for _ in range(4)], [True, True, True, False])
+
+    def test_refill_at_rate(self, monotonic):
+        monotonic.return_value = 100.0
+        buckets = MemoryBuckets()
+        for _ in range(2):
+            buckets.take('ip:1', 2, 2)
+        self.assertFalse(buckets.take('ip:1', 2, 2)[0])
+        monotonic.return_value = 100.5  # meio segundo a 2 fichas/s: uma ficha
+        allowed, tokens = buckets.take('ip:1', 2, 2)
+        self.assertTrue(allowed)
+        self.assertAlmostEqual(tokens, 0)
+        self.assertFalse(buckets.take('ip:1', 2, 2)[0])
+
+    def test_refill_is_capped_at_burst(self, monotonic):
+        monotonic.return_value = 100.0
+        buckets = MemoryBuckets()
+        buckets.take('ip:1', 1, 3)
+        monotonic.return_value = 1000.0
+        self.assertEqual(buckets.take('ip:1', 1, 3), (True, 2))
+
+    def test_clients_have_separate_buckets(self, monotonic):
+        monotonic.return_value = 100.0
+        buckets = MemoryBuckets()
+        self.assertTrue(buckets.take('ip:1', 1, 1)[0])
+        self.assertFalse(buckets.take('ip:1', 1, 1)[0])
+        self.assertTrue(buckets.take('ip:2', 1, 1)[0])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RateLimiterTests(SimpleTestCase):
+    def limiter(self, **options) -> RateLimiter:
+        with self.assertLogs('django', 'WARNING'):  # aviso de baldes em memória
+            return RateLimiter({'API_KEYS': ['chave-boa'], 'TRUSTED_PROXIES': 0, **options})
+
+    def request(self, **extra):
+        request = RequestFactory().get('/api/properties/', REMOTE_ADDR='10.0.0.9', **extra)
+        request.user = AnonymousUser()
+        return request
+
+    def test_known_api_key(self):
+        key = self.limiter().client_key(self.request(HTTP_X_API_KEY='chave-boa'))
+        self.assertTrue(key.startswith('key:'))
+
+    def test_unknown_api_key_counts_by_ip(self):
+        limiter = self.limiter()
+        self.assertEqual(limiter.client_key(self.request(HTTP_X_API_KEY='inventada')), 'ip:10.0.0.9')
+        self.assertEqual(limiter.client_key(self.request(HTTP_X_API_KEY='outra')), 'ip:10.0.0.9')
+
+    def test_authenticated_user(self):
+        request = self.request(HTTP_X_API_KEY='chave-boa')
+        request.user = User(pk=42)
+        self.assertEqual(self.limiter().client_key(request), 'user:42')
+
+    def test_forwarded_for_ignored_without_trusted_proxies(self):
+        request = self.request(HTTP_X_FORWARDED_FOR='1.1.1.1')
+        self.assertEqual(self.limiter().client_ip(request), '10.0.0.9')
+
+    def test_forwarded_for_with_trusted_proxies(self):
+        # O cliente pode forjar o início da lista; vale o que o proxy mais externo acrescentou
+        request = self.request(HTTP_X_FORWARDED_FOR='6.6.6.6, 203.0.113.7, 10.0.0.2')
+        self.assertEqual(self.limiter(TRUSTED_PROXIES=1).client_ip(request), '10.0.0.2')
+        self.assertEqual(self.limiter(TRUSTED_PROXIES=2).client_ip(request), '203.0.113.7')
+
+    def test_short_forwarded_for_falls_back_to_remote_addr(self):
+        request = self.request(HTTP_X_FORWARDED_FOR='203.0.113.7')
+        self.assertEqual(self.limiter(TRUSTED_PROXIES=2).client_ip(request), '10.0.0.9')
+
+    def test_rules(self):
+        limiter = self.limiter(RULES={'/admin/login/': (0.2, 10), '/admin/': (20, 100)}, DEFAULT=(10, 50))
+        self.assertEqual(limiter.rule_for('/admin/login/'), ('/admin/login/', 0.2, 10))
+        self.assertEqual(limiter.rule_for('/admin/core/job/'), ('/admin/', 20, 100))
+        self.assertEqual(limiter.rule_for('/api/properties/'), ('*', 10, 50))
+        self.assertIsNone(limiter.rule_for('/static/admin/css/base.css'))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RateLimitMiddlewareTests(SimpleTestCase):
+    def middleware(self, **options):
+        rate_limit = {**settings.RATE_LIMIT, 'ENABLED': True, 'API_KEYS': [], 'TRUSTED_PROXIES': 0, **options}
+        with override_settings(RATE_LIMIT=rate_limit), self.assertLogs('django', 'WARNING'):
+            return RateLimitMiddleware(lambda request: HttpResponse('ok'))
+
+    def get(self, middleware, path='/api/properties/'):
+        request = RequestFactory().get(path, REMOTE_ADDR='10.0.0.9')
+        request.user = AnonymousUser()
+        return middleware(request)
+
+    def test_disabled(self):
+        with override_settings(RATE_LIMIT={**settings.RATE_LIMIT, 'ENABLED': False}):
+            with self.assertRaises(MiddlewareNotUsed):
+                RateLimitMiddleware(lambda request: HttpResponse())
+
+    @mock.patch('apps.core.ratelimit.time.monotonic', return_value=100.0)
+    def test_429_with_headers(self, monotonic):
+        middleware = self.middleware(RULES={}, DEFAULT=(0.5, 2))
+        first, second, limited = (self.get(middleware) for _ in range(3))
+
+        self.assertEqual((first.status_code, second.status_code), (200, 200))
+        self.assertEqual(first['RateLimit-Limit'], '2')
+        self.assertEqual(first['RateLimit-Remaining'], '1')
+        self.assertEqual(first['RateLimit-Reset'], '2')
+        self.assertEqual(first['RateLimit-Policy'], '2;w=4')
+        self.assertNotIn('Retry-After', second)
+
+        self.assertEqual(limited.status_code, 429)
+        self.assertEqual(limited['Retry-After'], '2')
+        self.assertEqual(limited['RateLimit-Remaining'], '0')
+        self.assertEqual(limited['RateLimit-Reset'], '4')
+        self.assertIn(b'error', limited.content)
+
+    @mock.patch('apps.core.ratelimit.time.monotonic', return_value=100.0)
+    def test_exempt_paths_skip_the_limit(self, monotonic):
+        middleware = self.middleware(RULES={}, DEFAULT=(0.5, 1), EXEMPT=['/static/'])
+        responses = [self.get(middleware, '/static/app.css') for _ in range(3)]
+        self.assertEqual([response.status_code for response in responses], [200] * 3)
+        self.assertNotIn('RateLimit-Limit', responses[0])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CacheResponseTests(SimpleTestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.calls = 0
+
+    def view(self, set_cookie=None):
+        @cache_response(tags=lambda request: ['tests'])
+        def view(request):
+            self.calls += 1
+            response = JsonResponse({'calls': self.calls})
+            if set_cookie:
+                set_cookie(request, response)
+            return response
+        return view
+
+    def get(self, view, **extra):
+        request = RequestFactory().get('/api/tests/', **extra)
+        request.user = AnonymousUser()
+        return view(request)
+
+    def test_hit_and_not_modified(self):
+        view = self.view()
+        miss = self.get(view)
+        self.assertEqual(miss['X-Cache'], 'MISS')
+        self.assertTrue(miss['Cache-Control'].startswith('public'))
+        hit = self.get(view)
+        self.assertEqual((hit['X-Cache'], hit.content, self.calls), ('HIT', miss.content, 1))
+        self.assertEqual(self.get(view, HTTP_IF_NONE_MATCH=miss['ETag']).status_code, 304)
+
+    def assertNotCached(self, view):
+        for _ in range(2):
+            response = self.get(view)
+            self.assertNotIn('X-Cache', response)
+            self.assertNotIn('public', response.get('Cache-Control', ''))
+        self.assertEqual(self.calls, 2)
+
+    def test_response_with_cookie_is_not_cached(self):
+        self.assertNotCached(self.view(lambda request, response: response.set_cookie('tema', 'escuro')))
+
+    def test_pending_csrf_cookie_is_not_cached(self):
+        self.assertNotCached(self.view(lambda request, response: get_token(request)))
+
+    def test_write_that_pins_the_primary_is_not_cached(self):
+        with mock.patch('apps.core.http_cache.wrote_primary', return_value=True):
+            self.assertNotCached(self.view())
+
+
+class BatchWriteTests(SimpleTestCase):
+    def reply(self, method, endpoint, data=None, retry=True, **kwargs):
+        self.requests.append((len(data['ops']), retry))
+        return 200, {'results': [{'index': index, 'status': 201 if op['op'] == 'create' else 200}
+                                 for index, op in enumerate(data['ops'])]}
+
+    def setUp(self):
+        self.requests = []
+        patcher = mock.patch.object(rust_api, '_request', side_effect=self.reply)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch.object(rust_api, 'bump_version')
+    def test_chunks_are_capped_and_creates_not_retried(self, bump_version):
+        ops = [{'op': 'create', 'data': {'title': str(index)}} for index in range(MAX_BATCH_OPS + 1)]
+        results = list(rust_api.batch_write(ops, chunk_size=5000))
+        self.assertEqual(self.requests, [(MAX_BATCH_OPS, False), (1, False)])
+        self.assertEqual([result['index'] for result in results], list(range(MAX_BATCH_OPS + 1)))
+        self.assertEqual(bump_version.call_count, 2)
+
+    @mock.patch.object(rust_api, 'bump_version')
+    @mock.patch.object(rust_api, 'invalidate')
+    def test_updates_invalidate_detail_and_lists(self, invalidate, bump_version):
+        list(rust_api.batch_write([{'op': 'update', 'id': 7, 'data': {}}, {'op': 'delete', 'id': 8}]))
+        self.assertEqual(self.requests, [(2, True)])
+        self.assertEqual([call.args[0] for call in invalidate.call_args_list], ['properties/7', 'properties/8'])
+        bump_version.assert_called_once_with('properties')
+
+
+class WriteInvalidationTests(SimpleTestCase):
+    def setUp(self):
+        self.bump_version = self.enterContext(mock.patch.object(rust_api, 'bump_version'))
+        self.invalidate = self.enterContext(mock.patch.object(rust_api, 'invalidate'))
+
+    def test_writes_bump_the_lists(self):
+        with mock.patch.object(rust_api, '_request', return_value=(201, {'id': 9})):
+            rust_api.create_property({'title': 'Casa'})
+        with mock.patch.object(rust_api, '_request', return_value=(200, {'id': 9})):
+            rust_api.update_property(9, {'title': 'Casa'})
+        with mock.patch.object(rust_api, '_request', return_value=(204, None)):
+            rust_api.delete_property(9)
+        self.assertEqual(self.bump_version.call_count, 3)
+        self.assertEqual([call.args[0] for call in self.invalidate.call_args_list], ['properties/9'] * 3)
+
+    def test_failed_writes_keep_the_lists(self):
+        with mock.patch.object(rust_api, '_request', return_value=(0, None)):
+            rust_api.create_property({'title': 'Casa'})
+            rust_api.update_property(9, {'title': 'Casa'})
+            rust_api.delete_property(9)
+        self.bump_version.assert_not_called()
+
+
+class ChangeFeedTtlTests(SimpleTestCase):
+    @mock.patch('apps.core.changefeed.is_live', return_value=True)
+    def test_multiplier_only_for_feed_resources(self, is_live):
+        self.assertEqual(changefeed.ttl_multiplier('properties'), settings.RUST_CHANGE_FEED['TTL_MULTIPLIER'])
+        self.assertEqual(changefeed.ttl_multiplier('users'), 1)
+
+    @mock.patch('apps.core.changefeed.is_live', return_value=False)
+    def test_no_multiplier_without_consumer(self, is_live):
+        self.assertEqual(changefeed.ttl_multiplier('properties'), 1)
+
+
+class BloomFilterTests(SimpleTestCase):
+    def test_no_false_negatives(self):
+        bloom = build_id_filter(range(1, 1001, 2), capacity=500)
+        self.assertTrue(all(bloom.may_contain_id(item_id) for item_id in range(1, 1001, 2)))
+        self.assertEqual(bloom.max_id, 999)
+
+    def test_false_positive_rate(self):
+        bloom = build_id_filter(range(1, 1001, 2), capacity=500, error_rate=0.01)
+        false_positives = sum(bloom.may_contain_id(item_id) for item_id in range(2, 1001, 2))
+        self.assertLess(false_positives, 25)
+
+    def test_ids_above_max_are_never_rejected(self):
+        bloom = build_id_filter([1, 2, 3], capacity=3)
+        self.assertTrue(all(bloom.may_contain_id(item_id) for item_id in range(4, 200)))
+
+    def test_round_trip(self):
+        bloom = build_id_filter(range(100), capacity=100)
+        copy = BloomFilter.from_bytes(bloom.to_bytes())
+        self.assertEqual((copy.bits, copy.hashes, copy.max_id, copy.data), (bloom.bits, bloom.hashes, 99, bloom.data))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class NegativeCacheTests(SimpleTestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.request = self.enterContext(mock.patch.object(rust_api, '_request', return_value=(404, None)))
+
+    def test_not_found_is_cached(self):
+        with mock.patch('apps.core.services.property_id_filter', return_value=None):
+            self.assertIsNone(rust_api.get_property(5))
+            self.assertIsNone(rust_api.get_property(5))
+        self.assertEqual(self.request.call_count, 1)
+
+        # Criada depois: a marca de "não encontrado" sai junto com o detalhe
+        rust_api.invalidate('properties/5')
+        self.request.return_value = (200, {'id': 5, 'title': 'Casa'})
+        with mock.patch('apps.core.services.property_id_filter', return_value=None):
+            self.assertEqual(rust_api.get_property(5), {'id': 5, 'title': 'Casa'})
+
+    def test_bloom_filter_rejects_without_request(self):
+        bloom = build_id_filter([1, 2, 3, 10], capacity=4)
+        missing = next(item_id for item_id in range(4, 10) if not bloom.may_contain_id(item_id))
+        with mock.patch('apps.core.services.property_id_filter', return_value=bloom):
+            self.assertIsNone(rust_api.get_property(missing))
+        self.request.assert_not_called()
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_single_ranges(self):
+        self.assertEqual(parse_range('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(parse_range('bytes=900-', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-100', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-5000', 1000), (0, 999))
+        # Fim além do arquivo é cortado no último byte
+        self.assertEqual(parse_range('bytes=500-5000', 1000), (500, 999))
+
+    def test_ignored_headers(self):
+        for header in (None, '', 'bytes=-', 'items=0-1', 'bytes=0-1,5-6', 'bytes=a-b'):
+            self.assertIsNone(parse_range(header, 1000), header)
+
+    def test_unsatisfiable(self):
+        for header in ('bytes=1000-', 'bytes=1000-1200', 'bytes=10-5', 'bytes=-0'):
+            self.assertIs(parse_range(header, 1000), False, header)
+
+
+class EtagMatchesTests(SimpleTestCase):
+    def test_matching(self):
+        self.assertTrue(_etag_matches('"abc"', '"abc"'))
+        self.assertTrue(_etag_matches('"x", "abc"', '"abc"'))
+        self.assertTrue(_etag_matches('*', '"abc"'))
+        # Comparação fraca: W/ dos dois lados é ignorado
+        self.assertTrue(_etag_matches('"abc"', 'W/"abc"'))
+        self.assertTrue(_etag_matches('W/"abc"', '"abc"'))
+
+    def test_not_matching(self):
+        self.assertFalse(_etag_matches(None, '"abc"'))
+        self.assertFalse(_etag_matches('', '"abc"'))
+        self.assertFalse(_etag_matches('"abd"', '"abc"'))
+
+
+@override_settings(MEDIA_SENDFILE_BACKEND='')
+class ServeMediaTests(SimpleTestCase):
+    digest = 'ab' * 32
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.directory = f'images/ab/ab/{self.digest}'
+        (Path(media_root) / self.directory).mkdir(parents=True)
+        (Path(media_root) / self.directory / 'original.png').write_bytes(b'\x89PNG' + bytes(range(100)))
+        (Path(media_root) / self.directory / 'original.html').write_bytes(b'<script>alert(1)</script>')
+
+    def get(self, name, **headers):
+        request = RequestFactory().get('/', headers=headers)
+        request.user = AnonymousUser()
+        response = serve_media(request, f'{self.directory}/{name}')
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_allowed_image_is_served_inline(self):
+        response, body = self.get('original.png')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertFalse(response.get('Content-Disposition', '').startswith('attachment'))
+        self.assertEqual(response['Content-Security-Policy'], 'sandbox')
+        self.assertEqual(response['ETag'], f'"{self.digest[:32]}-original.png"')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(len(body), 104)
+
+    def test_other_types_are_downloads(self):
+        response, _ = self.get('original.html')
+        self.assertEqual(response['Content-Type'], 'application/octet-stream')
+        self.assertTrue(response['Content-Disposition'].startswith('attachment'))
+        self.assertEqual(response['Content-Security-Policy'], 'sandbox')
+
+    def test_range(self):
+        response, body = self.get('original.png', range='bytes=4-13')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 4-13/104')
+        self.assertEqual(body, bytes(range(10)))
+
+        response, _ = self.get('original.png', range='bytes=500-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */104')
+
+    def test_range_ignored_when_if_range_differs(self):
+        response, body = self.get('original.png', range='bytes=4-13', if_range='"outro"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(body), 104)
+
+    def test_if_none_match(self):
+        response, _ = self.get('original.png')
+        response, body = self.get('original.png', if_none_match=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(body, b'')
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SelectionTests(TestCase):
+    def setUp(self):
+        for alias in LOCMEM_CACHES:
+            caches[alias].clear()
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'senha')
+        self.staff = User.objects.create_user('staff', is_staff=True)
+        self.other = User.objects.create_user('other')
+        self.client.force_login(self.admin)
+
+    def run_action(self, query, select_across, selected):
+        self.client.post(f'/admin/auth/user/{query}', {
+            'action': 'export_in_background_csv', 'index': 0,
+            'select_across': select_across, '_selected_action': selected,
+        })
+        return Job.objects.get(task='core.export').kwargs['selection']
+
+    def test_select_across_keeps_only_the_filters(self):
+        selection = self.run_action('?is_staff__exact=1', '1', [self.admin.pk])
+        self.assertEqual(selection, {'filters': 'is_staff__exact=1', 'pks': None})
+        queryset = load_selection(User, selection, 'admin')
+        self.assertEqual(set(queryset.values_list('username', flat=True)), {'admin', 'staff'})
+
+    def test_page_selection_keeps_the_checked_pks(self):
+        selection = self.run_action('?is_staff__exact=0', '0', [self.other.pk])
+        self.assertEqual(selection, {'filters': 'is_staff__exact=0', 'pks': [str(self.other.pk)]})
+        self.assertEqual(list(load_selection(User, selection, 'admin')), [self.other])
+
+    def test_invalid_selection_is_permanent(self):
+        with self.assertRaises(jobs.PermanentError):
+            load_selection(User, {'filters': '', 'pks': None}, 'ninguem')
+        with self.assertRaises(jobs.PermanentError):
+            load_selection(User, {'filters': 'is_staff__exact=talvez', 'pks': None}, 'admin')
+
+
+class AdaptiveLimiterTests(SimpleTestCase):
+    route = 'GET properties/:id'
+
+    def setUp(self):
+        self.limiter = AdaptiveLimiter({'CLUSTER': False})
+
+    def call(self, latency, dropped=False):
+        self.limiter.release(self.limiter.acquire(self.route), latency, dropped)
+
+    def test_occasional_slow_calls_do_not_shrink_the_limit(self):
+        # Cache frio no backend: 1 chamada em 10 leva 4x mais
+        for index in range(1000):
+            self.call(0.040 if index % 10 == 0 else 0.010)
+        self.assertEqual(self.limiter.counters['drops'], 0)
+        self.assertGreater(self.limiter.limit, 10)
+
+    def test_sustained_slowdown_shrinks_the_limit(self):
+        for _ in range(200):
+            self.call(0.010)
+        before = self.limiter.limit
+        for _ in range(50):
+            self.call(0.040)
+        self.assertGreater(self.limiter.counters['drops'], 0)
+        self.assertLess(self.limiter.limit, before)
+
+    def test_no_slowness_during_warmup(self):
+        self.call(0.001)
+        for _ in range(5):
+            self.call(0.050)
+        self.assertEqual(self.limiter.counters['drops'], 0)
+
+    def test_one_drop_per_round(self):
+        permits = [self.limiter.acquire(self.route) for _ in range(3)]
+        for permit in permits:
+            self.limiter.release(permit, 0.010, dropped=True)
+        self.assertEqual(self.limiter.counters['drops'], 1)
+        self.assertAlmostEqual(self.limiter.limit, 10 * 0.9)
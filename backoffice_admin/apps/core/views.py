@@ -0,0 +1,64 @@
+from django.contrib import admin, messages
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.template.response import TemplateResponse
+
+from .cache_policy import PUBLISH_SECONDS, collect
+from .media import serve_media
+from .models import Job
+
+
+def cache_stats_view(request):
+    """Chaves mais acessadas do cache da API Rust, somando todos os workers"""
+    context = {
+        **admin.site.each_context(request),
+        'title': 'Estatísticas do cache',
+        'stats': collect(),
+        'publish_seconds': PUBLISH_SECONDS,
+    }
+    return TemplateResponse(request, 'admin/core/cache_stats.html', context)
+
+
+def job_started(request, job: Job):
+    """Resposta das ações que enfileiram tarefas: mensagem e página de progresso"""
+    messages.info(request, f"Tarefa #{job.pk} ({job.task}) em segundo plano.")
+    return redirect('job_progress', job_id=job.pk)
+
+
+def job_payload(job: Job) -> dict:
+    return {
+        'id': job.pk,
+        'task': job.task,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'progress': job.progress,
+        'total': job.total,
+        'percent': job.percent,
+        'message': job.message,
+        'attempts': job.attempts,
+        'max_attempts': job.max_attempts,
+        'result': job.result,
+        'error': job.error.strip().splitlines()[-1] if job.error else '',
+        'finished': job.finished,
+    }
+
+
+def job_status_view(request, job_id):
+    """Estado da tarefa em JSON, consultado periodicamente pela página de progresso"""
+    return JsonResponse(job_payload(get_object_or_404(Job, pk=job_id)))
+
+
+def job_progress_view(request, job_id):
+    job = get_object_or_404(Job, pk=job_id)
+    context = {
+        **admin.site.each_context(request),
+        'title': f'Tarefa #{job.pk}: {job.task}',
+        'job': job_payload(job),
+        'poll_ms': 1000,
+    }
+    return TemplateResponse(request, 'admin/core/job_progress.html', context)
+
+
+def export_download_view(request, name):
+    """Arquivo gerado pela tarefa ``core.export`` (a rota fica no admin: só staff)"""
+    return serve_media(request, f"exports/{name}")
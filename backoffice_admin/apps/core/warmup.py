@@ -0,0 +1,69 @@
+"""Aquecimento do cache compartilhado com as leituras mais frequentes.
+
+O conjunto quente é: as primeiras páginas de propriedades, as propriedades
+mais acessadas (``services.property_access``) e as primeiras páginas de
+usuários. Tudo é buscado em paralelo pelo ``RustAPIService`` com
+``refresh=True``, então as entradas ficam novas no Redis e os workers que
+sobem depois de um deploy já encontram o cache cheio.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Tuple
+
+from .limiter import batch_priority
+from .services import property_access, rust_api
+
+logger = logging.getLogger('rust_api')
+
+
+def hot_set(pages: int, limit: int, top: int, user_pages: int) -> List[Tuple[str, Callable]]:
+    """Pares ``(grupo, busca)`` a aquecer"""
+    tasks = [
+        ('páginas de propriedades', partial(rust_api.get_properties, page, limit, refresh=True))
+        for page in range(1, pages + 1)
+    ]
+    # rust_api.get direto: get_property contaria o aquecimento como acesso
+    tasks += [
+        ('propriedades mais acessadas', partial(rust_api.get, f'properties/{property_id}', refresh=True))
+        for property_id in property_access.top(top)
+    ]
+    tasks += [
+        ('páginas de usuários', partial(rust_api.get_users, page, limit, refresh=True))
+        for page in range(1, user_pages + 1)
+    ]
+    return tasks
+
+
+def _fetch(task: Tuple[str, Callable]) -> bool:
+    # Cada thread do pool tem seu contexto: a prioridade de lote é marcada aqui
+    with batch_priority():
+        return task[1]() is not None
+
+
+def warm_caches(pages: int = 5, limit: int = 20, top: int = 100, user_pages: int = 2,
+                workers: int = 8) -> Dict:
+    """Aquece o cache e retorna a cobertura por grupo e a duração"""
+    tasks = hot_set(pages, limit, top, user_pages)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_fetch, tasks))
+
+    groups: Dict[str, Dict] = {}
+    for (group, _), warmed in zip(tasks, results):
+        stats = groups.setdefault(group, {'requested': 0, 'warmed': 0})
+        stats['requested'] += 1
+        stats['warmed'] += warmed
+
+    summary = {
+        'groups': groups,
+        'requested': len(tasks),
+        'warmed': sum(results),
+        'seconds': time.perf_counter() - start,
+    }
+    logger.info(
+        f"Cache aquecido: {summary['warmed']}/{summary['requested']} entradas "
+        f"em {summary['seconds']:.1f}s"
+    )
+    return summary
@@ -1,3 +1,145 @@
+import hashlib
+import time
+from pathlib import Path
+
+from django.conf import settings
 from django.contrib import admin
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils.decorators import method_decorator
+from django.utils.html import format_html
+from django.utils.text import get_valid_filename
+from django.views.decorators.http import require_POST
+
+from apps.core.exports import ExportActionsMixin
+from apps.core.jobs import enqueue
+from apps.core.selection import dump_selection
+from apps.core.views import job_started
+
+from .forms import PropertyImportForm
+from .models import Property, PropertyImage
+from .uploads import media_upload_view
+from .views import price_analytics_view
+
+
+class PropertyImageInline(admin.TabularInline):
+    model = PropertyImage
+    extra = 1
+    fields = ("original", "position", "status", "preview")
+    readonly_fields = ("status", "preview")
+
+    @admin.display(description="Prévia")
+    def preview(self, obj):
+        if not obj.variants:
+            return "—"
+        smallest = obj.variants[min(obj.variants, key=int)]
+        path = smallest.get("webp") or next(iter(smallest.values()))
+        return format_html('<img src="{}{}" height="60">', settings.MEDIA_URL, path)
+
+
+@admin.register(Property)
+class PropertyAdmin(ExportActionsMixin, admin.ModelAdmin):
+    list_display = ("rust_id", "title", "price", "location", "property_type", "status", "synced_at")
+    list_filter = ("property_type", "status")
+    search_fields = ("title", "location")
+    readonly_fields = ("synced_at",)
+    inlines = [PropertyImageInline]
+    change_list_template = "admin/properties/property/change_list.html"
+    export_fields = (
+        "rust_id", "title", "description", "price", "location",
+        "property_type", "status", "latitude", "longitude", "synced_at",
+    )
+    export_basename = "propriedades"
+    actions = ExportActionsMixin.actions + ["mark_available", "mark_sold", "regenerate_images"]
+
+    # As fotos do inline chegam por aqui: upload em streaming só depois da checagem de permissão do admin
+    @method_decorator(media_upload_view)
+    def add_view(self, request, form_url="", extra_context=None):
+        return super().add_view(request, form_url, extra_context)
+
+    @method_decorator(media_upload_view)
+    def change_view(self, request, object_id, form_url="", extra_context=None):
+        return super().change_view(request, object_id, form_url, extra_context)
+
+    def _set_status(self, request, queryset, status):
+        # A seleção (filtros ou pks da página) em vez dos rust_ids: "selecionar todos" não vai inteiro para o Job
+        job = enqueue("properties.set_status", dump_selection(request), status, created_by=request.user.get_username())
+        return job_started(request, job)
+
+    @admin.action(description="Marcar como disponível (em segundo plano)", permissions=["change"])
+    def mark_available(self, request, queryset):
+        return self._set_status(request, queryset, "Disponível")
+
+    @admin.action(description="Marcar como vendido (em segundo plano)", permissions=["change"])
+    def mark_sold(self, request, queryset):
+        return self._set_status(request, queryset, "Vendido")
+
+    @admin.action(description="Gerar novamente as fotos (em segundo plano)", permissions=["change"])
+    def regenerate_images(self, request, queryset):
+        property_ids = sorted(queryset.values_list("pk", flat=True))
+        # A mesma seleção enviada duas vezes não gera as fotos duas vezes
+        selection = hashlib.md5(",".join(map(str, property_ids)).encode()).hexdigest()
+        job = enqueue(
+            "properties.regenerate_images", property_ids,
+            dedupe_key=f"properties.regenerate_images:{selection}",
+            created_by=request.user.get_username(),
+        )
+        return job_started(request, job)
+
+    def get_urls(self):
+        urls = [
+            path(
+                "import/",
+                self.admin_site.admin_view(self.import_view),
+                name="properties_property_import",
+            ),
+            path(
+                "sync/",
+                self.admin_site.admin_view(require_POST(self.sync_view)),
+                name="properties_property_sync",
+            ),
+            path(
+                "analytics/",
+                self.admin_site.admin_view(price_analytics_view),
+                name="properties_price_analytics",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def sync_view(self, request):
+        """Sincronização completa com o backend Rust; só uma por vez"""
+        if not self.has_change_permission(request):
+            return redirect("admin:properties_property_changelist")
+        job = enqueue("properties.sync", dedupe_key="properties.sync", created_by=request.user.get_username())
+        return job_started(request, job)
+
+    def import_view(self, request):
+        """Upload de planilha para importação em massa (processada em segundo plano)"""
+        if not self.has_add_permission(request):
+            return redirect("admin:properties_property_changelist")
+
+        form = PropertyImportForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            upload = form.cleaned_data["file"]
+            directory = Path(settings.MEDIA_ROOT) / "imports"
+            directory.mkdir(parents=True, exist_ok=True)
+            target = directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{get_valid_filename(upload.name)}"
+            with open(target, "wb") as handle:
+                for chunk in upload.chunks():
+                    handle.write(chunk)
+
+            job = enqueue(
+                "properties.import", str(target),
+                batch_size=form.cleaned_data["batch_size"],
+                created_by=request.user.get_username(),
+            )
+            return job_started(request, job)
 
-# Register your models here.
+        context = {
+            **self.admin_site.each_context(request),
+            "title": "Importar planilha de propriedades",
+            "opts": self.model._meta,
+            "form": form,
+        }
+        return TemplateResponse(request, "admin/properties/property/import.html", context)
@@ -0,0 +1,201 @@
+"""Estatísticas de preço do catálogo calculadas de forma vetorizada com NumPy.
+
+Os preços são carregados uma única vez em arrays colunares (preço, código da
+cidade, código do tipo) e todas as agregações por grupo são feitas com
+ordenação + ``bincount``, sem laços Python por linha.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+from django.core.cache import cache
+
+from .catalog import catalog_version
+
+logger = logging.getLogger('rust_api')
+
+DEFAULT_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+DEFAULT_BINS = 20
+CACHE_TIMEOUT = 300
+
+
+@dataclass(frozen=True)
+class PriceColumns:
+    """Preços e categorias em formato colunar"""
+
+    prices: np.ndarray  # float64
+    cities: np.ndarray  # códigos int64 em ``city_labels``
+    types: np.ndarray  # códigos int64 em ``type_labels``
+    city_labels: np.ndarray
+    type_labels: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[object, str, str]]) -> 'PriceColumns':
+        """Monta as colunas a partir de tuplas ``(price, location, property_type)``"""
+        prices, locations, types = [], [], []
+        for price, location, property_type in rows:
+            prices.append(price)
+            locations.append(location or '')
+            types.append(property_type or '')
+
+        location_labels, location_codes = np.unique(np.asarray(locations, dtype=str), return_inverse=True)
+        # A cidade é derivada só dos valores distintos de "Cidade, UF"
+        city_of_location = np.array([loc.rsplit(',', 1)[0].strip() for loc in location_labels], dtype=str)
+        city_labels, city_codes = np.unique(city_of_location, return_inverse=True)
+        type_labels, type_codes = np.unique(np.asarray(types, dtype=str), return_inverse=True)
+
+        return cls(
+            prices=np.asarray(prices, dtype=np.float64),
+            cities=city_codes[location_codes].astype(np.int64),
+            types=type_codes.astype(np.int64),
+            city_labels=city_labels,
+            type_labels=type_labels,
+        )
+
+    def grouping(self, by: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Retorna ``(códigos, rótulos)`` para ``by`` em city, type ou city_type"""
+        if by == 'city':
+            return self.cities, self.city_labels
+        if by == 'type':
+            return self.types, self.type_labels
+        if by == 'city_type':
+            n_types = max(len(self.type_labels), 1)
+            used, codes = np.unique(self.cities * n_types + self.types, return_inverse=True)
+            labels = np.array(
+                [f"{self.city_labels[c // n_types]} / {self.type_labels[c % n_types]}" for c in used],
+                dtype=str,
+            )
+            return codes.astype(np.int64), labels
+        raise ValueError(f"Agrupamento desconhecido: {by}")
+
+
+def load_from_db() -> PriceColumns:
+    """Carrega os preços do espelho local (``Property``)"""
+    from apps.core.routers import use_replica
+
+    from .models import Property
+
+    with use_replica():
+        rows = Property.objects.values_list('price', 'location', 'property_type').iterator(chunk_size=5000)
+        return PriceColumns.from_rows(rows)
+
+
+def load_from_api(limit: int = 500) -> PriceColumns:
+    """Carrega os preços percorrendo as páginas do backend Rust"""
+    from apps.core.services import rust_api
+
+    rows = (
+        (item.price, item.location, item.property_type)
+        for item in rust_api.iter_properties(limit=limit, fields=['price', 'location', 'property_type'])
+    )
+    return PriceColumns.from_rows(rows)
+
+
+def grouped_quantiles(codes: np.ndarray, values: np.ndarray, n_groups: int,
+                      q: Sequence[float] = DEFAULT_QUANTILES) -> np.ndarray:
+    """Quantis por grupo, matriz ``(n_groups, len(q))``
+
+    Usa a mesma interpolação linear de ``np.quantile``; grupos vazios ficam
+    com ``NaN``.
+    """
+    q = np.asarray(q, dtype=np.float64)
+    # Duas ordenações estáveis (valor, depois grupo) são ~2x mais rápidas que lexsort
+    order = np.argsort(values)
+    order = order[np.argsort(codes[order], kind='stable')]
+    sorted_values = values[order]
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+
+    positions = starts[:, None] + q[None, :] * np.maximum(counts - 1, 0)[:, None]
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.ceil(positions).astype(np.int64)
+    fraction = positions - lower
+
+    result = np.full((n_groups, len(q)), np.nan)
+    filled = counts > 0
+    if sorted_values.size:
+        low_values = sorted_values[lower[filled]]
+        high_values = sorted_values[upper[filled]]
+        result[filled] = low_values + (high_values - low_values) * fraction[filled]
+    return result
+
+
+def grouped_histogram(codes: np.ndarray, values: np.ndarray, n_groups: int,
+                      bins: int = DEFAULT_BINS) -> Tuple[np.ndarray, np.ndarray]:
+    """Histogramas por grupo com as mesmas faixas globais
+
+    Retorna ``(contagens (n_groups, bins), bordas (bins + 1))``.
+    """
+    edges = np.histogram_bin_edges(values, bins=bins)
+    # A última borda é inclusiva, como em np.histogram
+    index = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, bins - 1)
+    counts = np.bincount(codes * bins + index, minlength=n_groups * bins)
+    return counts.reshape(n_groups, bins), edges
+
+
+def iqr_outliers(codes: np.ndarray, values: np.ndarray, n_groups: int, k: float = 1.5,
+                 quartiles: Optional[np.ndarray] = None) -> np.ndarray:
+    """Máscara booleana dos preços fora das cercas de Tukey do seu grupo
+
+    ``quartiles`` (``(n_groups, 2)`` com Q1 e Q3) evita reordenar os dados
+    quando já foram calculados.
+    """
+    if quartiles is None:
+        quartiles = grouped_quantiles(codes, values, n_groups, q=(0.25, 0.75))
+    q1, q3 = quartiles[:, 0], quartiles[:, 1]
+    spread = k * (q3 - q1)
+    return (values < (q1 - spread)[codes]) | (values > (q3 + spread)[codes])
+
+
+def summarize(columns: PriceColumns, by: str = 'city', bins: int = DEFAULT_BINS,
+              q: Sequence[float] = DEFAULT_QUANTILES) -> Dict:
+    """Resumo serializável (quantis, histograma e outliers) por grupo"""
+    codes, labels = columns.grouping(by)
+    n_groups = len(labels)
+    values = columns.prices
+    if not len(values):
+        return {'by': by, 'quantiles': list(q), 'edges': [], 'groups': []}
+
+    # Q1 e Q3 saem da mesma ordenação usada para os quantis pedidos
+    quantiles = grouped_quantiles(codes, values, n_groups, tuple(q) + (0.25, 0.75))
+    histogram, edges = grouped_histogram(codes, values, n_groups, bins)
+    outliers = iqr_outliers(codes, values, n_groups, quartiles=quantiles[:, -2:])
+    quantiles = quantiles[:, :-2]
+    counts = np.bincount(codes, minlength=n_groups)
+    means = np.bincount(codes, weights=values, minlength=n_groups) / np.maximum(counts, 1)
+    outlier_counts = np.bincount(codes[outliers], minlength=n_groups)
+
+    groups = [
+        {
+            'label': str(labels[i]),
+            'count': int(counts[i]),
+            'mean': float(means[i]),
+            'quantiles': quantiles[i].tolist(),
+            'histogram': histogram[i].tolist(),
+            'outliers': int(outlier_counts[i]),
+        }
+        for i in range(n_groups)
+    ]
+    return {'by': by, 'quantiles': list(q), 'edges': edges.tolist(), 'groups': groups}
+
+
+def price_analytics(source: str = 'db', by: str = 'city', bins: int = DEFAULT_BINS) -> Dict:
+    """Resumo de preços com cache versionado
+
+    ``source`` é ``db`` (espelho local) ou ``api`` (backend Rust).
+    """
+    cache_key = f"price_analytics:{catalog_version()}:{source}:{by}:{bins}"
+    result = cache.get(cache_key)
+    if result is not None:
+        return result
+
+    columns = load_from_api() if source == 'api' else load_from_db()
+    result = summarize(columns, by=by, bins=bins)
+    result['total'] = len(columns)
+    cache.set(cache_key, result, timeout=CACHE_TIMEOUT)
+    logger.info(f"Resumo de preços recalculado ({source}, {by}, {len(columns)} linhas)")
+    return result
@@ -0,0 +1,48 @@
+"""API JSON de leitura das propriedades, servida do espelho local.
+
+Mesmo formato e paginação de ``GET /properties`` do backend Rust, mas sem
+ida ao backend: o frontend lê daqui e as respostas ficam no cache HTTP
+(``apps.core.http_cache``), purgadas por surrogate key a cada escrita
+(``bump_catalog_version``). O corpo é montado com os payloads já
+serializados no idioma da requisição (``rendering``), sem serializar nada.
+"""
+from django.http import HttpResponse, JsonResponse
+from django.utils.translation import get_language
+from django.views.decorators.http import require_safe
+
+from apps.core.http_cache import cache_response
+
+from .catalog import ALL_TAG, LIST_TAG, property_tag
+from .rendering import detail_body, page_body, render_payloads, rendering_language
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+def _positive_int(value, default: int) -> int:
+    try:
+        return max(int(value), 1)
+    except (TypeError, ValueError):
+        return default
+
+
+@require_safe
+@cache_response(tags=lambda request: [LIST_TAG, ALL_TAG], query_params=('page', 'limit'))
+def property_list_api(request):
+    page = _positive_int(request.GET.get('page'), 1)
+    limit = min(_positive_int(request.GET.get('limit'), DEFAULT_LIMIT), MAX_LIMIT)
+    body = page_body(rendering_language(get_language()), (page - 1) * limit, limit)
+    return HttpResponse(body, content_type='application/json')
+
+
+@require_safe
+@cache_response(tags=lambda request, rust_id: [property_tag(rust_id), ALL_TAG])
+def property_detail_api(request, rust_id):
+    language = rendering_language(get_language())
+    body = detail_body(language, rust_id)
+    # Propriedade gravada antes de existir a renderização (ou idioma novo): renderiza agora
+    if body is None and render_payloads([rust_id]):
+        body = detail_body(language, rust_id)
+    if body is None:
+        return JsonResponse({'error': 'Propriedade não encontrada'}, status=404)
+    return HttpResponse(body, content_type='application/json')
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PropertiesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.properties"
+    verbose_name = "Propriedades"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,48 @@
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+
+from apps.core import http_cache
+
+from .rendering import render_payloads
+
+VERSION_KEY = 'properties:catalog_version'
+
+# Surrogate keys das respostas da API JSON (apps/properties/api.py)
+ALL_TAG = 'properties'
+LIST_TAG = 'properties:list'
+
+
+def property_tag(rust_id: int) -> str:
+    return f'property:{rust_id}'
+
+
+def catalog_version() -> int:
+    """Versão atual do catálogo, compartilhada entre processos via cache
+
+    Estruturas derivadas (resumos de preço, índice espacial) usam a versão
+    na chave ou comparam com ela para saber quando recalcular.
+    """
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, timeout=None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def bump_catalog_version(rust_ids: Optional[Iterable[int]] = None) -> None:
+    """Marca o catálogo como alterado, renderiza de novo os payloads e purga as respostas da API em cache
+
+    Com ``rust_ids``, trata só essas propriedades (e as listagens); sem,
+    todas. Os payloads são renderizados antes do purge: a próxima leitura
+    já encontra os bytes novos.
+    """
+    render_payloads(rust_ids)
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, timeout=None)
+    if rust_ids is None:
+        http_cache.purge(ALL_TAG)
+    else:
+        http_cache.purge(LIST_TAG, *(property_tag(rust_id) for rust_id in rust_ids))
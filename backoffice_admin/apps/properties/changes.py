@@ -0,0 +1,84 @@
+"""Aplica o feed de mudanças do backend Rust (``GET /changes``) ao Django.
+
+Cada lote de eventos é reduzido ao último estado de cada id; o cache das
+respostas é invalidado (detalhe por id e a versão das listagens) e o
+espelho local é atualizado junto com o cursor, na mesma transação. Se o
+processo cair no meio, o lote é reaplicado a partir do cursor salvo: os
+upserts e remoções são idempotentes.
+"""
+import logging
+from typing import Dict, Iterable, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.payloads import PropertyPayload
+from apps.core.services import rust_api
+
+from .catalog import bump_catalog_version
+from .models import ChangeFeedCursor, Property
+from .sync import SYNC_FIELDS, property_from_payload, sync_properties
+
+logger = logging.getLogger('rust_api')
+
+
+def load_cursor() -> ChangeFeedCursor:
+    cursor, _ = ChangeFeedCursor.objects.get_or_create(name='properties')
+    return cursor
+
+
+def coalesce(events: Iterable[Dict]) -> Tuple[Dict[int, PropertyPayload], set]:
+    """Último estado de cada id: propriedades a gravar e ids removidos"""
+    upserts, deleted = {}, set()
+    for event in events:
+        property_id = event['id']
+        # Sem ``data`` a linha já foi removida no Rust, mesmo que o evento seja de escrita
+        if event['op'] == 'delete' or not event.get('data'):
+            upserts.pop(property_id, None)
+            deleted.add(property_id)
+        else:
+            upserts[property_id] = PropertyPayload.from_dict(event['data'])
+            deleted.discard(property_id)
+    return upserts, deleted
+
+
+def invalidate(ids: Iterable[int]):
+    for property_id in ids:
+        rust_api.invalidate(f'properties/{property_id}')
+    rust_api.bump_version('properties')
+
+
+def apply_events(events: Iterable[Dict], last_seq: int) -> int:
+    """Aplica um lote do feed e avança o cursor; retorna quantos ids mudaram"""
+    upserts, deleted = coalesce(events)
+    if upserts or deleted:
+        invalidate(list(upserts) + list(deleted))
+    with transaction.atomic():
+        if upserts:
+            Property.objects.bulk_create(
+                [property_from_payload(item) for item in upserts.values()],
+                update_conflicts=True,
+                unique_fields=['rust_id'],
+                update_fields=SYNC_FIELDS + ['synced_at'],
+            )
+        if deleted:
+            Property.objects.filter(rust_id__in=deleted).delete()
+        ChangeFeedCursor.objects.filter(name='properties').update(seq=last_seq, updated_at=timezone.now())
+    if upserts or deleted:
+        bump_catalog_version(list(upserts) + list(deleted))
+        logger.info(f"Feed de mudanças: {len(upserts)} atualizadas, {len(deleted)} removidas (seq {last_seq})")
+    return len(upserts) + len(deleted)
+
+
+def resync(last_seq: int) -> int:
+    """Recomeça do zero quando o cursor saiu do log do backend (expurgo ou banco recriado)"""
+    logger.warning(f"Feed de mudanças reiniciado: ressincronizando tudo a partir do seq {last_seq}")
+    invalidate(Property.objects.values_list('rust_id', flat=True))
+    started = timezone.now()
+    total = sync_properties(bump_catalog=False)
+    # O que não voltou na sincronização completa não existe mais no backend
+    Property.objects.filter(synced_at__lt=started).delete()
+    ChangeFeedCursor.objects.filter(name='properties').update(seq=last_seq, updated_at=timezone.now())
+    # Uma vez só, depois da remoção: renderiza o catálogo inteiro
+    bump_catalog_version()
+    return total
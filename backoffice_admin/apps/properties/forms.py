@@ -0,0 +1,14 @@
+from django import forms
+
+from apps.core.services import MAX_BATCH_OPS
+
+
+class PropertyImportForm(forms.Form):
+    file = forms.FileField(label="Planilha (.csv ou .xlsx)")
+    batch_size = forms.IntegerField(label="Tamanho do lote", initial=500, min_value=1, max_value=MAX_BATCH_OPS)
+
+    def clean_file(self):
+        upload = self.cleaned_data["file"]
+        if not upload.name.lower().endswith((".csv", ".xlsx", ".xlsm")):
+            raise forms.ValidationError("Envie um arquivo .csv ou .xlsx")
+        return upload
@@ -0,0 +1,197 @@
+"""Geocodificação offline e índice espacial em memória para as propriedades.
+
+As coordenadas vêm do gazetteer embutido em ``data/municipios.csv`` (nome do
+município, UF, latitude, longitude). Consultas por raio, retângulo e vizinhos
+mais próximos passam por um índice de grade (buckets de ``cell_deg`` graus)
+mantido em memória por processo e reconstruído quando o catálogo muda.
+"""
+import csv
+import threading
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .catalog import catalog_version
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180
+DEFAULT_GAZETTEER = Path(__file__).resolve().parent / 'data' / 'municipios.csv'
+
+
+def _normalize(name: str) -> str:
+    decomposed = unicodedata.normalize('NFKD', name)
+    return ' '.join(''.join(c for c in decomposed if not unicodedata.combining(c)).lower().split())
+
+
+@lru_cache(maxsize=1)
+def gazetteer() -> Dict[Tuple[str, str], Tuple[float, float]]:
+    """Mapa ``(município normalizado, UF) -> (lat, lon)``
+
+    O caminho pode ser trocado por um arquivo completo do IBGE com
+    ``settings.GAZETTEER_PATH`` (mesmas colunas).
+    """
+    path = getattr(settings, 'GAZETTEER_PATH', None) or DEFAULT_GAZETTEER
+    with open(path, encoding='utf-8', newline='') as handle:
+        return {
+            (_normalize(row['municipio']), row['uf'].strip().upper()): (float(row['latitude']), float(row['longitude']))
+            for row in csv.DictReader(handle)
+        }
+
+
+@lru_cache(maxsize=1)
+def _by_city_name() -> Dict[str, Optional[Tuple[float, float]]]:
+    # Para localizações sem UF; nomes repetidos em mais de um estado são ambíguos
+    result = {}
+    for (city, _), coords in gazetteer().items():
+        result[city] = None if city in result else coords
+    return result
+
+
+def geocode(location: str) -> Optional[Tuple[float, float]]:
+    """Converte "Cidade, UF" em ``(lat, lon)`` usando o gazetteer"""
+    if not location:
+        return None
+    city, _, state = location.rpartition(',')
+    if not city:
+        return _by_city_name().get(_normalize(state))
+    return gazetteer().get((_normalize(city), state.strip().upper()))
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Distância em km de um ponto para um array de pontos"""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GridIndex:
+    """Índice espacial de grade regular sobre arrays NumPy
+
+    Os pontos ficam ordenados pelo id da célula, então cada linha de células
+    de uma consulta vira um único intervalo contíguo (``searchsorted``).
+    Não trata a passagem pelo antimeridiano, irrelevante para o Brasil.
+    """
+
+    def __init__(self, ids: np.ndarray, lats: np.ndarray, lons: np.ndarray, cell_deg: float = 0.1):
+        self.cell_deg = cell_deg
+        self.n_cols = int(np.ceil(360 / cell_deg))
+        self.n_rows = int(np.ceil(180 / cell_deg))
+        keys = self._rows(lats) * self.n_cols + self._cols(lons)
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.ids = np.asarray(ids)[order]
+        self.lats = np.asarray(lats, dtype=np.float64)[order]
+        self.lons = np.asarray(lons, dtype=np.float64)[order]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _rows(self, lats) -> np.ndarray:
+        return np.clip(((np.asarray(lats) + 90) // self.cell_deg).astype(np.int64), 0, self.n_rows - 1)
+
+    def _cols(self, lons) -> np.ndarray:
+        return np.clip(((np.asarray(lons) + 180) // self.cell_deg).astype(np.int64), 0, self.n_cols - 1)
+
+    def _candidates(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> np.ndarray:
+        """Posições dos pontos nas células que cobrem o retângulo"""
+        rows = np.arange(self._rows(min_lat), self._rows(max_lat) + 1)
+        first_col, last_col = self._cols(min_lon), self._cols(max_lon)
+        starts = np.searchsorted(self.keys, rows * self.n_cols + first_col, side='left')
+        ends = np.searchsorted(self.keys, rows * self.n_cols + last_col, side='right')
+        spans = [np.arange(start, end) for start, end in zip(starts, ends) if end > start]
+        return np.concatenate(spans) if spans else np.empty(0, dtype=np.int64)
+
+    def bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> np.ndarray:
+        """Ids dos pontos dentro do retângulo"""
+        positions = self._candidates(min_lat, min_lon, max_lat, max_lon)
+        lats, lons = self.lats[positions], self.lons[positions]
+        inside = (lats >= min_lat) & (lats <= max_lat) & (lons >= min_lon) & (lons <= max_lon)
+        return self.ids[positions[inside]]
+
+    def _within(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        dlat = radius_km / KM_PER_DEGREE
+        widest = min(abs(lat) + dlat, 89.9)
+        dlon = min(dlat / np.cos(np.radians(widest)), 180)
+        positions = self._candidates(lat - dlat, lon - dlon, lat + dlat, lon + dlon)
+        distances = haversine_km(lat, lon, self.lats[positions], self.lons[positions])
+        inside = distances <= radius_km
+        return positions[inside], distances[inside]
+
+    def radius(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """``(ids, distâncias em km)`` dos pontos no raio, do mais próximo ao mais distante"""
+        positions, distances = self._within(lat, lon, radius_km)
+        order = np.argsort(distances)
+        return self.ids[positions[order]], distances[order]
+
+    def nearest(self, lat: float, lon: float, n: int = 10, max_radius_km: float = 5000) -> Tuple[np.ndarray, np.ndarray]:
+        """Os ``n`` pontos mais próximos
+
+        O raio começa em uma célula e dobra até conter ``n`` pontos; como todos
+        os pontos do raio são avaliados, o resultado é exato.
+        """
+        radius_km = self.cell_deg * KM_PER_DEGREE
+        while True:
+            positions, distances = self._within(lat, lon, radius_km)
+            if len(positions) >= n or radius_km >= max_radius_km:
+                break
+            radius_km *= 2
+        if len(positions) > n:
+            top = np.argpartition(distances, n - 1)[:n]
+            positions, distances = positions[top], distances[top]
+        order = np.argsort(distances)
+        return self.ids[positions[order]], distances[order]
+
+
+_index_lock = threading.Lock()
+_index: Tuple[Optional[int], Optional[GridIndex]] = (None, None)
+
+
+def build_index(rows: Iterable[Tuple[int, float, float]], cell_deg: float = 0.1) -> GridIndex:
+    """Monta o índice a partir de tuplas ``(id, lat, lon)``"""
+    ids, lats, lons = [], [], []
+    for pk, lat, lon in rows:
+        ids.append(pk)
+        lats.append(lat)
+        lons.append(lon)
+    return GridIndex(np.asarray(ids, dtype=np.int64), np.asarray(lats), np.asarray(lons), cell_deg=cell_deg)
+
+
+def property_index() -> GridIndex:
+    """Índice das propriedades geocodificadas, reconstruído quando o catálogo muda"""
+    global _index
+    from .models import Property
+
+    version = catalog_version()
+    if _index[0] == version:
+        return _index[1]
+    with _index_lock:
+        if _index[0] != version:
+            rows = (
+                Property.objects.filter(latitude__isnull=False, longitude__isnull=False)
+                .values_list('rust_id', 'latitude', 'longitude')
+                .iterator(chunk_size=10000)
+            )
+            _index = (version, build_index(rows))
+        return _index[1]
+
+
+def properties_within(lat: float, lon: float, radius_km: float):
+    """Propriedades no raio, ordenadas por distância (``rust_id``, km)"""
+    ids, distances = property_index().radius(lat, lon, radius_km)
+    return list(zip(ids.tolist(), distances.tolist()))
+
+
+def properties_in_bbox(min_lat: float, min_lon: float, max_lat: float, max_lon: float):
+    """``rust_id`` das propriedades dentro do retângulo"""
+    return property_index().bbox(min_lat, min_lon, max_lat, max_lon).tolist()
+
+
+def nearest_properties(lat: float, lon: float, n: int = 10):
+    """As ``n`` propriedades mais próximas (``rust_id``, km)"""
+    ids, distances = property_index().nearest(lat, lon, n)
+    return list(zip(ids.tolist(), distances.tolist()))
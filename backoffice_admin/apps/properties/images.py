@@ -0,0 +1,219 @@
+"""Pipeline de derivadas das fotos das propriedades.
+
+O upload só grava o original (em caminho endereçado pelo SHA-256 do
+conteúdo) e agenda o processamento; miniaturas e variantes WebP/AVIF são
+geradas num ``ProcessPoolExecutor``, fora da thread da requisição, então a
+latência do upload não depende do tamanho da imagem.
+
+As funções de processamento não tocam no ORM e podem rodar em processos
+filhos criados com ``spawn``.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Sequence
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+
+from .uploads import MEDIA_EXTENSIONS
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+logger = logging.getLogger('rust_api')
+
+IMAGES_DIR = 'images'
+MANIFEST_NAME = 'manifest.json'
+# Metadados removidos das variantes (o perfil ICC é mantido para as cores)
+STRIPPED_INFO = ('exif', 'xmp', 'XML:com.adobe.xmp', 'photoshop', 'comment')
+ORIENTATION_TAG = 0x0112
+SAVE_OPTIONS = {
+    'webp': {'method': 4},
+    'avif': {'speed': 8},
+}
+
+
+def content_hash(chunks: Iterable[bytes]) -> str:
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_dir(digest: str) -> str:
+    """Diretório relativo a MEDIA_ROOT de uma imagem: images/ab/cd/<hash>"""
+    return f"{IMAGES_DIR}/{digest[:2]}/{digest[2:4]}/{digest}"
+
+
+def original_name(digest: str, content_type: str) -> str:
+    """Caminho relativo do arquivo original
+
+    A extensão vem do tipo identificado pelo conteúdo, nunca do nome
+    enviado; tipo desconhecido fica sem extensão.
+    """
+    return f"{content_dir(digest)}/original{MEDIA_EXTENSIONS.get(content_type, '')}"
+
+
+def supported_formats(formats: Sequence[str]) -> list:
+    from PIL import features
+
+    return [fmt for fmt in formats if features.check(fmt)]
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Storage em que o nome já identifica o conteúdo
+
+    Um arquivo existente com o mesmo nome é, por construção, idêntico: o
+    upload repetido não é regravado nem renomeado. Arquivos recebidos em
+    ``.incoming`` (``temporary_file_path``) são movidos, não copiados.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        if self.exists(name):
+            return name
+        return super()._save(name, content)
+
+
+def _oriented_size(image: 'Image.Image'):
+    """Tamanho original já considerando a rotação indicada no EXIF"""
+    if image.getexif().get(ORIENTATION_TAG, 1) in (5, 6, 7, 8):
+        return image.height, image.width
+    return image.width, image.height
+
+
+def _decode_reduced(image: 'Image.Image', width: int, height: int) -> None:
+    """Pede ao decodificador JPEG a menor escala (1/2, 1/4, 1/8) que cubra a maior variante
+
+    ``draft`` evita montar o bitmap em resolução total; deve ser chamado
+    antes de qualquer acesso aos pixels. Outros formatos são decodificados
+    inteiros e reduzidos com ``reduce`` pelo ``resize``.
+    """
+    if image.format != 'JPEG':
+        return
+    if image.getexif().get(ORIENTATION_TAG, 1) in (5, 6, 7, 8):
+        width, height = height, width
+    image.draft('RGB', (width, height))
+
+
+def _prepare(image: 'Image.Image') -> 'Image.Image':
+    from PIL import ImageOps
+
+    # Aplica a orientação do EXIF antes de descartá-lo
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        has_alpha = image.mode in ('LA', 'PA', 'RGBa') or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+    for key in STRIPPED_INFO:
+        image.info.pop(key, None)
+    return image
+
+
+def generate_derivatives(source: str, media_root: str, digest: str, widths: Sequence[int],
+                         formats: Sequence[str], quality: int = 80) -> Dict:
+    """Gera as variantes de uma imagem e grava o manifesto
+
+    Retorna ``{'width', 'height', 'variants': {largura: {formato: caminho}}}``
+    com caminhos relativos a ``media_root``. Variantes já existentes não são
+    refeitas, o que torna a função idempotente.
+    """
+    # Pillow é importado aqui (no processo do pool), não no boot do Django
+    from PIL import Image
+
+    relative_dir = content_dir(digest)
+    target_dir = Path(media_root) / relative_dir
+    target_dir.mkdir(parents=True, exist_ok=True)
+
+    variants = {}
+    with Image.open(source) as original:
+        full_width, full_height = _oriented_size(original)
+        # Não amplia: larguras acima da original viram uma única variante no tamanho real
+        targets = sorted({min(width, full_width) for width in widths})
+        _decode_reduced(original, targets[-1], max(1, round(full_height * targets[-1] / full_width)))
+        image = _prepare(original)
+        for width in targets:
+            height = max(1, round(full_height * width / full_width))
+            resized = None
+            for fmt in formats:
+                name = f"{width}.{fmt}"
+                path = target_dir / name
+                if not path.exists():
+                    if resized is None:
+                        resized = image if (width, height) == image.size else image.resize(
+                            (width, height), Image.Resampling.LANCZOS, reducing_gap=3.0
+                        )
+                    temporary = target_dir / f".{name}.tmp"
+                    resized.save(temporary, format=fmt.upper(), quality=quality, **SAVE_OPTIONS.get(fmt, {}))
+                    os.replace(temporary, path)
+                variants.setdefault(str(width), {})[fmt] = f"{relative_dir}/{name}"
+        manifest = {'width': full_width, 'height': full_height, 'variants': variants}
+
+    (target_dir / MANIFEST_NAME).write_text(json.dumps(manifest))
+    return manifest
+
+
+def derivative_options() -> Dict:
+    """Parâmetros de ``generate_derivatives`` vindos das settings"""
+    return {
+        'media_root': str(settings.MEDIA_ROOT),
+        'widths': list(settings.IMAGE_VARIANT_WIDTHS),
+        'formats': supported_formats(settings.IMAGE_VARIANT_FORMATS),
+        'quality': settings.IMAGE_VARIANT_QUALITY,
+    }
+
+
+def process_pool(max_workers: int = None) -> ProcessPoolExecutor:
+    # spawn: o processo web tem threads e conexões abertas que não devem ser herdadas via fork
+    return ProcessPoolExecutor(max_workers=max_workers or settings.IMAGE_WORKERS, mp_context=get_context('spawn'))
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def executor() -> ProcessPoolExecutor:
+    """Pool compartilhado do processo, criado no primeiro uso"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = process_pool()
+    return _executor
+
+
+def schedule(image) -> Future:
+    """Agenda as derivadas de um ``PropertyImage`` e atualiza o registro ao terminar"""
+    from django.db import connection
+
+    from .models import PropertyImage
+
+    image_id = image.pk
+    caller = threading.current_thread()
+    future = executor().submit(
+        generate_derivatives, image.original.path, digest=image.content_hash, **derivative_options()
+    )
+
+    def done(result: Future):
+        # Normalmente roda numa thread interna do pool, que não deve manter
+        # conexão aberta; se o futuro já tinha terminado, roda no chamador
+        try:
+            error = result.exception()
+            if error:
+                logger.error(f"Falha ao processar imagem {image_id}: {error}")
+                PropertyImage.objects.filter(pk=image_id).update(status=PropertyImage.Status.FAILED)
+            else:
+                PropertyImage.objects.filter(pk=image_id).update(**PropertyImage.manifest_fields(result.result()))
+        finally:
+            if threading.current_thread() is not caller:
+                connection.close()
+
+    future.add_done_callback(done)
+    return future
@@ -0,0 +1,290 @@
+"""Importação em massa de planilhas de propriedades para o backend Rust.
+
+O pipeline tem quatro estágios encadeados por geradores, então a planilha
+nunca é carregada inteira em memória:
+
+1. leitura em streaming (CSV ou XLSX em modo ``read_only``);
+2. validação em paralelo, em blocos, num ``ProcessPoolExecutor``;
+3. envio ao backend em lotes (``RustAPIService.batch_write``, uma requisição
+   por lote);
+4. checkpoint em arquivo ao fim de cada lote, para retomar de onde parou.
+
+Linhas rejeitadas (na validação ou pela API) vão para um relatório CSV com
+o número da linha e o motivo.
+"""
+import csv
+import json
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from apps.core.services import rust_api
+
+logger = logging.getLogger('rust_api')
+
+COLUMNS = ('title', 'description', 'price', 'location', 'property_type', 'status')
+REQUIRED = ('title', 'price', 'location', 'property_type')
+DEFAULT_STATUS = 'Disponível'
+VALIDATION_CHUNK = 1000
+
+Row = Tuple[int, Dict[str, str]]
+
+
+class ImportFileError(Exception):
+    """Arquivo de importação ilegível ou em formato não suportado"""
+
+
+def _normalize_header(value) -> str:
+    return str(value or '').strip().lower().replace(' ', '_')
+
+
+def read_csv(path: Path) -> Iterator[Row]:
+    with open(path, encoding='utf-8-sig', newline='') as handle:
+        sample = handle.read(4096)
+        handle.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(handle, dialect)
+        header = [_normalize_header(h) for h in next(reader, [])]
+        # Linha 1 é o cabeçalho, como na planilha original
+        for number, values in enumerate(reader, start=2):
+            if any(values):
+                yield number, dict(zip(header, values))
+
+
+def read_xlsx(path: Path) -> Iterator[Row]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFileError('Importar XLSX requer o pacote openpyxl (pip install openpyxl)')
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [_normalize_header(h) for h in next(rows, ())]
+        for number, values in enumerate(rows, start=2):
+            if any(v not in (None, '') for v in values):
+                yield number, {k: '' if v is None else str(v) for k, v in zip(header, values)}
+    finally:
+        workbook.close()
+
+
+def read_rows(path) -> Iterator[Row]:
+    """Linhas ``(número, {coluna: valor})`` da planilha, em streaming"""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == '.csv':
+        return read_csv(path)
+    if suffix in ('.xlsx', '.xlsm'):
+        return read_xlsx(path)
+    raise ImportFileError(f'Formato não suportado: {suffix or path.name} (use .csv ou .xlsx)')
+
+
+def parse_price(value: str) -> Decimal:
+    """Aceita "450000", "450000.50", "450.000,50" e "R$ 450.000,50" """
+    text = str(value).replace('R$', '').replace(' ', '').strip()
+    if ',' in text:
+        text = text.replace('.', '').replace(',', '.')
+    price = Decimal(text)
+    # "Infinity", "NaN" e "1e999" (infinito como float) não viram JSON válido: o lote inteiro seria recusado
+    if not price.is_finite() or not math.isfinite(float(price)):
+        raise InvalidOperation(text)
+    return price
+
+
+def validate_row(row: Row) -> Tuple[int, Dict, List[str]]:
+    """Valida e normaliza uma linha; retorna ``(número, payload, erros)``"""
+    number, data = row
+    errors = [f'{name} obrigatório' for name in REQUIRED if not str(data.get(name, '')).strip()]
+
+    payload = {name: str(data.get(name, '')).strip() for name in COLUMNS}
+    payload['status'] = payload['status'] or DEFAULT_STATUS
+
+    if payload['price']:
+        try:
+            price = parse_price(payload['price'])
+            if price < 0:
+                errors.append('price negativo')
+            payload['price'] = float(price)
+        except InvalidOperation:
+            errors.append(f"price inválido: {payload['price']!r}")
+    if payload['location'] and ',' not in payload['location']:
+        errors.append('location deve estar no formato "Cidade, UF"')
+
+    return number, payload, errors
+
+
+def validate_chunk(rows: List[Row]) -> List[Tuple[int, Dict, List[str]]]:
+    return [validate_row(row) for row in rows]
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def validated(rows: Iterable[Row], workers: int = 1) -> Iterator[Tuple[int, Dict, List[str]]]:
+    """Valida as linhas em blocos, em paralelo quando ``workers > 1``
+
+    ``Executor.map`` preserva a ordem, o que mantém o checkpoint contíguo.
+    """
+    chunks = _chunks(rows, VALIDATION_CHUNK)
+    if workers <= 1:
+        for chunk in chunks:
+            yield from validate_chunk(chunk)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map consome a entrada inteira ao enfileirar; limitamos a janela em
+        # 2 blocos por processo para não ler a planilha toda de uma vez
+        for window in _chunks(chunks, workers * 2):
+            for results in executor.map(validate_chunk, window):
+                yield from results
+
+
+class Checkpoint:
+    """Última linha confirmada no backend, gravada de forma atômica"""
+
+    def __init__(self, path):
+        self.path = Path(path) if path else None
+        self.state = {'last_row': 0, 'created': 0, 'failed': 0}
+        if self.path and self.path.exists():
+            self.state.update(json.loads(self.path.read_text()))
+
+    @property
+    def last_row(self) -> int:
+        return self.state['last_row']
+
+    def save(self, **state):
+        self.state.update(state)
+        if not self.path:
+            return
+        temporary = self.path.with_suffix(self.path.suffix + '.tmp')
+        temporary.write_text(json.dumps(self.state))
+        os.replace(temporary, self.path)
+
+
+class ErrorReport:
+    """Relatório CSV das linhas rejeitadas (acrescenta ao retomar)"""
+
+    def __init__(self, path):
+        self.path = Path(path) if path else None
+        self.count = 0
+        self._handle = None
+        self._writer = None
+
+    def add(self, number: int, stage: str, message: str, data: Optional[Dict] = None):
+        self.count += 1
+        if not self.path:
+            return
+        if self._writer is None:
+            new_file = not self.path.exists()
+            self._handle = open(self.path, 'a', encoding='utf-8', newline='')
+            self._writer = csv.writer(self._handle)
+            if new_file:
+                self._writer.writerow(['linha', 'etapa', 'erro', *COLUMNS])
+        values = [(data or {}).get(name, '') for name in COLUMNS]
+        self._writer.writerow([number, stage, message, *values])
+
+    def flush(self):
+        if self._handle:
+            self._handle.flush()
+
+    def close(self):
+        if self._handle:
+            self._handle.close()
+
+
+@dataclass
+class ImportStats:
+    processed: int = 0
+    created: int = 0
+    failed: int = 0
+    skipped: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+
+def send_batch(payloads: List[Dict]) -> List[Dict]:
+    """Cria as propriedades do lote; um resultado por payload, na mesma ordem"""
+    ops = [{'op': 'create', 'data': payload} for payload in payloads]
+    return list(rust_api.batch_write(ops, chunk_size=max(len(ops), 1)))
+
+
+def run_import(path, batch_size: int = 500, validation_workers: int = 1,
+               checkpoint_path=None, report_path=None,
+               progress: Optional[Callable[[ImportStats], None]] = None) -> ImportStats:
+    """Executa o pipeline completo e retorna as estatísticas
+
+    Com ``checkpoint_path``, linhas já confirmadas numa execução anterior são
+    puladas.
+    """
+    checkpoint = Checkpoint(checkpoint_path)
+    report = ErrorReport(report_path)
+    stats = ImportStats()
+    resume_from = checkpoint.last_row
+
+    rows = read_rows(path)
+    try:
+        for batch in _chunks(validated(rows, validation_workers), batch_size):
+            fresh = [entry for entry in batch if entry[0] > resume_from]
+            stats.skipped += len(batch) - len(fresh)
+            if not fresh:
+                continue
+
+            pending, failed = [], 0
+            for number, payload, errors in fresh:
+                if errors:
+                    failed += 1
+                    report.add(number, 'validação', '; '.join(errors), payload)
+                else:
+                    pending.append((number, payload))
+
+            created = 0
+            results = send_batch([payload for _, payload in pending]) if pending else []
+            for (number, payload), result in zip(pending, results):
+                if result.get('status') == 201:
+                    created += 1
+                else:
+                    failed += 1
+                    report.add(number, 'api', result.get('error') or f"status {result.get('status')}", payload)
+
+            stats.processed += len(fresh)
+            stats.created += created
+            stats.failed += failed
+            # O relatório vai para o disco antes do checkpoint avançar
+            report.flush()
+            checkpoint.save(
+                last_row=fresh[-1][0],
+                created=checkpoint.state['created'] + created,
+                failed=checkpoint.state['failed'] + failed,
+            )
+            if progress:
+                progress(stats)
+    finally:
+        report.close()
+
+    logger.info(
+        f"Importação de {path}: {stats.created} criadas, {stats.failed} com erro, "
+        f"{stats.skipped} já importadas ({stats.rows_per_second:.0f} linhas/s)"
+    )
+    return stats
@@ -0,0 +1,49 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.core import changefeed
+from apps.core.services import rust_api
+from apps.properties.changes import apply_events, load_cursor, resync
+
+MAX_BACKOFF = 60
+
+
+class Command(BaseCommand):
+    help = 'Consome o feed de mudanças do backend Rust, mantendo cache e espelho local em dia'
+
+    def add_arguments(self, parser):
+        feed = settings.RUST_CHANGE_FEED
+        parser.add_argument('--wait', type=int, default=feed['WAIT'], help='Segundos de long-poll por consulta')
+        parser.add_argument('--limit', type=int, default=feed['BATCH'], help='Eventos por consulta')
+        parser.add_argument('--once', action='store_true', help='Aplica o que estiver pendente e sai')
+
+    def handle(self, *args, **options):
+        since = load_cursor().seq
+        self.stdout.write(f'Consumindo mudanças a partir do seq {since}')
+        backoff, applied = 1, 0
+        while True:
+            feed = rust_api.get_changes(since, limit=options['limit'], wait=0 if options['once'] else options['wait'])
+            if feed is None:
+                if options['once']:
+                    self.stderr.write(self.style.ERROR('❌ Backend Rust indisponível'))
+                    return
+                # Sem sinal de vida: o cache volta ao TTL normal até o feed responder
+                time.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+                continue
+            backoff = 1
+            changefeed.beat()
+
+            if feed.get('reset'):
+                total = resync(feed['last_seq'])
+                self.stdout.write(self.style.WARNING(f'⚠️ Feed reiniciado: {total} propriedades ressincronizadas'))
+            elif feed['events'] or feed['last_seq'] != since:
+                applied += apply_events(feed['events'], feed['last_seq'])
+            since = feed['last_seq']
+
+            # Lote cheio: ainda há eventos pendentes
+            if options['once'] and len(feed['events']) < options['limit']:
+                self.stdout.write(self.style.SUCCESS(f'✅ {applied} propriedades atualizadas até o seq {since}'))
+                return
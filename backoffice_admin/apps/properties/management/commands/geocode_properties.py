@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from apps.properties.catalog import bump_catalog_version
+from apps.properties.geo import geocode
+from apps.properties.models import Property
+
+
+class Command(BaseCommand):
+    help = 'Preenche latitude/longitude das propriedades a partir do gazetteer de municípios'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Recalcula também as já geocodificadas')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        queryset = Property.objects.only('id', 'location', 'latitude', 'longitude')
+        if not options['all']:
+            queryset = queryset.filter(latitude__isnull=True)
+
+        batch, updated, missing = [], 0, set()
+        for prop in queryset.iterator(chunk_size=options['batch_size']):
+            coords = geocode(prop.location)
+            if coords is None:
+                missing.add(prop.location)
+                continue
+            prop.latitude, prop.longitude = coords
+            batch.append(prop)
+            if len(batch) >= options['batch_size']:
+                updated += Property.objects.bulk_update(batch, ['latitude', 'longitude'])
+                batch = []
+        if batch:
+            updated += Property.objects.bulk_update(batch, ['latitude', 'longitude'])
+
+        if updated:
+            bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(f'✅ {updated} propriedades geocodificadas'))
+        if missing:
+            self.stdout.write(self.style.WARNING(f'{len(missing)} localizações fora do gazetteer:'))
+            for location in sorted(missing)[:20]:
+                self.stdout.write(f'   {location or "(vazia)"}')
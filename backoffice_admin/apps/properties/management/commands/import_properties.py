@@ -0,0 +1,65 @@
+import os
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.limiter import batch_priority
+from apps.core.services import MAX_BATCH_OPS
+from apps.properties.imports import ImportFileError, run_import
+
+
+class Command(BaseCommand):
+    help = 'Importa propriedades de uma planilha CSV/XLSX para o backend Rust'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Arquivo .csv ou .xlsx')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help=f'Linhas por requisição ao backend (máx. {MAX_BATCH_OPS})')
+        parser.add_argument('--validation-workers', type=int, default=os.cpu_count() or 1,
+                            help='Processos usados na validação')
+        parser.add_argument('--checkpoint', help='Arquivo de checkpoint (padrão: <arquivo>.checkpoint.json)')
+        parser.add_argument('--report', help='Relatório de erros (padrão: <arquivo>.erros.csv)')
+        parser.add_argument('--restart', action='store_true', help='Ignora o checkpoint e começa do início')
+
+    def handle(self, *args, **options):
+        if not 1 <= options['batch_size'] <= MAX_BATCH_OPS:
+            raise CommandError(f'--batch-size deve estar entre 1 e {MAX_BATCH_OPS}')
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'Arquivo não encontrado: {path}')
+        checkpoint = Path(options['checkpoint'] or f'{path}.checkpoint.json')
+        report = Path(options['report'] or f'{path}.erros.csv')
+        if options['restart']:
+            checkpoint.unlink(missing_ok=True)
+            report.unlink(missing_ok=True)
+
+        def progress(stats):
+            self.stdout.write(
+                f'\r{stats.processed} linhas | {stats.created} criadas | {stats.failed} erros | '
+                f'{stats.rows_per_second:.0f} linhas/s',
+                ending='',
+            )
+            self.stdout.flush()
+
+        try:
+            with batch_priority():
+                stats = run_import(
+                    path,
+                    batch_size=options['batch_size'],
+                    validation_workers=options['validation_workers'],
+                    checkpoint_path=checkpoint,
+                    report_path=report,
+                    progress=progress,
+                )
+        except ImportFileError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {stats.created} propriedades criadas em {stats.elapsed:.1f}s '
+            f'({stats.rows_per_second:.0f} linhas/s)'
+        ))
+        if stats.skipped:
+            self.stdout.write(f'{stats.skipped} linhas já importadas anteriormente (checkpoint)')
+        if stats.failed:
+            self.stdout.write(self.style.WARNING(f'{stats.failed} linhas com erro, veja {report}'))
@@ -0,0 +1,67 @@
+import time
+from concurrent.futures import as_completed
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.properties.images import MANIFEST_NAME, content_dir, derivative_options, generate_derivatives, process_pool
+from apps.properties.models import PropertyImage
+
+
+class Command(BaseCommand):
+    help = 'Gera novamente as variantes das fotos existentes, em paralelo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Processos (padrão: settings.IMAGE_WORKERS)')
+        parser.add_argument('--only-pending', action='store_true',
+                            help='Processa só fotos pendentes ou com falha')
+        parser.add_argument('--force', action='store_true',
+                            help='Apaga as variantes existentes antes de gerar')
+
+    def handle(self, *args, **options):
+        queryset = PropertyImage.objects.all()
+        if options['only_pending']:
+            queryset = queryset.exclude(status=PropertyImage.Status.READY)
+
+        # Uma tarefa por conteúdo: fotos duplicadas compartilham as variantes
+        sources = {}
+        for digest, name in queryset.values_list('content_hash', 'original').iterator():
+            sources.setdefault(digest, str(Path(settings.MEDIA_ROOT) / name))
+        total = len(sources)
+        if not total:
+            self.stdout.write('Nenhuma foto para processar.')
+            return
+
+        if options['force']:
+            for digest in sources:
+                for path in (Path(settings.MEDIA_ROOT) / content_dir(digest)).iterdir():
+                    if path.name != MANIFEST_NAME and not path.name.startswith('original'):
+                        path.unlink()
+
+        started, done, failed = time.perf_counter(), 0, 0
+        generation = derivative_options()
+        with process_pool(options['workers']) as pool:
+            futures = {
+                pool.submit(generate_derivatives, source, digest=digest, **generation): digest
+                for digest, source in sources.items()
+            }
+            for future in as_completed(futures):
+                digest = futures[future]
+                images = PropertyImage.objects.filter(content_hash=digest)
+                try:
+                    images.update(**PropertyImage.manifest_fields(future.result()))
+                except Exception as e:
+                    failed += 1
+                    images.update(status=PropertyImage.Status.FAILED)
+                    self.stderr.write(f'\n{digest[:12]}: {e}')
+                done += 1
+                rate = done / (time.perf_counter() - started)
+                self.stdout.write(f'\r{done}/{total} imagens ({rate:.1f}/s, {failed} falhas)', ending='')
+                self.stdout.flush()
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {done - failed} imagens processadas em {time.perf_counter() - started:.1f}s'
+        ))
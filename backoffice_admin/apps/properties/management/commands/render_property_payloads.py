@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.core import http_cache
+from apps.properties.catalog import ALL_TAG
+from apps.properties.rendering import render_payloads
+
+
+class Command(BaseCommand):
+    help = 'Renderiza os payloads JSON de todas as propriedades em todos os idiomas (após mudar LANGUAGES ou o formato)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = render_payloads(batch_size=options['batch_size'])
+        http_cache.purge(ALL_TAG)
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} propriedades renderizadas'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.limiter import batch_priority
+from apps.properties.sync import sync_properties
+
+
+class Command(BaseCommand):
+    help = 'Sincroniza o espelho local de propriedades com o backend Rust'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        with batch_priority():
+            total = sync_properties(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} propriedades sincronizadas'))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Property',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rust_id', models.PositiveIntegerField(unique=True, verbose_name='ID no backend Rust')),
+                ('title', models.CharField(max_length=255, verbose_name='título')),
+                ('description', models.TextField(blank=True, verbose_name='descrição')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=14, verbose_name='preço')),
+                ('location', models.CharField(blank=True, max_length=255, verbose_name='localização')),
+                ('property_type', models.CharField(blank=True, max_length=100, verbose_name='tipo')),
+                ('status', models.CharField(blank=True, max_length=50, verbose_name='status')),
+                ('synced_at', models.DateTimeField(auto_now=True, verbose_name='sincronizado em')),
+            ],
+            options={
+                'verbose_name': 'propriedade',
+                'verbose_name_plural': 'propriedades',
+                'ordering': ['rust_id'],
+                'indexes': [models.Index(fields=['property_type', 'location'], name='properties__propert_85d8ee_idx')],
+            },
+        ),
+    ]
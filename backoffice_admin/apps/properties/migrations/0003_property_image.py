@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:35
+
+import apps.properties.images
+import apps.properties.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0002_property_coordinates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original', models.ImageField(height_field='height', storage=apps.properties.images.ContentAddressedStorage(), upload_to=apps.properties.models.image_upload_to, verbose_name='imagem', width_field='width')),
+                ('content_hash', models.CharField(db_index=True, editable=False, max_length=64, verbose_name='SHA-256')),
+                ('width', models.PositiveIntegerField(editable=False, null=True)),
+                ('height', models.PositiveIntegerField(editable=False, null=True)),
+                ('variants', models.JSONField(blank=True, default=dict, editable=False, verbose_name='variantes')),
+                ('status', models.CharField(choices=[('pending', 'Processando'), ('ready', 'Pronta'), ('failed', 'Falhou')], default='pending', editable=False, max_length=10)),
+                ('position', models.PositiveSmallIntegerField(default=0, verbose_name='ordem')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='properties.property')),
+            ],
+            options={
+                'verbose_name': 'foto',
+                'verbose_name_plural': 'fotos',
+                'ordering': ['property', 'position', 'id'],
+            },
+        ),
+    ]
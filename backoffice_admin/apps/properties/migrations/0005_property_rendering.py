@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0004_change_feed_cursor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyRendering',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rust_id', models.PositiveIntegerField()),
+                ('language', models.CharField(max_length=10)),
+                ('body', models.BinaryField()),
+                ('rendered_at', models.DateTimeField(auto_now=True)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='renderings', to='properties.property')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('language', 'rust_id'), name='property_rendering_language_rust_id')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:37
+
+import apps.properties.images
+import apps.properties.models
+import apps.properties.uploads
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0005_property_rendering'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='propertyimage',
+            name='original',
+            field=models.ImageField(height_field='height', storage=apps.properties.images.ContentAddressedStorage(), upload_to=apps.properties.models.image_upload_to, validators=[apps.properties.uploads.validate_image_content], verbose_name='imagem', width_field='width'),
+        ),
+    ]
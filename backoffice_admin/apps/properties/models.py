@@ -1,3 +1,146 @@
-from django.db import models
+from django.db import models, transaction
 
-# Create your models here.
+from .images import ContentAddressedStorage, content_hash, original_name, schedule
+from .uploads import file_content_type, validate_image_content
+
+
+class Property(models.Model):
+    """Espelho local (read model) das propriedades do backend Rust"""
+
+    rust_id = models.PositiveIntegerField("ID no backend Rust", unique=True)
+    title = models.CharField("título", max_length=255)
+    description = models.TextField("descrição", blank=True)
+    price = models.DecimalField("preço", max_digits=14, decimal_places=2)
+    location = models.CharField("localização", max_length=255, blank=True)
+    property_type = models.CharField("tipo", max_length=100, blank=True)
+    status = models.CharField("status", max_length=50, blank=True)
+    latitude = models.FloatField("latitude", null=True, blank=True)
+    longitude = models.FloatField("longitude", null=True, blank=True)
+    synced_at = models.DateTimeField("sincronizado em", auto_now=True)
+
+    class Meta:
+        verbose_name = "propriedade"
+        verbose_name_plural = "propriedades"
+        ordering = ["rust_id"]
+        indexes = [
+            models.Index(fields=["property_type", "location"]),
+            models.Index(fields=["latitude", "longitude"]),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    @property
+    def city(self) -> str:
+        """Cidade extraída de ``location`` ("Cidade, UF")"""
+        return self.location.rsplit(",", 1)[0].strip()
+
+
+def image_upload_to(instance, filename):
+    # O nome enviado é ignorado: hash e tipo vêm do conteúdo (PropertyImage.save)
+    return original_name(instance.content_hash, getattr(instance, "original_type", None))
+
+
+class PropertyImage(models.Model):
+    """Foto de uma propriedade; as variantes são geradas em segundo plano"""
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Processando"
+        READY = "ready", "Pronta"
+        FAILED = "failed", "Falhou"
+
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name="images")
+    original = models.ImageField(
+        "imagem",
+        upload_to=image_upload_to,
+        storage=ContentAddressedStorage(),
+        validators=[validate_image_content],
+        width_field="width",
+        height_field="height",
+    )
+    content_hash = models.CharField("SHA-256", max_length=64, db_index=True, editable=False)
+    width = models.PositiveIntegerField(null=True, editable=False)
+    height = models.PositiveIntegerField(null=True, editable=False)
+    variants = models.JSONField("variantes", default=dict, blank=True, editable=False)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING, editable=False)
+    position = models.PositiveSmallIntegerField("ordem", default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "foto"
+        verbose_name_plural = "fotos"
+        ordering = ["property", "position", "id"]
+
+    def __str__(self):
+        return f"{self.property} #{self.position}"
+
+    @staticmethod
+    def manifest_fields(manifest):
+        """Campos atualizados a partir do manifesto de ``generate_derivatives``"""
+        return {
+            "variants": manifest["variants"],
+            "width": manifest["width"],
+            "height": manifest["height"],
+            "status": PropertyImage.Status.READY,
+        }
+
+    def save(self, *args, **kwargs):
+        if self.original and not self.original._committed:
+            # Arquivo novo (criação ou troca da foto); o StreamingMediaUploadHandler já calcula o hash no upload
+            digest = getattr(self.original.file, "content_hash", None) or content_hash(self.original.chunks())
+            self.original_type = file_content_type(self.original.file)
+            if digest != self.content_hash:
+                # Outro conteúdo: outro caminho, e as variantes da foto anterior não valem mais
+                self.content_hash = digest
+                self.status, self.variants = self.Status.PENDING, {}
+        super().save(*args, **kwargs)
+
+        if self.status != self.Status.PENDING:
+            return
+        # Mesmo conteúdo já processado: reaproveita as variantes
+        twin = (
+            PropertyImage.objects.filter(content_hash=self.content_hash, status=self.Status.READY)
+            .exclude(pk=self.pk)
+            .values("variants", "width", "height")
+            .first()
+        )
+        if twin:
+            PropertyImage.objects.filter(pk=self.pk).update(status=self.Status.READY, **twin)
+            self.status, self.variants = self.Status.READY, twin["variants"]
+            return
+
+        transaction.on_commit(lambda: schedule(self))
+
+
+class ChangeFeedCursor(models.Model):
+    """Último ``seq`` do feed de mudanças do backend Rust aplicado ao espelho local"""
+
+    name = models.CharField(max_length=50, unique=True, default="properties")
+    seq = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "cursor do feed de mudanças"
+        verbose_name_plural = "cursores do feed de mudanças"
+
+    def __str__(self):
+        return f"{self.name} @ {self.seq}"
+
+
+class PropertyRendering(models.Model):
+    """Payload JSON já serializado de uma propriedade num idioma (``apps/properties/rendering.py``)"""
+
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name="renderings")
+    # Repetido da propriedade: a listagem pagina por (idioma, rust_id) sem join
+    rust_id = models.PositiveIntegerField()
+    language = models.CharField(max_length=10)
+    body = models.BinaryField()
+    rendered_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["language", "rust_id"], name="property_rendering_language_rust_id"),
+        ]
+
+    def __str__(self):
+        return f"{self.rust_id} ({self.language})"
@@ -0,0 +1,100 @@
+"""Payloads JSON das propriedades materializados por idioma.
+
+Preço formatado e rótulo do status dependem do idioma. Em vez de montar e
+serializar o payload a cada requisição, cada escrita no catálogo
+(``bump_catalog_version``) renderiza de novo as propriedades alteradas em
+todos os idiomas de ``LANGUAGES`` e grava o JSON compacto em
+``PropertyRendering``. A API só concatena os bytes guardados.
+"""
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from django.conf import settings
+from django.utils import translation
+from django.utils.formats import number_format
+
+from apps.core import codec
+
+from .models import Property, PropertyRendering
+
+FIELDS = ['rust_id', 'title', 'description', 'price', 'location', 'property_type', 'status', 'latitude', 'longitude']
+
+STATUS_LABELS = {
+    'Disponível': {'pt-br': 'Disponível', 'en': 'Available'},
+    'Vendido': {'pt-br': 'Vendido', 'en': 'Sold'},
+}
+CURRENCY_FORMAT = {'pt-br': 'R$ {}', 'en': 'R${}'}
+
+
+def languages() -> List[str]:
+    return [code for code, _ in settings.LANGUAGES]
+
+
+def rendering_language(language: Optional[str]) -> str:
+    """Idioma materializado mais próximo de ``language`` (o padrão do projeto se não houver)"""
+    return language if language in languages() else settings.LANGUAGE_CODE
+
+
+def property_payload(row: Dict, language: str) -> Dict:
+    """Payload de uma linha de ``Property.objects.values(*FIELDS)`` no idioma ``language``"""
+    payload = {'id': row['rust_id'], **{name: row[name] for name in FIELDS[1:]}}
+    payload['price'] = float(row['price'])
+    with translation.override(language):
+        amount = number_format(row['price'], 2, force_grouping=True)
+    payload['price_display'] = CURRENCY_FORMAT.get(language, 'R$ {}').format(amount)
+    payload['status_label'] = STATUS_LABELS.get(row['status'], {}).get(language, row['status'])
+    return payload
+
+
+def _renderings(rows: Iterable[Dict]) -> Iterator[PropertyRendering]:
+    codes = languages()
+    for row in rows:
+        for language in codes:
+            yield PropertyRendering(
+                property_id=row['pk'],
+                rust_id=row['rust_id'],
+                language=language,
+                body=codec.dumps(property_payload(row, language)),
+            )
+
+
+def render_payloads(rust_ids: Optional[Iterable[int]] = None, batch_size: int = 500) -> int:
+    """Materializa os payloads das propriedades (todas, sem ``rust_ids``); retorna quantas
+
+    Propriedades removidas levam junto as suas renderizações (``CASCADE``).
+    """
+    queryset = Property.objects.values('pk', *FIELDS).order_by()
+    if rust_ids is not None:
+        queryset = queryset.filter(rust_id__in=list(rust_ids))
+    total, batch = 0, []
+    for row in queryset.iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            total += _save(batch)
+            batch = []
+    if batch:
+        total += _save(batch)
+    return total
+
+
+def _save(rows: List[Dict]) -> int:
+    PropertyRendering.objects.bulk_create(
+        list(_renderings(rows)),
+        update_conflicts=True,
+        unique_fields=['language', 'rust_id'],
+        update_fields=['property', 'body', 'rendered_at'],
+    )
+    return len(rows)
+
+
+def page_body(language: str, offset: int, limit: int) -> bytes:
+    """Página da listagem como array JSON, montada com os bytes guardados"""
+    bodies = (
+        PropertyRendering.objects.filter(language=language)
+        .order_by('rust_id')
+        .values_list('body', flat=True)[offset:offset + limit]
+    )
+    return b'[' + b','.join(bodies) + b']'
+
+
+def detail_body(language: str, rust_id: int) -> Optional[bytes]:
+    return PropertyRendering.objects.filter(language=language, rust_id=rust_id).values_list('body', flat=True).first()
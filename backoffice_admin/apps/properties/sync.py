@@ -0,0 +1,67 @@
+import logging
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from apps.core.payloads import PropertyPayload
+from apps.core.services import rust_api
+
+from .catalog import bump_catalog_version
+from .geo import geocode
+from .models import Property
+
+logger = logging.getLogger('rust_api')
+
+SYNC_FIELDS = ['title', 'description', 'price', 'location', 'property_type', 'status', 'latitude', 'longitude']
+
+
+def property_from_payload(data: PropertyPayload) -> Property:
+    """Converte a propriedade do backend Rust em uma instância (não salva) de Property"""
+    coords = geocode(data.location) or (None, None)
+    return Property(
+        rust_id=data.id,
+        title=data.title,
+        description=data.description,
+        price=data.price,
+        location=data.location,
+        property_type=data.property_type,
+        status=data.status,
+        latitude=coords[0],
+        longitude=coords[1],
+    )
+
+
+def _batches(items: Iterable[PropertyPayload], size: int) -> Iterator[List[PropertyPayload]]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def sync_properties(batch_size: int = 500, progress: Optional[Callable[[int], None]] = None,
+                    bump_catalog: bool = True) -> int:
+    """Atualiza o espelho local com todas as propriedades do backend Rust
+
+    Faz upsert em lotes (``bulk_create`` com ``update_conflicts``) e retorna
+    a quantidade de registros sincronizados. ``progress`` recebe o total
+    acumulado ao fim de cada lote. Com ``bump_catalog=False`` o
+    ``bump_catalog_version`` (que renderiza de novo todo o catálogo) fica
+    para quem chama.
+    """
+    total = 0
+    for batch in _batches(rust_api.iter_properties(limit=batch_size), batch_size):
+        Property.objects.bulk_create(
+            [property_from_payload(item) for item in batch],
+            update_conflicts=True,
+            unique_fields=['rust_id'],
+            update_fields=SYNC_FIELDS + ['synced_at'],
+        )
+        total += len(batch)
+        if progress:
+            progress(total)
+    logger.info(f"{total} propriedades sincronizadas")
+    if bump_catalog:
+        bump_catalog_version()
+    return total
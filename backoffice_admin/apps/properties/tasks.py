@@ -0,0 +1,101 @@
+"""Tarefas em segundo plano das propriedades (executadas por ``manage.py run_jobs``)"""
+from pathlib import Path
+from typing import Dict, List
+
+from django.conf import settings
+
+from apps.core.jobs import PermanentError, task
+from apps.core.selection import load_selection
+from apps.core.services import rust_api
+
+from .catalog import bump_catalog_version
+from .images import derivative_options, generate_derivatives
+from .imports import ImportFileError, run_import
+from .models import Property, PropertyImage
+from .sync import sync_properties
+
+
+@task('properties.sync')
+def sync(job, batch_size: int = 500):
+    """Sincronização completa do espelho local"""
+    if not rust_api.health_check():
+        # Sem o backend a sincronização leria zero páginas e "terminaria" sem erro
+        raise RuntimeError("Backend Rust indisponível")
+    total = sync_properties(batch_size=batch_size, progress=lambda done: job.progress(done, message='Sincronizando'))
+    return {'synced': total}
+
+
+@task('properties.set_status')
+def set_status(job, selection: Dict, status: str, batch_size: int = 500):
+    """Altera o status das propriedades da ``selection`` (``dump_selection``) no backend Rust e no espelho local"""
+    rust_ids = sorted(load_selection(Property, selection, job.created_by).values_list('rust_id', flat=True))
+    ops = ({'op': 'update', 'id': rust_id, 'data': {'status': status}} for rust_id in rust_ids)
+    updated, missing, failed = [], [], 0
+    for done, result in enumerate(rust_api.batch_write(ops, chunk_size=batch_size), start=1):
+        rust_id = rust_ids[result['index']]
+        if result['status'] == 200:
+            updated.append(rust_id)
+        elif result['status'] == 404:
+            missing.append(rust_id)
+        else:
+            failed += 1
+        job.progress(done, total=len(rust_ids))
+
+    # O cache das respostas do backend já foi invalidado pelo batch_write
+    Property.objects.filter(rust_id__in=updated).update(status=status)
+    if updated:
+        bump_catalog_version(updated)
+    if failed:
+        # Atualizar o status de novo é inofensivo: a nova tentativa repete o lote inteiro
+        raise RuntimeError(f"{failed} de {len(rust_ids)} propriedades não foram atualizadas")
+    return {'updated': len(updated), 'missing': missing}
+
+
+@task('properties.import')
+def import_file(job, path: str, batch_size: int = 500):
+    """Importação de planilha já gravada em ``MEDIA_ROOT/imports``
+
+    O checkpoint fica ao lado do arquivo: uma nova tentativa continua de
+    onde a anterior parou.
+    """
+    target = Path(path)
+    report = target.with_name(target.name + '.erros.csv')
+    try:
+        stats = run_import(
+            target,
+            batch_size=batch_size,
+            checkpoint_path=target.with_name(target.name + '.checkpoint.json'),
+            report_path=report,
+            progress=lambda stats: job.progress(
+                stats.processed + stats.skipped,
+                message=f"{stats.created} criadas, {stats.failed} com erro",
+            ),
+        )
+    except ImportFileError as e:
+        raise PermanentError(str(e))
+    return {
+        'created': stats.created,
+        'failed': stats.failed,
+        'skipped': stats.skipped,
+        'report': f"{settings.MEDIA_URL}imports/{report.name}" if stats.failed else None,
+    }
+
+
+@task('properties.regenerate_images')
+def regenerate_images(job, property_ids: List[int]):
+    """Gera novamente as variantes das fotos das propriedades, uma vez por conteúdo"""
+    images = PropertyImage.objects.filter(property_id__in=property_ids)
+    sources = {}
+    for digest, name in images.values_list('content_hash', 'original'):
+        sources.setdefault(digest, str(Path(settings.MEDIA_ROOT) / name))
+
+    options, failed = derivative_options(), 0
+    for done, (digest, source) in enumerate(sources.items(), start=1):
+        same_content = images.filter(content_hash=digest)
+        try:
+            same_content.update(**PropertyImage.manifest_fields(generate_derivatives(source, digest=digest, **options)))
+        except Exception:
+            failed += 1
+            same_content.update(status=PropertyImage.Status.FAILED)
+        job.progress(done, total=len(sources))
+    return {'processed': len(sources) - failed, 'failed': failed}
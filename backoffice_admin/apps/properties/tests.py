@@ -1,3 +1,321 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+
+from apps.core import codec
+from apps.core.payloads import PropertyPayload
+
+from .changes import apply_events, coalesce, load_cursor, resync
+from .imports import validate_row
+from .models import Property, PropertyImage, PropertyRendering
+from .rendering import FIELDS, detail_body, page_body, property_payload, render_payloads, rendering_language
+from .tasks import set_status
+from .uploads import StreamingMediaUploadHandler, sniff_content_type
+
+# Sem Redis: todos os aliases de cache em memória
+LOCMEM_CACHES = {
+    alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': alias}
+    for alias in ('default', 'rust_data', 'sessions')
+}
+
+
+def png(color, name='foto.png'):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (4, 3), color).save(buffer, format='PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+def stored_files(root):
+    return sorted(str(path.relative_to(root)) for path in Path(root).rglob('*') if path.is_file())
+
+
+class ValidateRowTests(SimpleTestCase):
+    def row(self, price):
+        return 2, {'title': 'Casa', 'price': price, 'location': 'Recife, PE', 'property_type': 'Casa'}
+
+    def test_price_formats(self):
+        for text, expected in [('450000', 450000), ('450.000,50', 450000.5), ('R$ 1.234,56', 1234.56)]:
+            _, payload, errors = validate_row(self.row(text))
+            self.assertEqual(errors, [])
+            self.assertEqual(Decimal(str(payload['price'])), Decimal(str(expected)))
+
+    def test_non_finite_price_is_invalid(self):
+        for text in ['Infinity', 'inf', '-inf', 'NaN', '1e999']:
+            _, _, errors = validate_row(self.row(text))
+            self.assertEqual(len(errors), 1, text)
+            self.assertIn('price inválido', errors[0])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PropertyImageTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.schedule = self.enterContext(mock.patch('apps.properties.models.schedule'))
+        self.property = Property.objects.create(rust_id=1, title='Casa', price=100)
+
+    def test_replacing_the_photo_recomputes_the_hash(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            image = PropertyImage.objects.create(property=self.property, original=png('red'))
+        PropertyImage.objects.filter(pk=image.pk).update(status=PropertyImage.Status.READY, variants={'320': {}})
+        image.refresh_from_db()
+        first_hash, first_name = image.content_hash, image.original.name
+
+        image.original = png('blue')
+        with self.captureOnCommitCallbacks(execute=True):
+            image.save()
+        image.refresh_from_db()
+
+        self.assertNotEqual(image.content_hash, first_hash)
+        self.assertNotEqual(image.original.name, first_name)
+        self.assertIn(image.content_hash, image.original.name)
+        self.assertEqual(image.status, PropertyImage.Status.PENDING)
+        self.assertEqual(image.variants, {})
+        self.assertEqual(self.schedule.call_count, 2)
+
+    def test_saving_without_a_new_file_keeps_the_hash(self):
+        image = PropertyImage.objects.create(property=self.property, original=png('red'))
+        PropertyImage.objects.filter(pk=image.pk).update(status=PropertyImage.Status.READY)
+        image.refresh_from_db()
+        digest = image.content_hash
+
+        image.position = 2
+        image.save()
+        image.refresh_from_db()
+        self.assertEqual(image.content_hash, digest)
+        self.assertEqual(image.status, PropertyImage.Status.READY)
+
+
+class SniffContentTypeTests(SimpleTestCase):
+    def test_signatures(self):
+        self.assertEqual(sniff_content_type(b'\x89PNG\r\n\x1a\n' + b'\0' * 8), 'image/png')
+        self.assertEqual(sniff_content_type(b'\0\0\0\x18ftypisom\0\0\0\0'), 'video/mp4')
+        self.assertEqual(sniff_content_type(b'\0\0\0\x18ftypavif\0\0\0\0'), 'image/avif')
+        self.assertIsNone(sniff_content_type(b'<html><script>'))
+
+    def test_unknown_ftyp_brand_is_rejected(self):
+        for brand in (b'3gp4', b'M4A ', b'crx ', b'zzzz'):
+            self.assertIsNone(sniff_content_type(b'\0\0\0\x18ftyp' + brand + b'\0\0\0\0'), brand)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class MediaUploadViewTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media_root))
+        self.enterContext(mock.patch('apps.properties.models.schedule'))
+        # Usuários e sessões em cache sobrevivem ao rollback de cada teste
+        for alias in LOCMEM_CACHES:
+            caches[alias].clear()
+        self.property = Property.objects.create(rust_id=1, title='Casa', price=100)
+        self.url = f'/admin/properties/property/{self.property.pk}/change/'
+        self.client = Client(enforce_csrf_checks=True)
+
+    def form(self, upload, **extra):
+        return {
+            'rust_id': 1, 'title': 'Casa', 'price': '100',
+            'images-TOTAL_FORMS': 1, 'images-INITIAL_FORMS': 0,
+            'images-MIN_NUM_FORMS': 0, 'images-MAX_NUM_FORMS': 1000,
+            'images-0-original': upload, 'images-0-position': 0,
+            **extra,
+        }
+
+    def login(self):
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'senha')
+        self.client.force_login(user)
+        self.client.get(self.url)
+        return self.client.cookies['csrftoken'].value
+
+    def test_anonymous_upload_writes_nothing(self):
+        response = self.client.post(self.url, self.form(png('red', 'original.html')))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(stored_files(self.media_root), [])
+
+    def test_rejected_csrf_removes_the_staged_file(self):
+        self.login()
+        response = self.client.post(self.url, self.form(png('red')))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(stored_files(self.media_root), [])
+        self.assertFalse(PropertyImage.objects.exists())
+
+    def test_invalid_form_removes_the_staged_file(self):
+        token = self.login()
+        response = self.client.post(self.url, self.form(png('red'), title='', csrfmiddlewaretoken=token))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(stored_files(self.media_root), [])
+
+    def test_upload_is_moved_to_the_content_addressed_path(self):
+        token = self.login()
+        complete = mock.patch.object(
+            StreamingMediaUploadHandler, 'file_complete', autospec=True,
+            side_effect=StreamingMediaUploadHandler.file_complete,
+        )
+        with complete as file_complete:
+            response = self.client.post(self.url, self.form(png('red', 'foto.jpg'), csrfmiddlewaretoken=token))
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(file_complete.called)
+        image = PropertyImage.objects.get()
+        self.assertEqual(image.original.name, f'images/{image.content_hash[:2]}/{image.content_hash[2:4]}/'
+                                              f'{image.content_hash}/original.png')
+        self.assertEqual(stored_files(self.media_root), [image.original.name])
+
+
+def event(property_id, op='update', **data):
+    return {'id': property_id, 'op': op, 'data': {'id': property_id, 'title': 'Casa', **data} if op != 'delete' else None}
+
+
+class CoalesceTests(SimpleTestCase):
+    def test_last_state_wins(self):
+        upserts, deleted = coalesce([event(1, title='A'), event(1, title='B'), event(2, 'create')])
+        self.assertEqual({key: value.title for key, value in upserts.items()}, {1: 'B', 2: 'Casa'})
+        self.assertEqual(deleted, set())
+
+    def test_update_then_delete(self):
+        upserts, deleted = coalesce([event(1), event(1, 'delete')])
+        self.assertEqual(upserts, {})
+        self.assertEqual(deleted, {1})
+
+    def test_delete_then_create(self):
+        upserts, deleted = coalesce([event(1, 'delete'), event(1, 'create')])
+        self.assertEqual(list(upserts), [1])
+        self.assertEqual(deleted, set())
+
+    def test_write_without_data_is_a_delete(self):
+        upserts, deleted = coalesce([event(1), {'id': 1, 'op': 'update'}, {'id': 2, 'op': 'update', 'data': None}])
+        self.assertEqual(upserts, {})
+        self.assertEqual(deleted, {1, 2})
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ChangeFeedTests(TestCase):
+    def setUp(self):
+        for alias in LOCMEM_CACHES:
+            caches[alias].clear()
+
+    def test_apply_events_moves_the_cursor(self):
+        Property.objects.create(rust_id=2, title='Antiga', price=1)
+        load_cursor()
+        self.assertEqual(apply_events([event(1, price=10), event(2, 'delete')], last_seq=7), 2)
+        self.assertEqual(list(Property.objects.values_list('rust_id', flat=True)), [1])
+        self.assertEqual(load_cursor().seq, 7)
+
+    def test_consumer_resumes_from_the_saved_cursor(self):
+        feeds = [
+            {'events': [event(1), event(2)], 'last_seq': 5, 'reset': False},
+            {'events': [event(3)], 'last_seq': 6, 'reset': False},
+        ]
+        with mock.patch('apps.core.services.rust_api.get_changes', side_effect=feeds) as get_changes:
+            call_command('consume_changes', once=True, limit=10, stdout=io.StringIO())
+            # Processo novo: o cursor vem do banco, não da memória
+            call_command('consume_changes', once=True, limit=10, stdout=io.StringIO())
+        self.assertEqual([call.args[0] for call in get_changes.call_args_list], [0, 5])
+        self.assertEqual(load_cursor().seq, 6)
+        self.assertEqual(Property.objects.count(), 3)
+
+    def test_resync_removes_rows_missing_upstream(self):
+        load_cursor()
+        for rust_id in (1, 2, 3):
+            Property.objects.create(rust_id=rust_id, title='Antiga', price=1)
+        upstream = [PropertyPayload(id=1, title='Nova'), PropertyPayload(id=4, title='Outra')]
+        with mock.patch('apps.core.services.rust_api.iter_properties', return_value=iter(upstream)):
+            self.assertEqual(resync(last_seq=42), 2)
+        self.assertEqual(dict(Property.objects.values_list('rust_id', 'title')), {1: 'Nova', 4: 'Outra'})
+        self.assertEqual(load_cursor().seq, 42)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SetStatusTests(TestCase):
+    def setUp(self):
+        for alias in LOCMEM_CACHES:
+            caches[alias].clear()
+        User.objects.create_superuser('admin', 'admin@example.com', 'senha')
+        for rust_id, property_type in ((1, 'Casa'), (2, 'Casa'), (3, 'Apartamento')):
+            Property.objects.create(rust_id=rust_id, title='Imóvel', price=1, property_type=property_type)
+
+    def test_updates_the_filtered_selection(self):
+        def batch_write(ops, chunk_size):
+            return ({'index': index, 'status': 200} for index, _ in enumerate(ops))
+
+        selection = {'filters': 'property_type__exact=Casa', 'pks': None}
+        with mock.patch('apps.properties.tasks.rust_api.batch_write', side_effect=batch_write):
+            result = set_status(mock.Mock(created_by='admin'), selection, 'Vendido')
+        self.assertEqual(result, {'updated': 2, 'missing': []})
+        self.assertEqual(dict(Property.objects.values_list('rust_id', 'status')), {1: 'Vendido', 2: 'Vendido', 3: ''})
+
+
+class PropertyPayloadTests(SimpleTestCase):
+    row = {
+        'rust_id': 7, 'title': 'Casa', 'description': '', 'price': Decimal('1234567.5'),
+        'location': 'Recife, PE', 'property_type': 'Casa', 'status': 'Vendido', 'latitude': None, 'longitude': None,
+    }
+
+    def test_portuguese(self):
+        payload = property_payload(self.row, 'pt-br')
+        self.assertEqual(payload['id'], 7)
+        self.assertEqual(payload['price'], 1234567.5)
+        self.assertEqual(payload['price_display'], 'R$ 1.234.567,50')
+        self.assertEqual(payload['status_label'], 'Vendido')
+
+    def test_english(self):
+        payload = property_payload(self.row, 'en')
+        self.assertEqual(payload['price_display'], 'R$1,234,567.50')
+        self.assertEqual(payload['status_label'], 'Sold')
+
+    def test_unknown_status_keeps_the_raw_value(self):
+        self.assertEqual(property_payload({**self.row, 'status': 'Reservado'}, 'en')['status_label'], 'Reservado')
+
+    def test_rendering_language(self):
+        self.assertEqual(rendering_language('en'), 'en')
+        self.assertEqual(rendering_language('fr'), 'pt-br')
+        self.assertEqual(rendering_language(None), 'pt-br')
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RenderingTests(TestCase):
+    def setUp(self):
+        for alias in LOCMEM_CACHES:
+            caches[alias].clear()
+        # Fora de ordem: a listagem ordena por rust_id
+        for rust_id in (30, 10, 20, 40):
+            Property.objects.create(rust_id=rust_id, title=f'Imóvel {rust_id}', price=rust_id * 1000, status='Disponível')
+
+    def ids(self, body):
+        return [item['id'] for item in codec.loads(body)]
+
+    def test_every_language_is_rendered(self):
+        self.assertEqual(render_payloads(), 4)
+        self.assertEqual(PropertyRendering.objects.count(), 8)
+        self.assertEqual(codec.loads(detail_body('en', 10))['status_label'], 'Available')
+        self.assertEqual(codec.loads(detail_body('pt-br', 10))['status_label'], 'Disponível')
+        self.assertIsNone(detail_body('en', 99))
+
+    def test_page_order_and_offsets(self):
+        self.assertEqual(self.ids(page_body('en', 0, 2)), [10, 20])
+        self.assertEqual(self.ids(page_body('en', 2, 2)), [30, 40])
+        self.assertEqual(self.ids(page_body('en', 3, 10)), [40])
+        self.assertEqual(page_body('en', 10, 2), b'[]')
+
+    def test_rendering_follows_the_row(self):
+        Property.objects.filter(rust_id=20).update(title='Outro')
+        render_payloads([20])
+        self.assertEqual(codec.loads(detail_body('pt-br', 20))['title'], 'Outro')
+        self.assertEqual(set(codec.loads(detail_body('pt-br', 20))), {'id', *FIELDS[1:], 'price_display', 'status_label'})
+
+    def test_delete_cascades(self):
+        Property.objects.get(rust_id=20).delete()
+        self.assertFalse(PropertyRendering.objects.filter(rust_id=20).exists())
+        self.assertEqual(self.ids(page_body('pt-br', 0, 10)), [10, 30, 40])
@@ -0,0 +1,171 @@
+"""Upload de mídia em uma única passada e com memória constante.
+
+``StreamingMediaUploadHandler`` identifica o tipo real do arquivo pelos
+primeiros bytes, calcula o SHA-256 e grava cada bloco em
+``MEDIA_ROOT/.incoming`` enquanto a requisição é lida. O arquivo só vai
+para o caminho endereçado pelo conteúdo quando o modelo é salvo, depois da
+autenticação e da validação do formulário, e por ``rename`` no mesmo
+sistema de arquivos: nada é relido nem copiado. Um upload rejeitado é
+apagado de ``.incoming`` quando a requisição fecha os arquivos.
+
+O handler não é global: ``media_upload_view`` o ativa só nas views que
+recebem fotos, e só para staff. Arquivos que não são mídia (ex.:
+planilhas de importação) seguem para os handlers padrão do Django.
+"""
+import hashlib
+import tempfile
+from functools import wraps
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+
+INCOMING_DIR = '.incoming'
+# Tipo identificado pelo conteúdo -> extensão do original
+MEDIA_EXTENSIONS = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/gif': '.gif',
+    'image/webp': '.webp',
+    'image/avif': '.avif',
+    'image/heic': '.heic',
+    'video/mp4': '.mp4',
+    'video/quicktime': '.mov',
+    'video/webm': '.webm',
+}
+MEDIA_TYPES = set(MEDIA_EXTENSIONS)
+SNIFF_BYTES = 16
+MP4_BRANDS = {b'isom', b'iso2', b'iso4', b'iso5', b'iso6', b'mp41', b'mp42', b'avc1', b'dash', b'M4V ', b'mmp4'}
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    """Tipo MIME a partir dos bytes iniciais (assinatura do formato)"""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    if head[4:8] == b'ftyp':
+        brand = head[8:12]
+        if brand in (b'avif', b'avis'):
+            return 'image/avif'
+        if brand in (b'heic', b'heix', b'mif1', b'msf1'):
+            return 'image/heic'
+        if brand == b'qt  ':
+            return 'video/quicktime'
+        if brand in MP4_BRANDS:
+            return 'video/mp4'
+        # Outras marcas ISO BMFF (3GP, áudio M4A, CR3...) não são aceitas
+        return None
+    if head.startswith(b'\x1a\x45\xdf\xa3'):
+        return 'video/webm'
+    return None
+
+
+def file_content_type(file) -> Optional[str]:
+    """Tipo MIME de um arquivo pelo conteúdo (o ``content_type`` enviado pelo cliente é ignorado)"""
+    position = file.tell()
+    file.seek(0)
+    head = file.read(SNIFF_BYTES)
+    file.seek(position)
+    return sniff_content_type(head)
+
+
+def validate_image_content(file):
+    """Validador do campo de foto: a assinatura do arquivo precisa ser de uma imagem suportada"""
+    if not (file_content_type(file) or '').startswith('image/'):
+        raise ValidationError("Formato de imagem não suportado.", code="invalid_image_type")
+
+
+class StoredMediaFile(UploadedFile):
+    """Arquivo recebido em ``.incoming``, com hash e tipo verificados
+
+    Como o ``TemporaryUploadedFile`` do Django, expõe o caminho em
+    ``temporary_file_path``: o storage o move para o destino final. Se a
+    requisição terminar sem salvar o arquivo, ``close`` o apaga.
+    """
+
+    def __init__(self, path: Path, name, content_type, size, charset, content_type_extra, content_hash):
+        super().__init__(open(path, 'rb'), name, content_type, size, charset, content_type_extra)
+        self.path = path
+        self.content_hash = content_hash
+
+    def temporary_file_path(self):
+        return str(self.path)
+
+    def close(self):
+        try:
+            return super().close()
+        finally:
+            # Já movido pelo storage, o caminho não existe mais
+            self.path.unlink(missing_ok=True)
+
+
+class StreamingMediaUploadHandler(FileUploadHandler):
+    """Grava mídia em ``.incoming``, calculando o hash em streaming"""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.active = None
+        self.sniffed_type = None
+        self.digest = hashlib.sha256()
+        self.temporary = None
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.active is None:
+            self.sniffed_type = sniff_content_type(raw_data[:SNIFF_BYTES])
+            self.active = self.sniffed_type in MEDIA_TYPES
+            if self.active:
+                incoming = Path(settings.MEDIA_ROOT) / INCOMING_DIR
+                incoming.mkdir(parents=True, exist_ok=True)
+                # Mesmo sistema de arquivos do destino: o storage só renomeia
+                self.temporary = tempfile.NamedTemporaryFile(dir=incoming, delete=False)
+        if not self.active:
+            return raw_data
+
+        self.digest.update(raw_data)
+        self.temporary.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if not self.active:
+            return None
+        self.temporary.close()
+        path, self.temporary = Path(self.temporary.name), None
+        return StoredMediaFile(
+            path, self.file_name, self.sniffed_type, file_size,
+            self.charset, self.content_type_extra, self.digest.hexdigest(),
+        )
+
+    def upload_interrupted(self):
+        if self.temporary is not None:
+            self.temporary.close()
+            Path(self.temporary.name).unlink(missing_ok=True)
+            self.temporary = None
+
+
+def media_upload_view(view):
+    """Ativa o ``StreamingMediaUploadHandler`` numa view que recebe fotos
+
+    O ``CsrfViewMiddleware`` leria o corpo antes da view, já com os
+    handlers padrão; por isso a view fica isenta no middleware e o CSRF é
+    verificado aqui, depois de instalar o handler. Só staff autenticado
+    grava em ``.incoming``.
+    """
+    protected = csrf_protect(view)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        user = getattr(request, 'user', None)
+        if request.method == 'POST' and user is not None and user.is_active and user.is_staff:
+            request.upload_handlers.insert(0, StreamingMediaUploadHandler(request))
+        return protected(request, *args, **kwargs)
+
+    return csrf_exempt(wrapper)
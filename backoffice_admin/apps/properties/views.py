@@ -1,3 +1,37 @@
-from django.shortcuts import render
+from django.contrib import admin
+from django.template.response import TemplateResponse
 
-# Create your views here.
+GROUPINGS = {
+    'city': 'Cidade',
+    'type': 'Tipo',
+    'city_type': 'Cidade e tipo',
+}
+
+
+def price_analytics_view(request):
+    """Painel de estatísticas de preço no admin"""
+    # numpy só é carregado quando o painel é aberto, não no boot
+    from .analytics import DEFAULT_BINS, price_analytics
+
+    source = 'api' if request.GET.get('source') == 'api' else 'db'
+    by = request.GET.get('by') if request.GET.get('by') in GROUPINGS else 'city'
+    try:
+        bins = min(max(int(request.GET.get('bins', DEFAULT_BINS)), 1), 100)
+    except ValueError:
+        bins = DEFAULT_BINS
+
+    summary = price_analytics(source=source, by=by, bins=bins)
+    peak = max((max(g['histogram']) for g in summary['groups']), default=0) or 1
+    for group in summary['groups']:
+        group['bars'] = [round(100 * count / peak) for count in group['histogram']]
+
+    context = {
+        **admin.site.each_context(request),
+        'title': 'Estatísticas de preço',
+        'summary': summary,
+        'source': source,
+        'by': by,
+        'bins': bins,
+        'groupings': GROUPINGS,
+    }
+    return TemplateResponse(request, 'admin/properties/price_analytics.html', context)
@@ -1,3 +1,19 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.contrib.auth.models import User
 
-# Register your models here.
+from apps.core.exports import ExportActionsMixin
+
+USER_EXPORT_FIELDS = (
+    "id", "username", "email", "first_name", "last_name",
+    "is_staff", "is_active", "date_joined", "last_login",
+)
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class UserAdmin(ExportActionsMixin, BaseUserAdmin):
+    export_fields = USER_EXPORT_FIELDS
+    export_basename = "usuarios"
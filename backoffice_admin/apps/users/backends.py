@@ -0,0 +1,67 @@
+"""Backend de autenticação com o usuário em cache
+
+``AuthenticationMiddleware`` carrega o usuário da sessão em toda
+requisição; com este backend a leitura vem do cache de sessões em vez de
+uma consulta ao banco. O cache é invalidado quando o usuário é salvo ou
+removido (``signals.py``), o que inclui troca de senha e ``last_login``.
+
+O hash da senha não vai para o cache: o campo fica adiado (carregado do
+banco se alguém o ler) e a verificação da sessão usa o hash de sessão,
+derivado dela, guardado junto com as demais colunas.
+
+``QuerySet.update()`` e ``bulk_update()`` não disparam sinais. Quem
+desativar usuários, tirar ``is_staff``/``is_superuser`` ou trocar senhas
+assim deve chamar ``forget_users`` com os ids afetados; sem isso o usuário
+mantém o acesso até ``USER_CACHE_TIMEOUT`` segundos.
+"""
+from typing import Iterable
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+USER_CACHE_TIMEOUT = 300
+UNCACHED_FIELDS = ('password',)
+
+
+def user_cache_key(user_id) -> str:
+    return f'auth:user:{user_id}'
+
+
+def user_cache():
+    return caches[settings.SESSION_CACHE_ALIAS]
+
+
+def forget_user(user_id):
+    user_cache().delete(user_cache_key(user_id))
+
+
+def forget_users(user_ids: Iterable):
+    """Invalida vários usuários de uma vez (ex.: depois de ``QuerySet.update()``)"""
+    user_cache().delete_many([user_cache_key(user_id) for user_id in user_ids])
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        model = get_user_model()
+        fields = [field.attname for field in model._meta.concrete_fields if field.attname not in UNCACHED_FIELDS]
+        key = user_cache_key(user_id)
+
+        # Guarda só os valores das colunas, não a instância inteira
+        entry = user_cache().get(key)
+        if isinstance(entry, dict) and len(entry['values']) == len(fields):
+            user = model.from_db(DEFAULT_DB_ALIAS, fields, entry['values'])
+            session_hash = entry['session_hash']
+            # Sem a senha carregada: o AuthenticationMiddleware confere a sessão com o hash guardado
+            user.get_session_auth_hash = lambda: session_hash
+            return user if self.user_can_authenticate(user) else None
+
+        user = super().get_user(user_id)
+        if user is not None:
+            user_cache().set(key, {
+                'values': [getattr(user, name) for name in fields],
+                'session_hash': user.get_session_auth_hash(),
+            }, USER_CACHE_TIMEOUT)
+        return user
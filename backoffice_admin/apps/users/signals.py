@@ -0,0 +1,13 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import forget_user
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def user_changed(sender, instance, **kwargs):
+    # Depois do commit: antes dele, outra requisição recolocaria os valores antigos
+    user_id = instance.pk
+    transaction.on_commit(lambda: forget_user(user_id))
@@ -1,3 +1,53 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from .backends import CachedModelBackend, forget_users, user_cache, user_cache_key
+
+LOCMEM_CACHES = {
+    alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': alias}
+    for alias in ('default', 'rust_data', 'sessions')
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CachedModelBackendTests(TestCase):
+    def setUp(self):
+        for alias in LOCMEM_CACHES:
+            caches[alias].clear()
+        self.user = User.objects.create_user('ana', password='senha-secreta', is_staff=True)
+        self.backend = CachedModelBackend()
+
+    def test_password_hash_is_not_cached(self):
+        self.backend.get_user(self.user.pk)
+        entry = user_cache().get(user_cache_key(self.user.pk))
+        self.assertNotIn(self.user.password, entry['values'])
+        self.assertEqual(entry['session_hash'], self.user.get_session_auth_hash())
+
+    def test_cached_user_needs_no_query(self):
+        self.backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            user = self.backend.get_user(self.user.pk)
+            self.assertEqual(user.username, 'ana')
+            self.assertEqual(user.get_session_auth_hash(), self.user.get_session_auth_hash())
+        # A senha continua disponível, lida do banco quando pedida
+        self.assertTrue(user.check_password('senha-secreta'))
+
+    def test_session_survives_the_cache_and_ends_on_password_change(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get('/admin/').status_code, 200)
+        self.assertEqual(self.client.get('/admin/').status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.set_password('outra-senha')
+            self.user.save()
+        self.assertEqual(self.client.get('/admin/').status_code, 302)
+
+    def test_update_needs_forget_users(self):
+        self.backend.get_user(self.user.pk)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        # Sem sinais: o valor em cache ainda vale
+        self.assertIsNotNone(self.backend.get_user(self.user.pk))
+
+        forget_users([self.user.pk])
+        self.assertIsNone(self.backend.get_user(self.user.pk))
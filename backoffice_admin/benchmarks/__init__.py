@@ -0,0 +1,34 @@
+"""Benchmarks do backoffice
+
+Cada módulo é executável com ``python -m benchmarks.<nome>`` a partir de
+``backoffice_admin/`` e imprime os resultados no terminal.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    """Configura o Django para scripts fora do ``manage.py``"""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "real_estate_admin.settings")
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def timer(label: str, results: dict):
+    """Mede o tempo do bloco e guarda em ``results[label]`` (segundos)"""
+    start = time.perf_counter()
+    yield
+    results[label] = time.perf_counter() - start
+
+
+def report(results: dict, baseline: str = None):
+    """Imprime uma tabela simples com os tempos e o ganho sobre ``baseline``"""
+    width = max(len(label) for label in results)
+    for label, seconds in results.items():
+        line = f"{label:<{width}}  {seconds * 1000:10.2f} ms"
+        if baseline and label != baseline and seconds:
+            line += f"  ({results[baseline] / seconds:.1f}x)"
+        print(line)
@@ -0,0 +1,89 @@
+"""Bytes trafegados e latência de páginas grandes: projeção ``fields=`` e compressão
+
+Requer o backend Rust rodando (``RUST_API_BASE_URL``). Com ``--seed N``,
+cria antes N propriedades via ``POST /properties/batch``:
+
+    python -m benchmarks.bench_api_payload --seed 10000 --limit 10000
+
+Para cada combinação de campos (todos / ``LIST_FIELDS``) e
+``Accept-Encoding`` (identity, gzip e br se o brotli estiver instalado),
+mede os bytes do corpo como vieram pela rede e a latência de ponta a ponta
+(requisição, descompressão e decodificação do JSON; mediana de ``--runs``).
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks import setup_django
+
+CITIES = ['São Paulo, SP', 'Rio de Janeiro, RJ', 'Belo Horizonte, MG', 'Curitiba, PR', 'Recife, PE']
+TYPES = ['Casa', 'Apartamento', 'Terreno', 'Sala Comercial']
+
+
+def seed(rust_api, count: int):
+    rng = random.Random(42)
+    ops = (
+        {'op': 'create', 'data': {
+            'title': f'Imóvel {index}',
+            'description': 'Imóvel bem localizado, próximo a comércio e transporte. ' * rng.randint(2, 8),
+            'price': round(rng.uniform(80_000, 3_000_000), 2),
+            'location': rng.choice(CITIES),
+            'property_type': rng.choice(TYPES),
+        }}
+        for index in range(count)
+    )
+    failed = sum(1 for result in rust_api.batch_write(ops) if result['status'] >= 300 or not result['status'])
+    print(f"{count - failed} propriedades criadas ({failed} falhas)")
+
+
+def wire_bytes(requests, url, params, encoding) -> int:
+    response = requests.get(url, params=params, headers={'Accept-Encoding': encoding}, stream=True)
+    response.raise_for_status()
+    return len(response.raw.read(decode_content=False))
+
+
+def latency(requests, codec, url, params, encoding, runs) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        response = requests.get(url, params=params, headers={'Accept-Encoding': encoding})
+        response.raise_for_status()
+        codec.loads(response.content)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seed', type=int, default=0, help='propriedades a criar antes de medir')
+    parser.add_argument('--limit', type=int, default=10_000, help='itens por página')
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    import requests
+    from django.conf import settings
+    from urllib3.util.request import ACCEPT_ENCODING
+
+    from apps.core import codec
+    from apps.core.services import LIST_FIELDS, rust_api
+
+    if args.seed:
+        seed(rust_api, args.seed)
+
+    url = f"{settings.API_SETTINGS['RUST_API_BASE_URL']}/properties"
+    encodings = ['identity', 'gzip'] + (['br'] if 'br' in ACCEPT_ENCODING else [])
+    projections = {'todos os campos': None, 'LIST_FIELDS': ','.join(LIST_FIELDS)}
+
+    print(f"{'campos':<16} {'encoding':<9} {'bytes':>12} {'latência':>12}")
+    for label, fields in projections.items():
+        params = {'page': 1, 'limit': args.limit, **({'fields': fields} if fields else {})}
+        for encoding in encodings:
+            size = wire_bytes(requests, url, params, encoding)
+            seconds = latency(requests, codec, url, params, encoding, args.runs)
+            print(f"{label:<16} {encoding:<9} {size / 1024:9.0f} KB {seconds * 1000:9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
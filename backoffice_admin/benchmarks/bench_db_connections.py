@@ -0,0 +1,114 @@
+"""Conexão por requisição vs. conexões persistentes vs. pool (PostgreSQL)
+
+Simula requisições concorrentes do admin (sessão, contagem e página do
+changelist) disparando ``request_started``/``request_finished``, como o
+handler WSGI, para que o Django feche ou reaproveite as conexões de verdade.
+Cada modo roda num subprocesso com as variáveis de ambiente do settings:
+
+    DB_ENGINE=django.db.backends.postgresql DB_NAME=... DB_USER=... \\
+        python -m benchmarks.bench_db_connections --threads 16 --requests 200
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+MODES = {
+    'conexão por requisição': {'DB_POOL': 'false', 'DB_CONN_MAX_AGE': '0'},
+    'persistente': {'DB_POOL': 'false', 'DB_CONN_MAX_AGE': '60'},
+    'pool psycopg 3': {'DB_POOL': 'true'},
+}
+
+
+def admin_request():
+    from django.contrib.sessions.models import Session
+    from django.core import signals
+
+    from apps.properties.models import Property
+
+    signals.request_started.send(sender=None)
+    try:
+        Session.objects.filter(session_key='benchmark').first()
+        Property.objects.count()
+        list(Property.objects.order_by('-pk')[:25])
+    finally:
+        signals.request_finished.send(sender=None)
+
+
+def run_mode(threads: int, requests: int) -> dict:
+    from benchmarks import setup_django
+
+    setup_django()
+    from django.db import connection
+
+    from apps.core.backends.metrics import connection_stats
+
+    if connection.vendor != 'postgresql':
+        raise SystemExit('Este benchmark requer DB_ENGINE=django.db.backends.postgresql')
+
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        local = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            admin_request()
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    start = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    stats = connection_stats().get('default', {})
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99)] * 1000,
+        'checkouts': stats.get('checkouts', 0),
+        'wait_avg_ms': stats.get('wait_avg_ms', 0.0),
+        'wait_max_ms': stats.get('wait_max_ms', 0.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=200, help='requisições por thread')
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.threads, args.requests)))
+        return
+
+    print(f"{args.threads} threads x {args.requests} requisições")
+    for mode, env in MODES.items():
+        completed = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_db_connections', '--mode', mode,
+             '--threads', str(args.threads), '--requests', str(args.requests)],
+            env={**os.environ, **env}, capture_output=True, text=True,
+        )
+        if completed.returncode:
+            print(f"{mode:<24} falhou: {completed.stderr.strip().splitlines()[-1]}")
+            continue
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        print(
+            f"{mode:<24} {result['rps']:8.0f} req/s   p50 {result['p50_ms']:7.2f} ms   "
+            f"p99 {result['p99_ms']:7.2f} ms   checkouts {result['checkouts']:6d}   "
+            f"espera média {result['wait_avg_ms']:6.2f} ms (máx {result['wait_max_ms']:.1f})"
+        )
+
+
+if __name__ == '__main__':
+    main()
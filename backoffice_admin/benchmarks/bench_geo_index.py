@@ -0,0 +1,70 @@
+"""Latência das consultas espaciais: índice de grade vs. varredura completa
+
+    python -m benchmarks.bench_geo_index --points 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from apps.properties.geo import DEFAULT_GAZETTEER, GridIndex, haversine_km
+
+
+def synthetic(points: int, seed: int = 7):
+    """Pontos espalhados em torno das cidades do gazetteer (~20 km)"""
+    rng = np.random.default_rng(seed)
+    cities = np.genfromtxt(DEFAULT_GAZETTEER, delimiter=',', skip_header=1, usecols=(2, 3))
+    weights = rng.pareto(1.2, len(cities)) + 1
+    chosen = rng.choice(len(cities), size=points, p=weights / weights.sum())
+    lats = cities[chosen, 0] + rng.normal(0, 0.15, points)
+    lons = cities[chosen, 1] + rng.normal(0, 0.15, points)
+    return np.arange(points), lats, lons, cities
+
+
+def percentiles(samples):
+    samples = np.asarray(samples) * 1000
+    return f"p50 {np.percentile(samples, 50):8.3f} ms   p99 {np.percentile(samples, 99):8.3f} ms"
+
+
+def measure(fn, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(*query)
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--points', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--cell-deg', type=float, default=0.1)
+    args = parser.parse_args()
+
+    ids, lats, lons, cities = synthetic(args.points)
+    start = time.perf_counter()
+    index = GridIndex(ids, lats, lons, cell_deg=args.cell_deg)
+    print(f"{args.points} pontos, índice montado em {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    rng = np.random.default_rng(1)
+    centers = cities[rng.integers(0, len(cities), args.queries)] + rng.normal(0, 0.05, (args.queries, 2))
+
+    def brute_radius(lat, lon, km):
+        distances = haversine_km(lat, lon, lats, lons)
+        return np.flatnonzero(distances <= km)
+
+    def brute_nearest(lat, lon, n):
+        distances = haversine_km(lat, lon, lats, lons)
+        return np.argpartition(distances, n)[:n]
+
+    print(f"raio 2 km     índice  {measure(index.radius, [(a, b, 2) for a, b in centers])}")
+    print(f"raio 10 km    índice  {measure(index.radius, [(a, b, 10) for a, b in centers])}")
+    print(f"raio 10 km    força   {measure(brute_radius, [(a, b, 10) for a, b in centers[:20]])}")
+    print(f"bbox 0.2°     índice  {measure(index.bbox, [(a - .1, b - .1, a + .1, b + .1) for a, b in centers])}")
+    print(f"10 vizinhos   índice  {measure(index.nearest, [(a, b, 10) for a, b in centers])}")
+    print(f"10 vizinhos   força   {measure(brute_nearest, [(a, b, 10) for a, b in centers[:20]])}")
+
+
+if __name__ == '__main__':
+    main()
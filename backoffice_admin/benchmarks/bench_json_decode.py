@@ -0,0 +1,102 @@
+"""Decodificação de uma página de 10 mil propriedades: json vs. orjson, dicts vs. slots
+
+Mede o tempo (mediana de ``--runs``) para transformar o corpo da resposta
+em objetos Python e a memória que o resultado mantém ocupada (tracemalloc),
+comparando dicionários com ``PropertyPayload`` (dataclass com ``slots``):
+
+    python -m benchmarks.bench_json_decode --items 10000
+
+Não precisa do Django nem do backend Rust; sem o orjson instalado, os
+cenários com ele são pulados.
+"""
+import argparse
+import gc
+import json
+import random
+import statistics
+import time
+import tracemalloc
+
+from apps.core.payloads import PropertyPayload
+from benchmarks import report
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+TYPES = ['apartamento', 'casa', 'terreno', 'sala comercial']
+CITIES = ['São Paulo, SP', 'Rio de Janeiro, RJ', 'Belo Horizonte, MG', 'Curitiba, PR', 'Recife, PE']
+
+
+def make_payload(items: int) -> bytes:
+    """Corpo da resposta no formato de ``GET /properties`` do backend Rust"""
+    rng = random.Random(42)
+    return json.dumps([
+        {
+            'id': index,
+            'title': f'Imóvel {index}',
+            'description': 'Imóvel bem localizado, próximo a comércio e transporte. ' * rng.randint(1, 3),
+            'price': round(rng.uniform(80_000, 3_000_000), 2),
+            'location': rng.choice(CITIES),
+            'property_type': rng.choice(TYPES),
+            'status': rng.choice(['disponível', 'vendido', 'alugado']),
+        }
+        for index in range(1, items + 1)
+    ]).encode()
+
+
+def scenarios():
+    from_dict = PropertyPayload.from_dict
+    yield 'json -> dict', json.loads
+    yield 'json -> slots', lambda body: [from_dict(item) for item in json.loads(body)]
+    if orjson is not None:
+        yield 'orjson -> dict', orjson.loads
+        yield 'orjson -> slots', lambda body: [from_dict(item) for item in orjson.loads(body)]
+
+
+def decode_time(decode, body: bytes, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        decode(body)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def retained_memory(decode, body: bytes):
+    """``(bytes retidos pelo resultado, pico durante a decodificação)``"""
+    gc.collect()
+    tracemalloc.start()
+    result = decode(body)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=10_000)
+    parser.add_argument('--runs', type=int, default=15)
+    args = parser.parse_args()
+
+    body = make_payload(args.items)
+    print(f"payload: {args.items} itens, {len(body) / 1024:.0f} KB\n")
+
+    results, memory = {}, {}
+    for label, decode in scenarios():
+        decode(body)  # aquecimento
+        results[label] = decode_time(decode, body, args.runs)
+        memory[label] = retained_memory(decode, body)
+    report(results, baseline='json -> dict')
+
+    print("\nmemória (tracemalloc):")
+    for label, (retained, peak) in memory.items():
+        print(f"  {label:<16} retida {retained / 2**20:7.2f} MB "
+              f"({retained / args.items:5.0f} B/item)   pico {peak / 2**20:7.2f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Estatísticas de preço: NumPy vetorizado vs. Python puro
+
+    python -m benchmarks.bench_price_analytics --rows 1000000
+"""
+import argparse
+import statistics
+from collections import defaultdict
+
+import numpy as np
+
+from apps.properties.analytics import (
+    DEFAULT_QUANTILES,
+    grouped_histogram,
+    grouped_quantiles,
+    iqr_outliers,
+)
+
+from . import report, timer
+
+
+def synthetic(rows: int, groups: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    codes = rng.integers(0, groups, rows)
+    prices = rng.lognormal(mean=13, sigma=0.6, size=rows)
+    return codes, prices
+
+
+def python_baseline(codes, prices, groups: int, bins: int):
+    by_group = defaultdict(list)
+    for code, price in zip(codes, prices):
+        by_group[code].append(price)
+
+    low, high = min(prices), max(prices)
+    width = (high - low) / bins or 1
+    summary = {}
+    for code, values in by_group.items():
+        values.sort()
+        cuts = statistics.quantiles(values, n=100, method='inclusive') if len(values) > 1 else values * 99
+        q1, q3 = cuts[24], cuts[74]
+        fence = 1.5 * (q3 - q1)
+        histogram = [0] * bins
+        for value in values:
+            histogram[min(int((value - low) / width), bins - 1)] += 1
+        summary[code] = {
+            'quantiles': [cuts[int(q * 100) - 1] for q in DEFAULT_QUANTILES],
+            'histogram': histogram,
+            'outliers': sum(1 for v in values if v < q1 - fence or v > q3 + fence),
+        }
+    return summary
+
+
+def numpy_version(codes, prices, groups: int, bins: int):
+    quantiles = grouped_quantiles(codes, prices, groups, DEFAULT_QUANTILES + (0.25, 0.75))
+    histogram, _ = grouped_histogram(codes, prices, groups, bins)
+    outliers = iqr_outliers(codes, prices, groups, quartiles=quantiles[:, -2:])
+    return quantiles[:, :-2], histogram, np.bincount(codes[outliers], minlength=groups)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--groups', type=int, default=500, help='combinações cidade/tipo')
+    parser.add_argument('--bins', type=int, default=20)
+    args = parser.parse_args()
+
+    codes, prices = synthetic(args.rows, args.groups)
+    py_codes, py_prices = codes.tolist(), prices.tolist()
+
+    results = {}
+    with timer('python puro', results):
+        python_baseline(py_codes, py_prices, args.groups, args.bins)
+    with timer('numpy', results):
+        numpy_version(codes, prices, args.groups, args.bins)
+
+    print(f"{args.rows} linhas, {args.groups} grupos, {args.bins} faixas")
+    report(results, baseline='python puro')
+
+
+if __name__ == '__main__':
+    main()
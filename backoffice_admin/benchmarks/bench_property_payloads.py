@@ -0,0 +1,115 @@
+"""Listagem da API de propriedades: serializar por requisição vs. payloads materializados
+
+Cria um banco de teste com ``--properties`` propriedades, materializa os
+payloads (``apps/properties/rendering.py``) e mede, por idioma, a mediana
+de ``--runs`` páginas de ``--limit`` itens (100 por padrão, o máximo da API):
+
+    python -m benchmarks.bench_property_payloads --properties 5000
+
+- serializar: consulta ``Property``, monta o payload localizado de cada
+  item e serializa a página (o que a view faria sem a materialização);
+- materializado: a view ``property_list_api`` sem o cache HTTP, que só
+  concatena os bytes guardados;
+- cache HTTP: a mesma view com o ``cache_response`` e a entrada já gravada.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks import report, setup_django
+
+CITIES = ['São Paulo, SP', 'Rio de Janeiro, RJ', 'Belo Horizonte, MG', 'Curitiba, PR', 'Recife, PE']
+TYPES = ['Casa', 'Apartamento', 'Terreno', 'Sala Comercial']
+
+
+def seed(count: int):
+    from apps.properties.models import Property
+    from apps.properties.rendering import render_payloads
+
+    rng = random.Random(42)
+    Property.objects.bulk_create(
+        Property(
+            rust_id=index,
+            title=f'Imóvel {index}',
+            description='Imóvel bem localizado, próximo a comércio e transporte. ' * rng.randint(2, 8),
+            price=round(rng.uniform(80_000, 3_000_000), 2),
+            location=rng.choice(CITIES),
+            property_type=rng.choice(TYPES),
+            status=rng.choice(['Disponível', 'Vendido']),
+        )
+        for index in range(1, count + 1)
+    )
+    start = time.perf_counter()
+    render_payloads()
+    print(f"{count} propriedades, payloads materializados em {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+def median(fn, requests) -> float:
+    times = []
+    for request in requests:
+        start = time.perf_counter()
+        response = fn(request)
+        assert response.status_code == 200, response.status_code
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--properties', type=int, default=5000)
+    parser.add_argument('--limit', type=int, default=100, help='itens por página')
+    parser.add_argument('--runs', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.models import AnonymousUser
+    from django.db import connection
+    from django.http import HttpResponse
+    from django.test import RequestFactory, override_settings
+    from django.utils import translation
+
+    from apps.core import codec
+    from apps.properties.api import property_list_api
+    from apps.properties.models import Property
+    from apps.properties.rendering import FIELDS, property_payload
+
+    caches = {**settings.CACHES, 'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    with override_settings(CACHES=caches):
+        name = connection.creation.create_test_db(verbosity=0)
+        try:
+            seed(args.properties)
+            pages = max(args.properties // args.limit, 1)
+            factory = RequestFactory()
+            rng = random.Random(1)
+            requests = []
+            for _ in range(args.runs):
+                request = factory.get('/api/properties/', {'page': rng.randint(1, pages), 'limit': args.limit})
+                request.user = AnonymousUser()
+                requests.append(request)
+
+            def serialize(request):
+                page, limit = int(request.GET['page']), int(request.GET['limit'])
+                language = translation.get_language()
+                rows = Property.objects.values(*FIELDS)[(page - 1) * limit:page * limit]
+                return HttpResponse(codec.dumps([property_payload(row, language) for row in rows]),
+                                    content_type='application/json')
+
+            materialized = property_list_api.__wrapped__.__wrapped__
+            for language, _ in settings.LANGUAGES:
+                with translation.override(language):
+                    for request in requests:
+                        property_list_api(request)  # grava as entradas do cache HTTP
+                    results = {}
+                    results['serializar'] = median(serialize, requests)
+                    results['materializado'] = median(materialized, requests)
+                    results['cache HTTP'] = median(property_list_api, requests)
+                print(f"\n{language}, {args.limit} itens por página (mediana por requisição):")
+                report(results, baseline='serializar')
+        finally:
+            connection.creation.destroy_test_db(name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
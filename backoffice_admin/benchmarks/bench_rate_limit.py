@@ -0,0 +1,78 @@
+"""Custo por requisição do ``RateLimitMiddleware``
+
+Passa ``--requests`` requisições anônimas (de ``--clients`` IPs distintos)
+por uma view vazia, com e sem o middleware, e imprime o acréscimo por
+requisição (média, p50 e p99) contra o orçamento de 0,5 ms:
+
+    python -m benchmarks.bench_rate_limit --requests 20000 --redis
+
+Sem ``--redis``, os baldes ficam em memória (o caminho de fallback); com
+``--redis``, usa o cache ``default`` configurado e mede o script Lua, que
+inclui a ida ao Redis.
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks import setup_django
+
+BUDGET_US = 500
+
+
+def measure(handler, requests) -> list:
+    times = []
+    for request in requests:
+        start = time.perf_counter()
+        handler(request)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=20_000)
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--redis', action='store_true', help='Baldes no Redis do cache default')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.models import AnonymousUser
+    from django.http import HttpResponse
+    from django.test import RequestFactory, override_settings
+
+    from apps.core.ratelimit import RateLimitMiddleware
+
+    overrides = {'RATE_LIMIT': {**settings.RATE_LIMIT, 'ENABLED': True, 'DEFAULT': (1e6, 10**9)}}
+    if not args.redis:
+        overrides['CACHES'] = {**settings.CACHES, 'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+    factory = RequestFactory()
+    requests = []
+    for index in range(args.requests):
+        request = factory.get('/api/properties/', REMOTE_ADDR=f"10.0.{index % args.clients // 256}.{index % 256}")
+        request.user = AnonymousUser()
+        requests.append(request)
+
+    def view(request):
+        return HttpResponse()
+
+    with override_settings(**overrides):
+        middleware = RateLimitMiddleware(view)
+        backend = 'redis' if middleware.limiter.redis is not None else 'memória'
+        measure(middleware, requests[:1000])  # aquecimento (script carregado, conexões abertas)
+        bare = measure(view, requests)
+        limited = measure(middleware, requests)
+
+    overhead = sorted(max(with_limit - without, 0) for with_limit, without in zip(limited, bare))
+    mean = statistics.fmean(limited) - statistics.fmean(bare)
+    p50 = overhead[len(overhead) // 2]
+    p99 = overhead[int(len(overhead) * 0.99)]
+    print(f"baldes em {backend}, {args.requests} requisições de {args.clients} clientes")
+    print(f"acréscimo por requisição: média {mean * 1e6:.1f} µs   p50 {p50 * 1e6:.1f} µs   p99 {p99 * 1e6:.1f} µs")
+    verdict = 'dentro' if p99 * 1e6 <= BUDGET_US else 'ACIMA'
+    print(f"p99 {verdict} do orçamento de {BUDGET_US} µs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""Carga no backend Rust: listagens paginadas e detalhe por id
+
+Requer o backend Rust rodando (``RUST_API_BASE_URL``), de preferência com
+``DATABASE_URL`` apontando para o PostgreSQL. ``--workers`` threads (uma
+sessão HTTP cada) disparam requisições durante ``--duration`` segundos,
+sorteando entre ``GET /properties?page=&limit=`` e ``GET /properties/{id}``:
+
+    python -m benchmarks.bench_rust_load --seed 10000 --workers 32 --duration 20
+
+Imprime vazão e latências (p50/p95/p99) por rota. ``--compare`` roda
+duas vezes, com e sem o cache em memória do backend (a segunda envia
+``Cache-Control: no-cache``), e mostra a taxa de acerto de ``/metrics``.
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+
+from benchmarks import setup_django
+from benchmarks.bench_api_payload import seed
+
+
+def percentile(values, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def worker(requests, base_url, args, headers, deadline, results, errors, lock):
+    rng = random.Random()
+    session = requests.Session()
+    session.headers.update(headers)
+    local = defaultdict(list)
+    failures = 0
+    pages = max(args.items // args.limit, 1)
+    while time.perf_counter() < deadline:
+        if rng.random() < args.detail_ratio:
+            route, url, params = 'detalhe', f"{base_url}/properties/{rng.randint(1, args.items)}", None
+        else:
+            route, url, params = 'listagem', f"{base_url}/properties", {'page': rng.randint(1, pages), 'limit': args.limit}
+        start = time.perf_counter()
+        try:
+            response = session.get(url, params=params, timeout=10)
+            response.content
+            ok = response.status_code < 500
+        except requests.RequestException:
+            ok = False
+        if ok:
+            local[route].append(time.perf_counter() - start)
+        else:
+            failures += 1
+    with lock:
+        for route, times in local.items():
+            results[route].extend(times)
+        errors[0] += failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seed', type=int, default=0, help='propriedades a criar antes de medir')
+    parser.add_argument('--items', type=int, default=10_000, help='ids/páginas sorteados até este total')
+    parser.add_argument('--limit', type=int, default=20, help='itens por página da listagem')
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--detail-ratio', type=float, default=0.7, help='fração das requisições no detalhe')
+    parser.add_argument('--compare', action='store_true', help='mede também sem o cache do backend')
+    args = parser.parse_args()
+
+    setup_django()
+    import requests
+    from django.conf import settings
+
+    from apps.core.services import rust_api
+
+    if args.seed:
+        seed(rust_api, args.seed)
+
+    base_url = settings.API_SETTINGS['RUST_API_BASE_URL']
+    phases = {'com cache': {}}
+    if args.compare:
+        phases['sem cache'] = {'Cache-Control': 'no-cache'}
+    for label, headers in phases.items():
+        print(f"[{label}]")
+        run(requests, base_url, args, headers)
+    print_cache_metrics(requests, base_url)
+
+
+def run(requests, base_url, args, headers):
+    results, errors, lock = defaultdict(list), [0], threading.Lock()
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(requests, base_url, args, headers, deadline, results, errors, lock))
+        for _ in range(args.workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    total = sum(len(times) for times in results.values())
+    print(f"{total} requisições em {args.duration:.0f}s ({total / args.duration:.0f} req/s), {errors[0]} erros")
+    for route, times in sorted(results.items()):
+        print(f"  {route:<9} {len(times):7d}   p50 {statistics.median(times) * 1000:7.1f} ms   "
+              f"p95 {percentile(times, 0.95) * 1000:7.1f} ms   p99 {percentile(times, 0.99) * 1000:7.1f} ms")
+
+
+def print_cache_metrics(requests, base_url):
+    try:
+        cache = requests.get(f"{base_url}/metrics", timeout=5).json()['cache']
+    except (requests.RequestException, ValueError, KeyError, TypeError):
+        return
+    print(f"cache do backend: {cache['hits']} acertos, {cache['misses']} falhas "
+          f"(taxa {cache['hit_rate']:.1%}), {cache['entries']} entradas, {cache['bytes'] / 1024:.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
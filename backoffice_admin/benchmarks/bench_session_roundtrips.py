@@ -0,0 +1,125 @@
+"""Idas ao cache e ao banco por requisição autenticada: antes vs. depois
+
+Passa requisições pelo ``SessionMiddleware`` + ``AuthenticationMiddleware``
+(o caminho que toda página do admin percorre) e conta as operações de
+cache e as consultas SQL de cada uma:
+
+    python -m benchmarks.bench_session_roundtrips --requests 2000
+
+Sem ``--redis``, os aliases de cache viram ``LocMemCache`` (o número de
+idas não depende do backend; o tempo, sim).
+"""
+import argparse
+import time
+
+from benchmarks import setup_django
+
+SCENARIOS = {
+    'antes': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.cache',
+        'SESSION_CACHE_ALIAS': 'default',
+        'AUTHENTICATION_BACKENDS': ['django.contrib.auth.backends.ModelBackend'],
+    },
+    'depois': {
+        'SESSION_ENGINE': 'apps.core.sessions',
+        'SESSION_CACHE_ALIAS': 'sessions',
+        'AUTHENTICATION_BACKENDS': ['apps.users.backends.CachedModelBackend'],
+    },
+}
+CACHE_METHODS = ('get', 'get_many', 'set', 'add', 'delete', 'touch', 'has_key')
+
+
+class CacheCounter:
+    """Conta as chamadas aos métodos dos aliases de cache"""
+
+    def __init__(self, caches, aliases):
+        self.calls = 0
+        for alias in aliases:
+            cache = caches[alias]
+            for name in CACHE_METHODS:
+                setattr(cache, name, self._counted(getattr(cache, name)))
+
+    def _counted(self, method):
+        def wrapper(*args, **kwargs):
+            self.calls += 1
+            return method(*args, **kwargs)
+        return wrapper
+
+
+def run(scenario: dict, requests: int, locmem: bool) -> dict:
+    from django.conf import settings
+    from django.contrib.auth import login
+    from django.contrib.auth.middleware import AuthenticationMiddleware
+    from django.contrib.auth.models import User
+    from django.contrib.sessions.middleware import SessionMiddleware
+    from django.core.cache import caches
+    from django.db import connection, transaction
+    from django.http import HttpResponse
+    from django.test import RequestFactory, override_settings
+    from django.test.utils import CaptureQueriesContext
+
+    overrides = dict(scenario)
+    if locmem:
+        overrides['CACHES'] = {
+            alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': alias}
+            for alias in settings.CACHES
+        }
+
+    with override_settings(**overrides), transaction.atomic():
+        user = User.objects.create_user('benchmark-sessions', password='x', is_staff=True)
+        factory = RequestFactory()
+
+        def touch(request):
+            request.user.is_authenticated
+            if request.GET.get('pref'):
+                # View que regrava uma preferência com o mesmo valor
+                request.session['changelist_per_page'] = 25
+            return HttpResponse()
+
+        handler = SessionMiddleware(AuthenticationMiddleware(touch))
+
+        # Login uma vez; as requisições medidas reutilizam o cookie
+        request = factory.post('/')
+        SessionMiddleware(lambda r: HttpResponse()).process_request(request)
+        request.user = user
+        login(request, user, backend=settings.AUTHENTICATION_BACKENDS[0])
+        request.session['changelist_per_page'] = 25
+        request.session.save()
+        cookie = request.session.session_key
+
+        counter = CacheCounter(caches, settings.CACHES)
+        results = {}
+        for label, query in (('leitura', {}), ('regrava igual', {'pref': 1})):
+            counter.calls = 0
+            start = time.perf_counter()
+            with CaptureQueriesContext(connection) as queries:
+                for _ in range(requests):
+                    request = factory.get('/', query)
+                    request.COOKIES[settings.SESSION_COOKIE_NAME] = cookie
+                    handler(request)
+            results[label] = {
+                'cache': counter.calls / requests,
+                'sql': len(queries) / requests,
+                'us': (time.perf_counter() - start) / requests * 1e6,
+            }
+        transaction.set_rollback(True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--redis', action='store_true', help='Usa os caches configurados (Redis)')
+    args = parser.parse_args()
+
+    setup_django()
+    for name, scenario in SCENARIOS.items():
+        for label, result in run(scenario, args.requests, locmem=not args.redis).items():
+            print(
+                f"{name:<7} {label:<14} cache {result['cache']:4.1f}/req   "
+                f"sql {result['sql']:4.1f}/req   {result['us']:8.1f} µs/req"
+            )
+
+
+if __name__ == '__main__':
+    main()
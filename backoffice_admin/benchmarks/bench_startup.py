@@ -0,0 +1,89 @@
+"""Tempo de partida a frio: comandos do ``manage.py`` e boot de workers WSGI/ASGI
+
+Cada cenário roda num processo novo (mediana de ``--runs`` execuções) e é
+comparado com o orçamento em ``BUDGETS_MS``; o relatório de
+``python -X importtime`` mostra onde o tempo de import é gasto:
+
+    python -m benchmarks.bench_startup --runs 5
+
+Sai com código 1 se algum cenário estourar o orçamento.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+# Boot do worker inclui carregar o URLconf (o que acontece na 1ª requisição)
+BOOT = "import real_estate_admin.{module}; from django.urls import get_resolver; get_resolver().url_patterns"
+SCENARIOS = {
+    'manage.py check': ['manage.py', 'check'],
+    'manage.py help': ['manage.py', 'help'],
+    'boot WSGI': ['-c', BOOT.format(module='wsgi')],
+    'boot ASGI': ['-c', BOOT.format(module='asgi')],
+}
+BUDGETS_MS = {
+    'manage.py check': 900,
+    'manage.py help': 800,
+    'boot WSGI': 800,
+    'boot ASGI': 850,
+}
+
+
+def wall_time(args) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *args], check=True, capture_output=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def import_profile(args):
+    """``(módulo, self µs, cumulativo µs, profundidade)`` de ``-X importtime``"""
+    completed = subprocess.run([sys.executable, '-X', 'importtime', *args], check=True,
+                               capture_output=True, text=True)
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix('import time:').split('|')
+        self_us = int(self_us)
+        depth = (len(name) - len(name.lstrip())) // 2
+        yield name.strip(), self_us, int(cumulative_us), depth
+
+
+def report_imports(args, top: int):
+    per_package = defaultdict(int)
+    first_party = []
+    for name, self_us, cumulative_us, depth in import_profile(args):
+        per_package[name.split('.')[0]] += self_us
+        if name.startswith(('apps.', 'real_estate_admin')):
+            first_party.append((cumulative_us, name))
+
+    print(f"\nimport por pacote (tempo próprio, {' '.join(args)}):")
+    for package, us in sorted(per_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {package:<28} {us / 1000:8.1f} ms")
+    print("\nmódulos do projeto (cumulativo):")
+    for us, name in sorted(first_party, reverse=True)[:top]:
+        print(f"  {name:<40} {us / 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=12, help='linhas do relatório de import')
+    args = parser.parse_args()
+
+    over_budget = False
+    for label, command in SCENARIOS.items():
+        wall_time(command)  # aquece o cache de bytecode e do sistema de arquivos
+        median = statistics.median(wall_time(command) for _ in range(args.runs))
+        budget = BUDGETS_MS[label]
+        status = 'ok' if median <= budget else 'ACIMA DO ORÇAMENTO'
+        over_budget |= median > budget
+        print(f"{label:<18} {median:8.1f} ms   orçamento {budget:5d} ms   {status}")
+
+    report_imports(SCENARIOS['boot WSGI'], args.top)
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""Hooks do gunicorn (carregado automaticamente a partir de backoffice_admin/)
+
+Com ``WARM_CACHES_ON_BOOT=true``, o master aquece o cache compartilhado
+antes de criar os workers. O aquecimento roda num subprocesso
+(``manage.py warm_caches``) para o master não abrir conexões com Redis e
+com o backend que seriam herdadas pelos workers no fork.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+
+
+def when_ready(server):
+    # Chamado no master depois do bind e antes de criar os workers
+    if os.environ.get('WARM_CACHES_ON_BOOT', '').lower() not in ('1', 'true', 'yes'):
+        return
+    command = [sys.executable, str(BASE_DIR / 'manage.py'), 'warm_caches',
+               *os.environ.get('WARM_CACHES_ARGS', '').split()]
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True,
+                                   timeout=int(os.environ.get('WARM_CACHES_TIMEOUT', '60')))
+    except subprocess.TimeoutExpired:
+        server.log.warning('warm_caches excedeu o tempo limite; workers sobem com o cache frio')
+        return
+    output = (completed.stdout or completed.stderr).strip().splitlines()
+    log = server.log.info if completed.returncode == 0 else server.log.warning
+    log(f"warm_caches: {output[-1] if output else 'sem saída'}")
@@ -15,9 +15,21 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
 
+from apps.core.media import serve_media
+from apps.core.views import cache_stats_view, export_download_view, job_progress_view, job_status_view
+from apps.properties.api import property_detail_api, property_list_api
+
 urlpatterns = [
+    path("admin/cache-stats/", admin.site.admin_view(cache_stats_view), name="cache_stats"),
+    path("admin/jobs/<int:job_id>/", admin.site.admin_view(job_progress_view), name="job_progress"),
+    path("admin/jobs/<int:job_id>/status/", admin.site.admin_view(job_status_view), name="job_status"),
+    path("admin/exports/<str:name>", admin.site.admin_view(export_download_view), name="export_download"),
     path("admin/", admin.site.urls),
+    path("api/properties/", property_list_api, name="api_property_list"),
+    path("api/properties/<int:rust_id>/", property_detail_api, name="api_property_detail"),
+    path(f"{settings.MEDIA_URL.lstrip('/')}<path:path>", serve_media, name="media"),
 ]
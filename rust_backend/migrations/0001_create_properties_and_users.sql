@@ -0,0 +1,16 @@
+CREATE TABLE IF NOT EXISTS properties (
+    id SERIAL PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    price DOUBLE PRECISION NOT NULL,
+    location TEXT NOT NULL,
+    property_type TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'Disponível'
+);
+
+CREATE TABLE IF NOT EXISTS users (
+    id SERIAL PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL UNIQUE,
+    role TEXT NOT NULL DEFAULT 'User'
+);
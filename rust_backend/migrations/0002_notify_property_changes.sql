@@ -0,0 +1,12 @@
+-- Avisa as instâncias do backend (LISTEN properties_changed) para invalidar o cache em memória
+CREATE OR REPLACE FUNCTION notify_properties_changed() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('properties_changed', COALESCE(NEW.id, OLD.id)::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS properties_changed ON properties;
+CREATE TRIGGER properties_changed
+    AFTER INSERT OR UPDATE OR DELETE ON properties
+    FOR EACH ROW EXECUTE FUNCTION notify_properties_changed();
@@ -0,0 +1,22 @@
+-- Log de mudanças servido por GET /api/v1/changes; os consumidores retomam pelo seq
+CREATE TABLE IF NOT EXISTS property_changes (
+    seq BIGSERIAL PRIMARY KEY,
+    property_id INTEGER NOT NULL,
+    op TEXT NOT NULL,
+    changed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS property_changes_changed_at ON property_changes (changed_at);
+
+CREATE OR REPLACE FUNCTION notify_properties_changed() RETURNS trigger AS $$
+BEGIN
+    -- Serializa as transações que escrevem em properties: os seq ficam na
+    -- ordem de commit, então um consumidor que leu até N nunca deixa para
+    -- trás um seq menor que ainda não estava visível
+    PERFORM pg_advisory_xact_lock(hashtext('property_changes'));
+    INSERT INTO property_changes (property_id, op)
+        VALUES (COALESCE(NEW.id, OLD.id), lower(TG_OP));
+    PERFORM pg_notify('properties_changed', COALESCE(NEW.id, OLD.id)::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
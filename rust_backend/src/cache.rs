@@ -0,0 +1,252 @@
+//! Cache em memória das respostas do catálogo (páginas e detalhe por id).
+//!
+//! Guarda o JSON já serializado em `Bytes`: um acerto só incrementa o
+//! contador de referências do buffer, sem serializar nem copiar. O tamanho é
+//! limitado por número de entradas e por bytes (despeja a usada há mais
+//! tempo) e cada entrada expira em `CACHE_TTL_SECONDS` como rede de segurança.
+//!
+//! Escritas feitas por este processo invalidam as páginas e os ids afetados;
+//! com `CACHE_LISTEN_NOTIFY=1`, as notificações do PostgreSQL (trigger
+//! `properties_changed`) invalidam também as escritas de outras instâncias.
+//! Cada invalidação avança a geração do cache: respostas lidas do banco antes
+//! dela não são gravadas depois.
+
+use axum::body::Bytes;
+use serde::Serialize;
+use std::collections::{BTreeMap, HashMap};
+use std::sync::atomic::{AtomicU64, Ordering};
+use std::sync::Mutex;
+use std::time::{Duration, Instant};
+
+#[derive(Clone, PartialEq, Eq, Hash)]
+pub struct CacheKey {
+    // None = página da listagem
+    property: Option<i32>,
+    query: String,
+}
+
+impl CacheKey {
+    pub fn page(limit: i64, offset: i64, fields: Option<&[&str]>) -> Self {
+        CacheKey {
+            property: None,
+            query: format!("{}:{}:{}", limit, offset, fields.map(|f| f.join(",")).unwrap_or_default()),
+        }
+    }
+
+    pub fn property(id: i32, fields: Option<&[&str]>) -> Self {
+        CacheKey {
+            property: Some(id),
+            query: fields.map(|f| f.join(",")).unwrap_or_default(),
+        }
+    }
+}
+
+struct Entry {
+    body: Bytes,
+    stored_at: Instant,
+    tick: u64,
+}
+
+#[derive(Default)]
+struct Inner {
+    entries: HashMap<CacheKey, Entry>,
+    // tick do último uso -> chave; o primeiro é o usado há mais tempo
+    recency: BTreeMap<u64, CacheKey>,
+    tick: u64,
+    bytes: usize,
+}
+
+impl Inner {
+    fn touch(&mut self, key: &CacheKey) -> Option<Bytes> {
+        self.tick += 1;
+        let tick = self.tick;
+        let entry = self.entries.get_mut(key)?;
+        let previous = std::mem::replace(&mut entry.tick, tick);
+        let body = entry.body.clone();
+        if let Some(key) = self.recency.remove(&previous) {
+            self.recency.insert(tick, key);
+        }
+        Some(body)
+    }
+
+    fn remove(&mut self, key: &CacheKey) -> bool {
+        match self.entries.remove(key) {
+            Some(entry) => {
+                self.recency.remove(&entry.tick);
+                self.bytes -= entry.body.len();
+                true
+            }
+            None => false,
+        }
+    }
+}
+
+#[derive(Serialize)]
+pub struct CacheStats {
+    enabled: bool,
+    entries: usize,
+    bytes: usize,
+    max_entries: usize,
+    max_bytes: usize,
+    ttl_seconds: u64,
+    hits: u64,
+    misses: u64,
+    hit_rate: f64,
+    invalidations: u64,
+    evictions: u64,
+}
+
+pub struct ResponseCache {
+    inner: Mutex<Inner>,
+    max_entries: usize,
+    max_bytes: usize,
+    ttl: Duration,
+    generation: AtomicU64,
+    hits: AtomicU64,
+    misses: AtomicU64,
+    invalidations: AtomicU64,
+    evictions: AtomicU64,
+}
+
+fn env_or<T: std::str::FromStr>(name: &str, default: T) -> T {
+    std::env::var(name)
+        .ok()
+        .and_then(|value| value.parse().ok())
+        .unwrap_or(default)
+}
+
+impl ResponseCache {
+    pub fn new(max_entries: usize, max_bytes: usize, ttl: Duration) -> Self {
+        ResponseCache {
+            inner: Mutex::new(Inner::default()),
+            max_entries,
+            max_bytes,
+            ttl,
+            generation: AtomicU64::new(0),
+            hits: AtomicU64::new(0),
+            misses: AtomicU64::new(0),
+            invalidations: AtomicU64::new(0),
+            evictions: AtomicU64::new(0),
+        }
+    }
+
+    /// `CACHE_MAX_ENTRIES` (0 desliga), `CACHE_MAX_MB` e `CACHE_TTL_SECONDS`
+    pub fn from_env() -> Self {
+        ResponseCache::new(
+            env_or("CACHE_MAX_ENTRIES", 10_000),
+            env_or::<usize>("CACHE_MAX_MB", 64) * 1024 * 1024,
+            Duration::from_secs(env_or("CACHE_TTL_SECONDS", 300)),
+        )
+    }
+
+    pub fn enabled(&self) -> bool {
+        self.max_entries > 0
+    }
+
+    /// Geração atual; passe-a para `insert` depois de ler do banco
+    pub fn generation(&self) -> u64 {
+        self.generation.load(Ordering::Acquire)
+    }
+
+    pub fn get(&self, key: &CacheKey) -> Option<Bytes> {
+        if !self.enabled() {
+            return None;
+        }
+        let mut inner = self.inner.lock().unwrap();
+        let fresh = inner
+            .entries
+            .get(key)
+            .map(|entry| entry.stored_at.elapsed() < self.ttl);
+        let body = match fresh {
+            Some(true) => inner.touch(key),
+            Some(false) => {
+                inner.remove(key);
+                None
+            }
+            None => None,
+        };
+        drop(inner);
+        let counter = if body.is_some() { &self.hits } else { &self.misses };
+        counter.fetch_add(1, Ordering::Relaxed);
+        body
+    }
+
+    pub fn insert(&self, key: CacheKey, body: Bytes, generation: u64) {
+        // Uma página enorme não deve expulsar o resto do cache
+        if !self.enabled() || body.len() > self.max_bytes / 4 {
+            return;
+        }
+        let mut inner = self.inner.lock().unwrap();
+        // Conferido com o lock: as invalidações avançam a geração segurando o mesmo lock
+        if self.generation.load(Ordering::Acquire) != generation {
+            return;
+        }
+        inner.remove(&key);
+        inner.tick += 1;
+        let tick = inner.tick;
+        inner.bytes += body.len();
+        inner.recency.insert(tick, key.clone());
+        inner.entries.insert(
+            key,
+            Entry {
+                body,
+                stored_at: Instant::now(),
+                tick,
+            },
+        );
+        while inner.entries.len() > self.max_entries || inner.bytes > self.max_bytes {
+            let Some((_, oldest)) = inner.recency.pop_first() else {
+                break;
+            };
+            if let Some(entry) = inner.entries.remove(&oldest) {
+                inner.bytes -= entry.body.len();
+                self.evictions.fetch_add(1, Ordering::Relaxed);
+            }
+        }
+    }
+
+    /// Descarta todas as páginas e o detalhe dos ids informados
+    pub fn invalidate_properties(&self, ids: &[i32]) {
+        self.invalidate(|key| key.property.map_or(true, |id| ids.contains(&id)));
+    }
+
+    pub fn clear(&self) {
+        self.invalidate(|_| true);
+    }
+
+    fn invalidate(&self, stale: impl Fn(&CacheKey) -> bool) {
+        let mut inner = self.inner.lock().unwrap();
+        self.generation.fetch_add(1, Ordering::AcqRel);
+        let keys: Vec<CacheKey> = inner.entries.keys().filter(|key| stale(*key)).cloned().collect();
+        for key in &keys {
+            inner.remove(key);
+        }
+        self.invalidations.fetch_add(1, Ordering::Relaxed);
+    }
+
+    pub fn stats(&self) -> CacheStats {
+        let (entries, bytes) = {
+            let inner = self.inner.lock().unwrap();
+            (inner.entries.len(), inner.bytes)
+        };
+        let hits = self.hits.load(Ordering::Relaxed);
+        let misses = self.misses.load(Ordering::Relaxed);
+        CacheStats {
+            enabled: self.enabled(),
+            entries,
+            bytes,
+            max_entries: self.max_entries,
+            max_bytes: self.max_bytes,
+            ttl_seconds: self.ttl.as_secs(),
+            hits,
+            misses,
+            hit_rate: if hits + misses > 0 {
+                hits as f64 / (hits + misses) as f64
+            } else {
+                0.0
+            },
+            invalidations: self.invalidations.load(Ordering::Relaxed),
+            evictions: self.evictions.load(Ordering::Relaxed),
+        }
+    }
+}
@@ -0,0 +1,469 @@
+//! Persistência das propriedades e usuários.
+//!
+//! Em produção os dados ficam no PostgreSQL (`DATABASE_URL`), acessado por um
+//! `PgPool` compartilhado. As consultas usam parâmetros (`$1`, `$2`...): o sqlx
+//! prepara cada SQL uma vez por conexão e reaproveita o statement pelo cache
+//! da conexão. Sem `DATABASE_URL`, um armazenamento em memória com dados de
+//! exemplo permite rodar o backend localmente sem banco.
+
+use axum::http::StatusCode;
+use serde_json::{json, Value};
+use sqlx::postgres::PgListener;
+use sqlx::{PgConnection, PgPool};
+use std::collections::{BTreeMap, VecDeque};
+use std::sync::Arc;
+use std::time::Duration;
+use tokio::sync::{Notify, RwLock};
+use tracing::{error, info, warn};
+
+use crate::cache::ResponseCache;
+use crate::{BatchOp, BatchResult, Change, ChangeFeed, Property, User};
+
+// Canal do trigger criado na migração 0002
+const CHANGES_CHANNEL: &str = "properties_changed";
+// Mudanças mantidas pelo armazenamento em memória
+const MEMORY_CHANGES: usize = 10_000;
+
+#[derive(sqlx::FromRow)]
+struct ChangeRow {
+    seq: i64,
+    op: String,
+    property_id: i32,
+    title: Option<String>,
+    description: Option<String>,
+    price: Option<f64>,
+    location: Option<String>,
+    property_type: Option<String>,
+    status: Option<String>,
+}
+
+impl ChangeRow {
+    fn into_change(self) -> Change {
+        let data = match (self.title, self.description, self.price, self.location, self.property_type, self.status) {
+            (Some(title), Some(description), Some(price), Some(location), Some(property_type), Some(status)) => {
+                Some(Property {
+                    id: self.property_id,
+                    title,
+                    description,
+                    price,
+                    location,
+                    property_type,
+                    status,
+                })
+            }
+            _ => None,
+        };
+        Change {
+            seq: self.seq,
+            op: self.op,
+            id: self.property_id,
+            data,
+        }
+    }
+}
+
+/// `since` fora do intervalo guardado: eventos perdidos ou log recriado
+fn needs_reset(since: i64, first: i64, last: i64) -> bool {
+    since > last || (first > 0 && since < first - 1)
+}
+
+#[derive(Clone)]
+pub enum Db {
+    Postgres(PgPool),
+    Memory(Arc<RwLock<Store>>),
+}
+
+impl Db {
+    pub fn memory() -> Self {
+        Db::Memory(Arc::new(RwLock::new(Store::seeded())))
+    }
+
+    pub fn stats(&self) -> Value {
+        match self {
+            Db::Postgres(pool) => json!({
+                "backend": "postgres",
+                "connections": pool.size(),
+                "idle": pool.num_idle(),
+            }),
+            Db::Memory(_) => json!({ "backend": "memory" }),
+        }
+    }
+
+    pub async fn list_properties(&self, limit: i64, offset: i64) -> Result<Vec<Property>, sqlx::Error> {
+        match self {
+            Db::Postgres(pool) => {
+                sqlx::query_as::<_, Property>(
+                    "SELECT id, title, description, price, location, property_type, status \
+                     FROM properties ORDER BY id LIMIT $1 OFFSET $2",
+                )
+                .bind(limit)
+                .bind(offset)
+                .fetch_all(pool)
+                .await
+            }
+            Db::Memory(store) => Ok(store
+                .read()
+                .await
+                .properties
+                .values()
+                .skip(offset as usize)
+                .take(limit as usize)
+                .cloned()
+                .collect()),
+        }
+    }
+
+    pub async fn get_property(&self, id: i32) -> Result<Option<Property>, sqlx::Error> {
+        match self {
+            Db::Postgres(pool) => {
+                sqlx::query_as::<_, Property>(
+                    "SELECT id, title, description, price, location, property_type, status \
+                     FROM properties WHERE id = $1",
+                )
+                .bind(id)
+                .fetch_optional(pool)
+                .await
+            }
+            Db::Memory(store) => Ok(store.read().await.properties.get(&id).cloned()),
+        }
+    }
+
+    pub async fn list_users(&self, limit: i64, offset: i64) -> Result<Vec<User>, sqlx::Error> {
+        match self {
+            Db::Postgres(pool) => {
+                sqlx::query_as::<_, User>(
+                    "SELECT id, name, email, role FROM users ORDER BY id LIMIT $1 OFFSET $2",
+                )
+                .bind(limit)
+                .bind(offset)
+                .fetch_all(pool)
+                .await
+            }
+            Db::Memory(store) => Ok(store
+                .read()
+                .await
+                .users
+                .iter()
+                .skip(offset as usize)
+                .take(limit as usize)
+                .cloned()
+                .collect()),
+        }
+    }
+
+    pub async fn changes_since(&self, since: i64, limit: i64) -> Result<ChangeFeed, sqlx::Error> {
+        match self {
+            Db::Postgres(pool) => {
+                let (first, last): (i64, i64) = sqlx::query_as(
+                    "SELECT COALESCE(MIN(seq), 0), COALESCE(MAX(seq), 0) FROM property_changes",
+                )
+                .fetch_one(pool)
+                .await?;
+                if needs_reset(since, first, last) {
+                    return Ok(ChangeFeed { events: Vec::new(), last_seq: last, reset: true });
+                }
+                let events: Vec<Change> = sqlx::query_as::<_, ChangeRow>(
+                    "SELECT c.seq, c.op, c.property_id, p.title, p.description, p.price, \
+                            p.location, p.property_type, p.status \
+                     FROM property_changes c LEFT JOIN properties p ON p.id = c.property_id \
+                     WHERE c.seq > $1 ORDER BY c.seq LIMIT $2",
+                )
+                .bind(since)
+                .bind(limit)
+                .fetch_all(pool)
+                .await?
+                .into_iter()
+                .map(ChangeRow::into_change)
+                .collect();
+                let last_seq = events.last().map_or(since, |change| change.seq);
+                Ok(ChangeFeed { events, last_seq, reset: false })
+            }
+            Db::Memory(store) => {
+                let store = store.read().await;
+                let first = store.changes.front().map_or(0, |(seq, _, _)| *seq);
+                let last = store.next_seq - 1;
+                if needs_reset(since, first, last) {
+                    return Ok(ChangeFeed { events: Vec::new(), last_seq: last, reset: true });
+                }
+                let events: Vec<Change> = store
+                    .changes
+                    .iter()
+                    .filter(|(seq, _, _)| *seq > since)
+                    .take(limit as usize)
+                    .map(|(seq, id, op)| Change {
+                        seq: *seq,
+                        op: op.to_string(),
+                        id: *id,
+                        data: store.properties.get(id).cloned(),
+                    })
+                    .collect();
+                let last_seq = events.last().map_or(since, |change| change.seq);
+                Ok(ChangeFeed { events, last_seq, reset: false })
+            }
+        }
+    }
+
+    /// Aplica o lote numa única transação.
+    ///
+    /// Propriedades inexistentes viram status 404 na operação; erros do banco
+    /// desfazem o lote inteiro.
+    pub async fn batch(&self, ops: Vec<BatchOp>) -> Result<Vec<BatchResult>, sqlx::Error> {
+        match self {
+            Db::Postgres(pool) => {
+                let mut tx = pool.begin().await?;
+                let mut results = Vec::with_capacity(ops.len());
+                for (index, op) in ops.into_iter().enumerate() {
+                    results.push(apply_pg(&mut tx, index, op).await?);
+                }
+                tx.commit().await?;
+                Ok(results)
+            }
+            Db::Memory(store) => {
+                let mut store = store.write().await;
+                Ok(ops
+                    .into_iter()
+                    .enumerate()
+                    .map(|(index, op)| store.apply(index, op))
+                    .collect())
+            }
+        }
+    }
+}
+
+/// Apaga do log as mudanças mais antigas que `retention_days` (a cada hora)
+pub async fn prune_changes(pool: PgPool, retention_days: i32) {
+    let mut interval = tokio::time::interval(Duration::from_secs(60 * 60));
+    loop {
+        interval.tick().await;
+        let result = sqlx::query(
+            "DELETE FROM property_changes WHERE changed_at < now() - make_interval(days => $1)",
+        )
+        .bind(retention_days)
+        .execute(&pool)
+        .await;
+        match result {
+            Ok(done) if done.rows_affected() > 0 => {
+                info!("{} mudanças antigas removidas do log", done.rows_affected())
+            }
+            Ok(_) => {}
+            Err(e) => error!("Falha ao limpar o log de mudanças: {}", e),
+        }
+    }
+}
+
+/// Invalida o cache com as notificações do trigger (escritas de outras instâncias)
+/// e acorda os long-polls de /changes
+pub async fn listen_property_changes(pool: PgPool, cache: Arc<ResponseCache>, changed: Arc<Notify>) {
+    let mut listener = match PgListener::connect_with(&pool).await {
+        Ok(listener) => listener,
+        Err(e) => {
+            error!("LISTEN indisponível, cache só invalidado localmente: {}", e);
+            return;
+        }
+    };
+    if let Err(e) = listener.listen(CHANGES_CHANNEL).await {
+        error!("Falha no LISTEN {}: {}", CHANGES_CHANNEL, e);
+        return;
+    }
+    info!("Cache invalidado por LISTEN {}", CHANGES_CHANNEL);
+    loop {
+        match listener.try_recv().await {
+            Ok(Some(notification)) => {
+                match notification.payload().parse::<i32>() {
+                    Ok(id) => cache.invalidate_properties(&[id]),
+                    Err(_) => cache.clear(),
+                }
+                changed.notify_waiters();
+            }
+            // Conexão caiu e foi refeita: as notificações do intervalo se perderam
+            Ok(None) => {
+                warn!("LISTEN {} reconectado; limpando o cache", CHANGES_CHANNEL);
+                cache.clear();
+            }
+            Err(e) => {
+                error!("Erro no LISTEN {}: {}", CHANGES_CHANNEL, e);
+                tokio::time::sleep(Duration::from_secs(1)).await;
+            }
+        }
+    }
+}
+
+async fn apply_pg(
+    conn: &mut PgConnection,
+    index: usize,
+    op: BatchOp,
+) -> Result<BatchResult, sqlx::Error> {
+    Ok(match op {
+        BatchOp::Create { data } => {
+            let property = sqlx::query_as::<_, Property>(
+                "INSERT INTO properties (title, description, price, location, property_type, status) \
+                 VALUES ($1, $2, $3, $4, $5, $6) \
+                 RETURNING id, title, description, price, location, property_type, status",
+            )
+            .bind(data.title)
+            .bind(data.description)
+            .bind(data.price)
+            .bind(data.location)
+            .bind(data.property_type)
+            .bind(data.status)
+            .fetch_one(&mut *conn)
+            .await?;
+            BatchResult::ok(index, StatusCode::CREATED, Some(property))
+        }
+        BatchOp::Update { id, data } => {
+            let property = sqlx::query_as::<_, Property>(
+                "UPDATE properties SET \
+                     title = COALESCE($2, title), \
+                     description = COALESCE($3, description), \
+                     price = COALESCE($4, price), \
+                     location = COALESCE($5, location), \
+                     property_type = COALESCE($6, property_type), \
+                     status = COALESCE($7, status) \
+                 WHERE id = $1 \
+                 RETURNING id, title, description, price, location, property_type, status",
+            )
+            .bind(id)
+            .bind(data.title)
+            .bind(data.description)
+            .bind(data.price)
+            .bind(data.location)
+            .bind(data.property_type)
+            .bind(data.status)
+            .fetch_optional(&mut *conn)
+            .await?;
+            match property {
+                Some(property) => BatchResult::ok(index, StatusCode::OK, Some(property)),
+                None => BatchResult::not_found(index, id),
+            }
+        }
+        BatchOp::Delete { id } => {
+            let deleted = sqlx::query("DELETE FROM properties WHERE id = $1")
+                .bind(id)
+                .execute(&mut *conn)
+                .await?
+                .rows_affected();
+            if deleted > 0 {
+                BatchResult::ok(index, StatusCode::NO_CONTENT, None)
+            } else {
+                BatchResult::not_found(index, id)
+            }
+        }
+    })
+}
+
+// Armazenamento em memória para desenvolvimento local sem PostgreSQL
+pub struct Store {
+    properties: BTreeMap<i32, Property>,
+    users: Vec<User>,
+    next_id: i32,
+    // (seq, id, operação), como a tabela property_changes
+    changes: VecDeque<(i64, i32, &'static str)>,
+    next_seq: i64,
+}
+
+impl Store {
+    fn seeded() -> Self {
+        let properties = vec![
+            Property {
+                id: 1,
+                title: "Casa Moderna".to_string(),
+                description: "Linda casa com 3 quartos".to_string(),
+                price: 450000.0,
+                location: "São Paulo, SP".to_string(),
+                property_type: "Casa".to_string(),
+                status: "Disponível".to_string(),
+            },
+            Property {
+                id: 2,
+                title: "Apartamento Centro".to_string(),
+                description: "Apartamento no centro da cidade".to_string(),
+                price: 320000.0,
+                location: "Rio de Janeiro, RJ".to_string(),
+                property_type: "Apartamento".to_string(),
+                status: "Vendido".to_string(),
+            },
+        ];
+        let users = vec![
+            User {
+                id: 1,
+                name: "João Silva".to_string(),
+                email: "joao@email.com".to_string(),
+                role: "Admin".to_string(),
+            },
+            User {
+                id: 2,
+                name: "Maria Santos".to_string(),
+                email: "maria@email.com".to_string(),
+                role: "User".to_string(),
+            },
+        ];
+        Store {
+            next_id: properties.len() as i32 + 1,
+            properties: properties.into_iter().map(|p| (p.id, p)).collect(),
+            users,
+            changes: VecDeque::new(),
+            next_seq: 1,
+        }
+    }
+
+    fn record(&mut self, id: i32, op: &'static str) {
+        self.changes.push_back((self.next_seq, id, op));
+        self.next_seq += 1;
+        if self.changes.len() > MEMORY_CHANGES {
+            self.changes.pop_front();
+        }
+    }
+
+    fn apply(&mut self, index: usize, op: BatchOp) -> BatchResult {
+        match op {
+            BatchOp::Create { data } => {
+                let property = Property {
+                    id: self.next_id,
+                    title: data.title,
+                    description: data.description,
+                    price: data.price,
+                    location: data.location,
+                    property_type: data.property_type,
+                    status: data.status,
+                };
+                self.next_id += 1;
+                self.properties.insert(property.id, property.clone());
+                self.record(property.id, "insert");
+                BatchResult::ok(index, StatusCode::CREATED, Some(property))
+            }
+            BatchOp::Update { id, data } => match self.properties.get_mut(&id) {
+                Some(property) => {
+                    if let Some(title) = data.title {
+                        property.title = title;
+                    }
+                    if let Some(description) = data.description {
+                        property.description = description;
+                    }
+                    if let Some(price) = data.price {
+                        property.price = price;
+                    }
+                    if let Some(location) = data.location {
+                        property.location = location;
+                    }
+                    if let Some(property_type) = data.property_type {
+                        property.property_type = property_type;
+                    }
+                    if let Some(status) = data.status {
+                        property.status = status;
+                    }
+                    let property = property.clone();
+                    self.record(id, "update");
+                    BatchResult::ok(index, StatusCode::OK, Some(property))
+                }
+                None => BatchResult::not_found(index, id),
+            },
+            BatchOp::Delete { id } => match self.properties.remove(&id) {
+                Some(_) => {
+                    self.record(id, "delete");
+                    BatchResult::ok(index, StatusCode::NO_CONTENT, None)
+                }
+                None => BatchResult::not_found(index, id),
+            },
+        }
+    }
+}
@@ -1,12 +1,53 @@
 use axum::{
-    http::StatusCode,
-    response::Json,
-    routing::get,
+    body::Bytes,
+    extract::{Path, Query, State},
+    http::{header, HeaderMap, StatusCode},
+    response::{IntoResponse, Json, Response},
+    routing::{get, post},
     Router,
 };
 use serde::{Deserialize, Serialize};
+use serde_json::{Map, Value};
+use sqlx::postgres::PgPoolOptions;
+use std::future::Future;
+use std::sync::Arc;
+use std::time::{Duration, Instant};
+use tokio::sync::Notify;
+use tower_http::compression::CompressionLayer;
 use tower_http::cors::{Any, CorsLayer};
-use tracing::info;
+use tower_http::decompression::RequestDecompressionLayer;
+use tracing::{error, info, warn};
+
+mod cache;
+mod db;
+
+use cache::{CacheKey, ResponseCache};
+use db::Db;
+
+// Limite de operações por requisição em POST /properties/batch
+const MAX_BATCH_OPS: usize = 1000;
+
+// Feed de mudanças: eventos por resposta e espera máxima do long-poll
+const MAX_CHANGES_LIMIT: i64 = 5000;
+const MAX_CHANGES_WAIT_SECONDS: u64 = 60;
+// Intervalo em que o long-poll confere escritas feitas por outras instâncias
+const CHANGES_POLL: Duration = Duration::from_secs(1);
+
+// Paginação das listagens (?page=&limit=)
+const DEFAULT_PAGE_LIMIT: u32 = 20;
+const MAX_PAGE_LIMIT: u32 = 10_000;
+
+// Campos aceitos em ?fields= (o id vem sempre)
+const PROPERTY_FIELDS: &[&str] = &[
+    "id",
+    "title",
+    "description",
+    "price",
+    "location",
+    "property_type",
+    "status",
+];
+const USER_FIELDS: &[&str] = &["id", "name", "email", "role"];
 
 #[derive(Serialize, Deserialize)]
 struct HealthResponse {
@@ -15,9 +56,9 @@ struct HealthResponse {
     timestamp: String,
 }
 
-#[derive(Serialize, Deserialize)]
+#[derive(Clone, Serialize, Deserialize, sqlx::FromRow)]
 struct Property {
-    id: u32,
+    id: i32,
     title: String,
     description: String,
     price: f64,
@@ -26,9 +67,9 @@ struct Property {
     status: String,
 }
 
-#[derive(Serialize, Deserialize)]
+#[derive(Clone, Serialize, Deserialize, sqlx::FromRow)]
 struct User {
-    id: u32,
+    id: i32,
     name: String,
     email: String,
     role: String,
@@ -43,56 +84,414 @@ async fn health_check() -> Json<HealthResponse> {
     })
 }
 
-async fn get_properties() -> Json<Vec<Property>> {
+#[derive(Deserialize)]
+struct PropertyInput {
+    title: String,
+    #[serde(default)]
+    description: String,
+    price: f64,
+    location: String,
+    property_type: String,
+    #[serde(default = "default_status")]
+    status: String,
+}
+
+#[derive(Deserialize)]
+struct PropertyPatch {
+    title: Option<String>,
+    description: Option<String>,
+    price: Option<f64>,
+    location: Option<String>,
+    property_type: Option<String>,
+    status: Option<String>,
+}
+
+fn default_status() -> String {
+    "Disponível".to_string()
+}
+
+#[derive(Deserialize)]
+#[serde(tag = "op", rename_all = "lowercase")]
+enum BatchOp {
+    Create { data: PropertyInput },
+    Update { id: i32, data: PropertyPatch },
+    Delete { id: i32 },
+}
+
+#[derive(Deserialize)]
+struct BatchRequest {
+    ops: Vec<BatchOp>,
+}
+
+#[derive(Serialize)]
+struct BatchResult {
+    index: usize,
+    status: u16,
+    #[serde(skip_serializing_if = "Option::is_none")]
+    data: Option<Property>,
+    #[serde(skip_serializing_if = "Option::is_none")]
+    error: Option<String>,
+}
+
+impl BatchResult {
+    fn ok(index: usize, status: StatusCode, data: Option<Property>) -> Self {
+        BatchResult {
+            index,
+            status: status.as_u16(),
+            data,
+            error: None,
+        }
+    }
+
+    fn not_found(index: usize, id: i32) -> Self {
+        BatchResult {
+            index,
+            status: StatusCode::NOT_FOUND.as_u16(),
+            data: None,
+            error: Some(format!("Propriedade {} não encontrada", id)),
+        }
+    }
+}
+
+#[derive(Serialize)]
+struct BatchResponse {
+    results: Vec<BatchResult>,
+}
+
+/// Uma escrita em `properties`; `data` é o estado atual (ausente se removida)
+#[derive(Serialize)]
+struct Change {
+    seq: i64,
+    op: String,
+    id: i32,
+    #[serde(skip_serializing_if = "Option::is_none")]
+    data: Option<Property>,
+}
+
+#[derive(Serialize)]
+struct ChangeFeed {
+    events: Vec<Change>,
+    // Próximo `since` do consumidor
+    last_seq: i64,
+    // `since` fora do log (expurgado ou banco recriado): ressincronize tudo
+    reset: bool,
+}
+
+#[derive(Deserialize)]
+struct ChangesQuery {
+    since: Option<i64>,
+    limit: Option<i64>,
+    wait: Option<u64>,
+}
+
+#[derive(Serialize)]
+struct ErrorResponse {
+    error: String,
+}
+
+type ApiError = (StatusCode, Json<ErrorResponse>);
+
+fn api_error(status: StatusCode, message: impl Into<String>) -> ApiError {
+    (status, Json(ErrorResponse { error: message.into() }))
+}
+
+fn internal_error(e: sqlx::Error) -> ApiError {
+    error!("Erro no banco de dados: {}", e);
+    api_error(StatusCode::INTERNAL_SERVER_ERROR, "Erro interno")
+}
+
+#[derive(Deserialize)]
+struct FieldsQuery {
+    fields: Option<String>,
+}
+
+#[derive(Deserialize)]
+struct ListQuery {
+    page: Option<u32>,
+    limit: Option<u32>,
+    fields: Option<String>,
+}
+
+impl ListQuery {
+    /// `(limit, offset)` para o SQL; página começa em 1
+    fn bounds(&self) -> (i64, i64) {
+        let limit = self.limit.unwrap_or(DEFAULT_PAGE_LIMIT).clamp(1, MAX_PAGE_LIMIT) as i64;
+        let page = self.page.unwrap_or(1).max(1) as i64;
+        (limit, (page - 1) * limit)
+    }
+}
+
+/// Lê `?fields=id,title,price` e valida contra os campos do recurso.
+///
+/// `None` quando o parâmetro não foi enviado (resposta completa).
+fn parse_fields(
+    fields: Option<&str>,
+    allowed: &[&'static str],
+) -> Result<Option<Vec<&'static str>>, ApiError> {
+    let Some(fields) = fields else {
+        return Ok(None);
+    };
+    let mut selected = vec!["id"];
+    for name in fields.split(',').map(str::trim).filter(|name| !name.is_empty()) {
+        match allowed.iter().copied().find(|field| *field == name) {
+            Some(field) if !selected.contains(&field) => selected.push(field),
+            Some(_) => {}
+            None => {
+                return Err(api_error(
+                    StatusCode::BAD_REQUEST,
+                    format!("Campo desconhecido em fields: {}", name),
+                ))
+            }
+        }
+    }
+    Ok(Some(selected))
+}
+
+/// Serializa só os campos pedidos de cada item.
+fn select<T: Serialize>(item: &T, fields: &[&str]) -> Map<String, Value> {
+    let mut object = match serde_json::to_value(item) {
+        Ok(Value::Object(object)) => object,
+        _ => Map::new(),
+    };
+    object.retain(|key, _| fields.contains(&key.as_str()));
+    object
+}
+
+/// JSON dos itens (só os campos pedidos, se houver)
+fn project<T: Serialize>(items: &[T], fields: Option<&[&str]>) -> Result<Bytes, ApiError> {
+    let encoded = match fields {
+        None => serde_json::to_vec(items),
+        Some(fields) => serde_json::to_vec(
+            &items
+                .iter()
+                .map(|item| select(item, fields))
+                .collect::<Vec<_>>(),
+        ),
+    };
+    encoded.map(Bytes::from).map_err(|e| {
+        error!("Erro ao serializar a resposta: {}", e);
+        api_error(StatusCode::INTERNAL_SERVER_ERROR, "Erro interno")
+    })
+}
+
+fn json_response(body: Bytes, cache_status: Option<&'static str>) -> Response {
+    let mut response = ([(header::CONTENT_TYPE, "application/json")], body).into_response();
+    if let Some(status) = cache_status {
+        response
+            .headers_mut()
+            .insert("x-cache", header::HeaderValue::from_static(status));
+    }
+    response
+}
+
+/// Responde do cache em memória ou chama `load` e guarda o resultado.
+///
+/// `Cache-Control: no-cache` na requisição ignora o valor guardado (a
+/// resposta nova substitui a antiga). Erros não são guardados.
+async fn cached<F, Fut>(
+    state: &AppState,
+    key: CacheKey,
+    headers: &HeaderMap,
+    load: F,
+) -> Result<Response, ApiError>
+where
+    F: FnOnce() -> Fut,
+    Fut: Future<Output = Result<Bytes, ApiError>>,
+{
+    let bypass = headers
+        .get(header::CACHE_CONTROL)
+        .and_then(|value| value.to_str().ok())
+        .map_or(false, |value| value.contains("no-cache"));
+    if !bypass {
+        if let Some(body) = state.cache.get(&key) {
+            return Ok(json_response(body, Some("HIT")));
+        }
+    }
+    let generation = state.cache.generation();
+    let body = load().await?;
+    state.cache.insert(key, body.clone(), generation);
+    Ok(json_response(body, Some("MISS")))
+}
+
+#[derive(Clone)]
+struct AppState {
+    db: Db,
+    cache: Arc<ResponseCache>,
+    // Acorda os long-polls de /changes quando há escrita
+    changed: Arc<Notify>,
+}
+
+async fn get_properties(
+    State(state): State<AppState>,
+    Query(query): Query<ListQuery>,
+    headers: HeaderMap,
+) -> Result<Response, ApiError> {
     info!("Get properties endpoint called");
-    // Mock data - em produção viria do banco de dados
-    let properties = vec![
-        Property {
-            id: 1,
-            title: "Casa Moderna".to_string(),
-            description: "Linda casa com 3 quartos".to_string(),
-            price: 450000.0,
-            location: "São Paulo, SP".to_string(),
-            property_type: "Casa".to_string(),
-            status: "Disponível".to_string(),
-        },
-        Property {
-            id: 2,
-            title: "Apartamento Centro".to_string(),
-            description: "Apartamento no centro da cidade".to_string(),
-            price: 320000.0,
-            location: "Rio de Janeiro, RJ".to_string(),
-            property_type: "Apartamento".to_string(),
-            status: "Vendido".to_string(),
-        },
-    ];
-    Json(properties)
-}
-
-async fn get_users() -> Json<Vec<User>> {
+    let fields = parse_fields(query.fields.as_deref(), PROPERTY_FIELDS)?;
+    let (limit, offset) = query.bounds();
+    let key = CacheKey::page(limit, offset, fields.as_deref());
+    cached(&state, key, &headers, || async {
+        let properties = state
+            .db
+            .list_properties(limit, offset)
+            .await
+            .map_err(internal_error)?;
+        project(&properties, fields.as_deref())
+    })
+    .await
+}
+
+async fn get_property(
+    State(state): State<AppState>,
+    Path(id): Path<i32>,
+    Query(query): Query<FieldsQuery>,
+    headers: HeaderMap,
+) -> Result<Response, ApiError> {
+    info!("Get property {} endpoint called", id);
+    let fields = parse_fields(query.fields.as_deref(), PROPERTY_FIELDS)?;
+    let key = CacheKey::property(id, fields.as_deref());
+    cached(&state, key, &headers, || async {
+        let property = state
+            .db
+            .get_property(id)
+            .await
+            .map_err(internal_error)?
+            .ok_or_else(|| {
+                api_error(
+                    StatusCode::NOT_FOUND,
+                    format!("Propriedade {} não encontrada", id),
+                )
+            })?;
+        let encoded = match fields.as_deref() {
+            Some(fields) => serde_json::to_vec(&select(&property, fields)),
+            None => serde_json::to_vec(&property),
+        };
+        encoded.map(Bytes::from).map_err(|e| {
+            error!("Erro ao serializar a resposta: {}", e);
+            api_error(StatusCode::INTERNAL_SERVER_ERROR, "Erro interno")
+        })
+    })
+    .await
+}
+
+/// Aplica várias criações/atualizações/remoções em uma única requisição.
+///
+/// Cada operação tem seu próprio status no resultado; uma propriedade
+/// inexistente não interrompe as demais.
+async fn batch_properties(
+    State(state): State<AppState>,
+    Json(request): Json<BatchRequest>,
+) -> Result<Json<BatchResponse>, ApiError> {
+    if request.ops.len() > MAX_BATCH_OPS {
+        return Err(api_error(
+            StatusCode::PAYLOAD_TOO_LARGE,
+            format!("Máximo de {} operações por lote", MAX_BATCH_OPS),
+        ));
+    }
+    info!("Batch properties endpoint called ({} ops)", request.ops.len());
+
+    let touched: Vec<i32> = request
+        .ops
+        .iter()
+        .filter_map(|op| match op {
+            BatchOp::Update { id, .. } | BatchOp::Delete { id } => Some(*id),
+            BatchOp::Create { .. } => None,
+        })
+        .collect();
+    let results = state.db.batch(request.ops).await;
+    // Invalida mesmo se o lote falhou: parte dele pode ter sido gravada antes do erro
+    state.cache.invalidate_properties(&touched);
+    state.changed.notify_waiters();
+    Ok(Json(BatchResponse {
+        results: results.map_err(internal_error)?,
+    }))
+}
+
+async fn get_users(
+    State(state): State<AppState>,
+    Query(query): Query<ListQuery>,
+) -> Result<Response, ApiError> {
     info!("Get users endpoint called");
-    // Mock data - em produção viria do banco de dados
-    let users = vec![
-        User {
-            id: 1,
-            name: "João Silva".to_string(),
-            email: "joao@email.com".to_string(),
-            role: "Admin".to_string(),
-        },
-        User {
-            id: 2,
-            name: "Maria Santos".to_string(),
-            email: "maria@email.com".to_string(),
-            role: "User".to_string(),
-        },
-    ];
-    Json(users)
+    let fields = parse_fields(query.fields.as_deref(), USER_FIELDS)?;
+    let (limit, offset) = query.bounds();
+    let users = state
+        .db
+        .list_users(limit, offset)
+        .await
+        .map_err(internal_error)?;
+    project(&users, fields.as_deref()).map(|body| json_response(body, None))
+}
+
+/// Mudanças com `seq` maior que `since`, em ordem.
+///
+/// Com `wait`, segura a requisição (long-poll) até haver eventos ou o prazo
+/// acabar. O consumidor guarda `last_seq` e retoma dele depois de reiniciar.
+async fn get_changes(
+    State(state): State<AppState>,
+    Query(query): Query<ChangesQuery>,
+) -> Result<Json<ChangeFeed>, ApiError> {
+    let since = query.since.unwrap_or(0).max(0);
+    let limit = query.limit.unwrap_or(500).clamp(1, MAX_CHANGES_LIMIT);
+    let wait = Duration::from_secs(query.wait.unwrap_or(0).min(MAX_CHANGES_WAIT_SECONDS));
+    let deadline = Instant::now() + wait;
+    loop {
+        // Registrado antes da consulta: uma escrita entre os dois não se perde
+        let notified = state.changed.notified();
+        tokio::pin!(notified);
+        notified.as_mut().enable();
+
+        let feed = state
+            .db
+            .changes_since(since, limit)
+            .await
+            .map_err(internal_error)?;
+        let now = Instant::now();
+        if feed.reset || !feed.events.is_empty() || now >= deadline {
+            return Ok(Json(feed));
+        }
+        let _ = tokio::time::timeout((deadline - now).min(CHANGES_POLL), notified).await;
+    }
+}
+
+/// Acertos do cache em memória e uso do pool de conexões
+async fn metrics(State(state): State<AppState>) -> Json<Value> {
+    Json(serde_json::json!({
+        "cache": state.cache.stats(),
+        "db": state.db.stats(),
+    }))
+}
+
+/// PostgreSQL quando `DATABASE_URL` está definido; senão, memória
+async fn connect() -> Db {
+    let Ok(url) = std::env::var("DATABASE_URL") else {
+        warn!("DATABASE_URL não definido: usando armazenamento em memória com dados de exemplo");
+        return Db::memory();
+    };
+    let max_connections = std::env::var("DATABASE_MAX_CONNECTIONS")
+        .ok()
+        .and_then(|value| value.parse().ok())
+        .unwrap_or(10);
+    let pool = PgPoolOptions::new()
+        .max_connections(max_connections)
+        .min_connections(1)
+        .acquire_timeout(Duration::from_secs(5))
+        .idle_timeout(Duration::from_secs(300))
+        .connect(&url)
+        .await
+        .expect("Falha ao conectar no PostgreSQL");
+    sqlx::migrate!()
+        .run(&pool)
+        .await
+        .expect("Falha ao aplicar as migrações");
+    info!("PostgreSQL conectado (pool de até {} conexões)", max_connections);
+    Db::Postgres(pool)
 }
 
 #[tokio::main]
 async fn main() {
     // Inicializar logging
     tracing_subscriber::fmt::init();
+    dotenv::dotenv().ok();
 
     // Configurar CORS
     let cors = CorsLayer::new()
@@ -100,20 +499,54 @@ async fn main() {
         .allow_methods(Any)
         .allow_headers(Any);
 
+    let state = AppState {
+        db: connect().await,
+        cache: Arc::new(ResponseCache::from_env()),
+        changed: Arc::new(Notify::new()),
+    };
+    if let Db::Postgres(pool) = &state.db {
+        if std::env::var("CACHE_LISTEN_NOTIFY").map_or(false, |value| value == "1") {
+            tokio::spawn(db::listen_property_changes(
+                pool.clone(),
+                state.cache.clone(),
+                state.changed.clone(),
+            ));
+        }
+        let retention_days = std::env::var("CHANGES_RETENTION_DAYS")
+            .ok()
+            .and_then(|value| value.parse().ok())
+            .unwrap_or(7);
+        tokio::spawn(db::prune_changes(pool.clone(), retention_days));
+    }
+
     // Criar rotas
+    // O lote fica em /properties/batch: no axum 0.7 ":" inicia um parâmetro
+    // de rota, então "/properties:batch" não pode ser registrado literalmente
     let app = Router::new()
         .route("/api/v1/health", get(health_check))
         .route("/api/v1/properties", get(get_properties))
+        .route("/api/v1/properties/batch", post(batch_properties))
+        .route("/api/v1/properties/:id", get(get_property))
         .route("/api/v1/users", get(get_users))
-        .layer(cors);
+        .route("/api/v1/changes", get(get_changes))
+        .route("/api/v1/metrics", get(metrics))
+        // gzip/brotli conforme o Accept-Encoding; corpos gzip do cliente (lotes grandes) são aceitos
+        .layer(CompressionLayer::new())
+        .layer(RequestDecompressionLayer::new())
+        .layer(cors)
+        .with_state(state);
 
     // Iniciar servidor
     let listener = tokio::net::TcpListener::bind("0.0.0.0:8080").await.unwrap();
     info!("🚀 Servidor Rust rodando em http://localhost:8080");
     info!("📋 Endpoints disponíveis:");
     info!("   GET /api/v1/health");
-    info!("   GET /api/v1/properties");
-    info!("   GET /api/v1/users");
+    info!("   GET /api/v1/properties?page=1&limit=20&fields=id,title,price,status");
+    info!("   GET /api/v1/properties/:id");
+    info!("   POST /api/v1/properties/batch");
+    info!("   GET /api/v1/users?page=1&limit=20");
+    info!("   GET /api/v1/changes?since=0&wait=25");
+    info!("   GET /api/v1/metrics");
 
     axum::serve(listener, app).await.unwrap();
  